@@ -205,7 +205,19 @@ doc_events = {
                     ],
         "after_save": "numerouno.numerouno.doctype.student_group.student_group.check_and_send_unpaid_notifications",
         "after_insert": "numerouno.numerouno.notifications.event_handlers.handle_student_group_creation",
-        "on_update": "numerouno.numerouno.notifications.event_handlers.handle_student_group_instructor_update"
+        "on_update": [
+            "numerouno.numerouno.notifications.event_handlers.handle_student_group_instructor_update",
+            "numerouno.numerouno.utils.http_cache.on_student_group_change",
+            "numerouno.numerouno.utils.instructor_scope.on_student_group_change",
+        ],
+        "on_trash": [
+            "numerouno.numerouno.utils.http_cache.on_student_group_change",
+            "numerouno.numerouno.utils.instructor_scope.on_student_group_change",
+        ],
+        "after_rename": [
+            "numerouno.numerouno.utils.http_cache.on_student_group_change",
+            "numerouno.numerouno.utils.instructor_scope.on_student_group_change",
+        ],
 	},
     "Student": {
         "validate": "numerouno.numerouno.doctype.student.student.validate_student_contact_type",
@@ -243,9 +255,18 @@ doc_events = {
         "on_submit": "numerouno.numerouno.unified_assessment_system.trigger_assessment_result_events",
     },
     "Student Attendance": {
-        "on_submit": "numerouno.numerouno.doctype.student_attendance.student_attendance.validate_signature_before_submit",
+        "on_submit": [
+            "numerouno.numerouno.doctype.student_attendance.student_attendance.validate_signature_before_submit",
+            "numerouno.numerouno.utils.assessment_eligibility.on_student_attendance_change",
+        ],
         "after_insert": "numerouno.numerouno.notifications.event_handlers.handle_student_absence",
-        "on_update": "numerouno.numerouno.notifications.event_handlers.handle_attendance_eligibility"
+        "on_update": [
+            "numerouno.numerouno.notifications.event_handlers.handle_attendance_eligibility",
+            "numerouno.numerouno.utils.assessment_eligibility.on_student_attendance_change",
+        ],
+        "on_update_after_submit": "numerouno.numerouno.utils.assessment_eligibility.on_student_attendance_change",
+        "on_cancel": "numerouno.numerouno.utils.assessment_eligibility.on_student_attendance_change",
+        "on_trash": "numerouno.numerouno.utils.assessment_eligibility.on_student_attendance_change",
     },
     "Instructor Assignment": {
         "after_insert": "numerouno.numerouno.notifications.event_handlers.handle_instructor_assignment"
@@ -254,14 +275,34 @@ doc_events = {
         "after_insert": "numerouno.numerouno.notifications.event_handlers.handle_cash_assignment"
     },
     "Course Schedule": {
-        "after_insert": "numerouno.numerouno.notifications.event_handlers.handle_course_schedule_creation"
+        "after_insert": [
+            "numerouno.numerouno.notifications.event_handlers.handle_course_schedule_creation",
+            "numerouno.numerouno.utils.assessment_scaffolding.on_course_schedule_insert",
+        ],
+        "on_update": "numerouno.numerouno.utils.assessment_eligibility.on_course_schedule_change",
+        "on_cancel": "numerouno.numerouno.utils.assessment_eligibility.on_course_schedule_change",
+        "on_trash": "numerouno.numerouno.utils.assessment_eligibility.on_course_schedule_change",
+    },
+    "Course Lesson": {
+        "on_update": "numerouno.numerouno.utils.lesson_quiz_index.on_course_lesson_update",
+        "on_trash": "numerouno.numerouno.utils.lesson_quiz_index.on_course_lesson_trash",
     },
     "LMS Quiz Submission": {
         "validate": "numerouno.numerouno.doctype.lms_quiz_submission.lms_quiz_submission.on_submit"
     },
     "Employee": {
         "after_insert": "numerouno.numerouno.doctype.attendance_staff.attendance_staff.sync_attendance_staff_from_employee",
-        "on_update": "numerouno.numerouno.doctype.attendance_staff.attendance_staff.sync_attendance_staff_from_employee",
+        "on_update": [
+            "numerouno.numerouno.doctype.attendance_staff.attendance_staff.sync_attendance_staff_from_employee",
+            "numerouno.numerouno.utils.instructor_scope.on_employee_change",
+        ],
+        "on_trash": "numerouno.numerouno.utils.instructor_scope.on_employee_change",
+        "after_rename": "numerouno.numerouno.utils.instructor_scope.on_employee_change",
+    },
+    "Instructor": {
+        "on_update": "numerouno.numerouno.utils.instructor_scope.invalidate_instructor_scope",
+        "on_trash": "numerouno.numerouno.utils.instructor_scope.invalidate_instructor_scope",
+        "after_rename": "numerouno.numerouno.utils.instructor_scope.invalidate_instructor_scope",
     },
     "User": {
         "after_insert": [
@@ -271,8 +312,51 @@ doc_events = {
         "on_update": "numerouno.numerouno.doctype.attendance_staff.attendance_staff.sync_attendance_staff_from_user",
     },
     "Quiz Activity": {
-        "validate": "numerouno.numerouno.doctype.quiz_activity.quiz_activity_validation.validate_quiz_activity_eligibility",
+        "validate": [
+            "numerouno.numerouno.doctype.quiz_activity.quiz_activity_validation.set_default_activity_date",
+            "numerouno.numerouno.doctype.quiz_activity.quiz_activity_validation.validate_quiz_activity_eligibility",
+        ],
         "after_insert": "numerouno.numerouno.doctype.quiz_activity.quiz_activity.auto_create_assessment_documents",
+        "on_update": "numerouno.numerouno.utils.quiz_activity_score.on_quiz_activity_update",
+        "on_update_after_submit": "numerouno.numerouno.utils.quiz_activity_score.on_quiz_activity_update",
+    },
+    "MCQS Assignment": {
+        "on_update": [
+            "numerouno.numerouno.utils.assessment_scaffolding.on_mcqs_assignment_update",
+            "numerouno.numerouno.utils.quiz_catalog.on_mcqs_assignment_change",
+        ],
+        "on_trash": "numerouno.numerouno.utils.quiz_catalog.on_mcqs_assignment_change",
+    },
+    "Quiz": {
+        "on_update": [
+            "numerouno.numerouno.utils.quiz_cache.on_quiz_update",
+            "numerouno.numerouno.utils.quiz_translation.on_quiz_update",
+            "numerouno.numerouno.utils.quiz_catalog.on_quiz_change",
+            "numerouno.numerouno.utils.quiz_activity_score.on_quiz_update",
+        ],
+        "on_trash": [
+            "numerouno.numerouno.utils.quiz_cache.on_quiz_update",
+            "numerouno.numerouno.utils.quiz_catalog.on_quiz_change",
+        ],
+    },
+    "Translation": {
+        "on_update": "numerouno.numerouno.utils.quiz_translation.on_translation_change",
+        "on_trash": "numerouno.numerouno.utils.quiz_translation.on_translation_change",
+    },
+    "Quiz Section Profile": {
+        "on_update": [
+            "numerouno.numerouno.utils.quiz_catalog.on_quiz_section_profile_change",
+            "numerouno.numerouno.utils.section_scoring.on_quiz_section_profile_update",
+        ],
+        "on_trash": "numerouno.numerouno.utils.quiz_catalog.on_quiz_section_profile_change",
+    },
+    "Question": {
+        "on_update": [
+            "numerouno.numerouno.utils.quiz_cache.on_question_update",
+            "numerouno.numerouno.utils.quiz_translation.on_question_update",
+            "numerouno.numerouno.utils.quiz_regrade.on_question_update",
+        ],
+        "on_trash": "numerouno.numerouno.utils.quiz_cache.on_question_update",
     }
 }
 
@@ -283,7 +367,16 @@ scheduler_events = {
 	"daily": [
 		"numerouno.numerouno.doctype.student_group.student_group.send_daily_unpaid_notifications",
         "numerouno.numerouno.asset_management.send_asset_maintenance_reminders",
-	]
+	],
+	"hourly": [
+		"numerouno.numerouno.api.quiz_api.recover_public_quiz_progress_buffers",
+	],
+	"cron": {
+		"* * * * *": [
+			"numerouno.numerouno.api.quiz_api.flush_public_quiz_progress_buffers",
+			"numerouno.numerouno.utils.quiz_audit.flush_quiz_audit_buffer",
+		],
+	},
 }
 
 # Testing
@@ -317,7 +410,7 @@ override_whitelisted_methods = {
 # Request Events
 # ----------------
 # before_request = ["numerouno.utils.before_request"]
-# after_request = ["numerouno.utils.after_request"]
+after_request = ["numerouno.numerouno.utils.http_cache.set_etag_headers"]
 
 # Job Events
 # ----------
@@ -2,18 +2,48 @@ import frappe
 from frappe import _
 from frappe.utils import today
 from datetime import timedelta
+import base64
+import hashlib
 import json
-import urllib.parse
-import urllib.request
+import time
 
 from numerouno.numerouno.utils.assessment_eligibility import (
 	ensure_assessment_eligible,
 	get_assessment_eligibility,
 )
+from numerouno.numerouno.utils.http_cache import (
+	NOT_MODIFIED,
+	get_student_group_list_version,
+	get_version_stamp,
+	is_not_modified,
+	make_etag,
+)
+from numerouno.numerouno.utils.lesson_quiz_index import get_course_quizzes
+from numerouno.numerouno.utils.quiz_activity_score import draft_score_fields, materialize_activity_scores
+from numerouno.numerouno.utils.quiz_cache import QUIZ_PAYLOAD_TTL, get_quiz_version, get_versioned_quiz_value
+from numerouno.numerouno.utils.quiz_catalog import get_group_quiz_catalog
+from numerouno.numerouno.utils.section_scoring import (
+	get_section_profile_name,
+	get_section_scheme,
+	score_section_submission,
+)
+from numerouno.numerouno.utils import quiz_audit, quiz_progress_buffer
+from numerouno.numerouno.utils.assessment_scaffolding import get_assignment_scaffolding
+from numerouno.numerouno.utils.diagnostics import get_diagnostics
+from numerouno.numerouno.utils.quiz_translation import (
+	get_quiz_translation_generation,
+	normalize_quiz_language,
+	resolve_translations,
+	translate_missing_texts,
+)
+
+QUIZ_PARTIAL_PAYLOAD_TTL = 60
+
+diag = get_diagnostics("quiz")
 
 
 def _log_public_quiz_audit(event_type, quiz_name=None, student=None, student_group=None, attempt_id=None, details=None):
-    """Write structured public quiz audit events to a dedicated site log."""
+    """Buffer a structured public quiz audit event for the audit store (see `utils.quiz_audit`)."""
     if isinstance(details, str):
         try:
             details = json.loads(details)
@@ -32,8 +62,7 @@ def _log_public_quiz_audit(event_type, quiz_name=None, student=None, student_gro
         "request_path": getattr(getattr(frappe.local, "request", None), "path", None),
         "timestamp": frappe.utils.now(),
     }
-    frappe.logger("public_quiz_audit", allow_site=True).info(json.dumps(payload, default=str))
-    return payload
+    return quiz_audit.record_event(payload)
 
 
 def _safe_selected_option_text(value, max_len=140):
@@ -96,23 +125,89 @@ def _to_answer_map(answers):
     return mapped
 
 
-def _selected_option_text_for_question(question_name, option_id):
-    if not question_name or option_id in (None, ""):
-        return ""
-    try:
-        question_doc = frappe.get_doc("Question", question_name)
-    except Exception:
-        return str(option_id)
+def _build_quiz_answer_key(quiz_name):
+    """Map question -> type, correct option ids and option texts with one query over Options."""
+    rows = frappe.db.sql(
+        """
+        SELECT qs.name AS question, qs.question_type, o.`option` AS option_text,
+            o.is_correct, o.idx
+        FROM `tabQuestion` qs
+        LEFT JOIN `tabOptions` o ON o.parent = qs.name AND o.parenttype = 'Question'
+        WHERE qs.name IN (
+            SELECT qq.question_link FROM `tabQuiz Question` qq
+            WHERE qq.parent = %s AND qq.parenttype = 'Quiz'
+        )
+        ORDER BY qs.name, o.idx
+        """,
+        (quiz_name,),
+        as_dict=True,
+    )
+
+    answer_key = {}
+    for row in rows:
+        entry = answer_key.setdefault(row.question, {
+            "type": row.question_type or "Single Correct Answer",
+            "correct": [],
+            "options": [],
+        })
+        if row.idx is None:
+            continue
+        entry["options"].append(row.option_text or "")
+        if row.is_correct:
+            entry["correct"].append(len(entry["options"]))  # Options are 1-indexed
+    return answer_key
 
+
+def get_quiz_answer_key(quiz_name):
+    """Cached answer-key index for a quiz, invalidated with the quiz version."""
+    return get_versioned_quiz_value("answer_key", quiz_name, _build_quiz_answer_key)
+
+
+def _answer_key_entry_from_doc(question_doc):
     options = getattr(question_doc, "options", None) or []
-    try:
-        opt_idx = int(option_id) - 1
-    except Exception:
-        opt_idx = -1
+    return {
+        "type": getattr(question_doc, "question_type", None) or "Single Correct Answer",
+        "correct": [idx + 1 for idx, opt in enumerate(options) if getattr(opt, "is_correct", 0)],
+        "options": [getattr(opt, "option", "") or "" for opt in options],
+    }
 
-    if 0 <= opt_idx < len(options):
-        return _safe_selected_option_text(getattr(options[opt_idx], "option", "") or str(option_id))
-    return _safe_selected_option_text(str(option_id))
+
+def _get_answer_key_entry(answer_key, question_name):
+    """Look a question up in the quiz index; load it directly only if it is not part of the quiz."""
+    entry = (answer_key or {}).get(question_name)
+    if entry is None and question_name and frappe.db.exists("Question", question_name):
+        entry = _answer_key_entry_from_doc(frappe.get_doc("Question", question_name))
+        if answer_key is not None:
+            answer_key[question_name] = entry
+    return entry
+
+
+def _selected_option_text(entry, selected_answers):
+    if not entry:
+        return ", ".join(map(str, selected_answers))
+    if entry["type"] not in ("Single Correct Answer", "Multiple Correct Answer"):
+        return ", ".join(map(str, selected_answers))
+
+    option_texts = []
+    for opt_id in selected_answers:
+        try:
+            opt_idx = int(opt_id) - 1
+        except Exception:
+            continue
+        if 0 <= opt_idx < len(entry["options"]) and entry["options"][opt_idx]:
+            option_texts.append(entry["options"][opt_idx])
+    return ", ".join(option_texts)
+
+
+def _selected_option_text_for_question(question_name, option_id, answer_key=None):
+    if not question_name or option_id in (None, ""):
+        return ""
+    entry = _get_answer_key_entry(answer_key, question_name)
+    if not entry:
+        return str(option_id)
+    return _safe_selected_option_text(
+        _selected_option_text(entry, _selected_answers_for_check(option_id)) or str(option_id)
+    )
 
 
 def get_quiz_expected_question_count(quiz_name):
@@ -139,16 +234,17 @@ def _selected_answers_for_check(option_id):
     return selected_answers
 
 
-def _quiz_result_for_question(question_name, option_id):
+def _quiz_result_for_question(question_name, option_id, answer_key=None):
     if not question_name or option_id in (None, ""):
         return "Wrong"
     try:
-        question_doc = frappe.get_doc("Question", question_name)
-        return "Correct" if check_quiz_answer(question_doc, _selected_answers_for_check(option_id)) else "Wrong"
+        entry = _get_answer_key_entry(answer_key, question_name)
+        return "Correct" if is_answer_correct(entry, _selected_answers_for_check(option_id)) else "Wrong"
     except Exception:
-        frappe.log_error(
-            f"Failed to check draft quiz answer for question {question_name}: {frappe.get_traceback()}",
-            "Public Quiz Progress",
+        diag.error(
+            "Failed to check draft quiz answer for question {}:",
+            question_name,
+            title="Public Quiz Progress",
         )
         return "Wrong"
 
@@ -170,6 +266,22 @@ def _replace_quiz_activity_result_rows(quiz_activity):
         parent_updates["custom_student_group"] = quiz_activity.custom_student_group
     if hasattr(quiz_activity, "custom_assesment_plan"):
         parent_updates["custom_assesment_plan"] = quiz_activity.custom_assesment_plan
+    if getattr(quiz_activity, "custom_attempt_id", None):
+        parent_updates["custom_attempt_id"] = quiz_activity.custom_attempt_id
+    graded = quiz_activity.status in ("Pass", "Fail")
+    if not graded:
+        # A draft's counters come from the rows in hand; grading materializes the full set.
+        try:
+            expected_total = int(str(quiz_activity.score).split("/")[1])
+        except (IndexError, ValueError):
+            expected_total = 0
+        parent_updates.update(
+            draft_score_fields(
+                sum(1 for row in result_rows if row.get("quiz_result") == "Correct"),
+                len(result_rows),
+                expected_total,
+            )
+        )
 
     frappe.db.set_value("Quiz Activity", quiz_activity.name, parent_updates, update_modified=True)
     frappe.db.delete("Quiz Result", {
@@ -177,24 +289,84 @@ def _replace_quiz_activity_result_rows(quiz_activity):
         "parenttype": "Quiz Activity",
         "parentfield": "result",
     })
-
-    for idx, row in enumerate(result_rows, start=1):
-        child = frappe.get_doc({
-            "doctype": "Quiz Result",
-            "parent": quiz_activity.name,
-            "parenttype": "Quiz Activity",
-            "parentfield": "result",
-            "idx": idx,
-            "question": row.get("question"),
-            "selected_option": row.get("selected_option"),
-            "quiz_result": row.get("quiz_result"),
-        })
-        child.db_insert()
+    _upsert_quiz_result_rows(
+        quiz_activity.name,
+        [dict(row, idx=idx) for idx, row in enumerate(result_rows, start=1)],
+        prune=False,
+    )
+    if graded:
+        materialize_activity_scores([quiz_activity.name])
 
     quiz_activity.reload()
     return quiz_activity
 
 
+def _quiz_result_row_name(quiz_activity_name, question_name):
+    """Stable child row name so an answer can be upserted in place."""
+    return hashlib.sha1(f"{quiz_activity_name}::{question_name}".encode()).hexdigest()[:16]
+
+
+def _upsert_quiz_result_rows(quiz_activity_name, rows, cleared_questions=None, prune=True, exclusive=False):
+    """Write Quiz Result rows with one DELETE and one multi-row INSERT ... ON DUPLICATE KEY UPDATE.
+
+    `exclusive` makes `rows` the complete answer set and drops every other row.
+    """
+    rows = [row for row in rows if row.get("question")]
+    if exclusive:
+        keep = [_quiz_result_row_name(quiz_activity_name, row["question"]) for row in rows] or [""]
+        frappe.db.sql(
+            """
+            DELETE FROM `tabQuiz Result`
+            WHERE parent = %(parent)s AND parenttype = 'Quiz Activity' AND parentfield = 'result'
+                AND name NOT IN %(keep)s
+            """,
+            {"parent": quiz_activity_name, "keep": tuple(keep)},
+        )
+        prune = False
+
+    affected = [row["question"] for row in rows] + list(cleared_questions or [])
+    if prune and affected:
+        # Drops cleared answers and rows saved before row names were deterministic.
+        keep = [_quiz_result_row_name(quiz_activity_name, row["question"]) for row in rows] or [""]
+        frappe.db.sql(
+            """
+            DELETE FROM `tabQuiz Result`
+            WHERE parent = %(parent)s AND parenttype = 'Quiz Activity' AND parentfield = 'result'
+                AND question IN %(questions)s AND name NOT IN %(keep)s
+            """,
+            {"parent": quiz_activity_name, "questions": tuple(affected), "keep": tuple(keep)},
+        )
+
+    if not rows:
+        return
+
+    now = frappe.utils.now()
+    user = frappe.session.user
+    values = []
+    for row in rows:
+        values.extend([
+            _quiz_result_row_name(quiz_activity_name, row["question"]),
+            now, now, user, user, 0,
+            quiz_activity_name, "Quiz Activity", "result", row.get("idx") or 0,
+            row["question"], row.get("selected_option"), row.get("quiz_result"),
+        ])
+
+    placeholders = ", ".join(["(" + ", ".join(["%s"] * 13) + ")"] * len(rows))
+    frappe.db.sql(
+        f"""
+        INSERT INTO `tabQuiz Result`
+            (name, creation, modified, owner, modified_by, docstatus,
+            parent, parenttype, parentfield, idx,
+            question, selected_option, quiz_result)
+        VALUES {placeholders}
+        ON DUPLICATE KEY UPDATE
+            modified = VALUES(modified), modified_by = VALUES(modified_by), idx = VALUES(idx),
+            selected_option = VALUES(selected_option), quiz_result = VALUES(quiz_result)
+        """,
+        values,
+    )
+
+
 def _save_quiz_activity_with_replaceable_results(quiz_activity, ignore_mandatory=False):
     if quiz_activity.name and quiz_activity.get("__islocal") is None:
         return _replace_quiz_activity_result_rows(quiz_activity)
@@ -203,19 +375,407 @@ def _save_quiz_activity_with_replaceable_results(quiz_activity, ignore_mandatory
     return quiz_activity
 
 
-@frappe.whitelist(allow_guest=True, methods=["POST"])
-def upsert_public_quiz_progress(quiz_name, student, student_group, answers=None, attempt_id=None, total_questions=None):
-    """Persist draft Quiz Activity as user answers questions one-by-one."""
-    import json
+PROGRESS_SEQ_TTL = 60 * 60 * 24
+
+# Raise the stored seq only when the new one is higher; returns the seq that blocked it, or 0.
+_CLAIM_PROGRESS_SEQ = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0') or 0
+if tonumber(ARGV[1]) <= current then
+    return current
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return 0
+"""
+
+
+def _progress_seq_key(attempt_id):
+    key = _progress_cache_key(attempt_id)
+    return frappe.cache().make_key(f"{key}:seq") if key else None
+
+
+def _claim_progress_seq(attempt_id, seq):
+    """Atomically make `seq` the attempt's latest; returns the newer stored seq if it is stale."""
+    key = _progress_seq_key(attempt_id)
+    if not key or not seq:
+        return 0
+    return int(frappe.cache().eval(_CLAIM_PROGRESS_SEQ, 1, key, int(seq), PROGRESS_SEQ_TTL) or 0)
+
+
+def _is_latest_progress_seq(attempt_id, seq):
+    """False once a newer update has claimed the attempt, so an older write must not commit."""
+    key = _progress_seq_key(attempt_id)
+    if not key or not seq:
+        return True
+    try:
+        return int(frappe.cache().get(key) or 0) <= int(seq)
+    except (TypeError, ValueError):
+        return True
+
+
+def _stale_progress_response(attempt_id, seq, last_seq):
+    return {
+        "status": "success",
+        "ignored": True,
+        "seq": seq,
+        "last_seq": last_seq,
+        "activity_id": _get_quiz_activity_for_attempt(attempt_id),
+    }
+
+
+def _get_question_positions(quiz_name):
+    """Question -> 1-based position in the quiz, read from the cached payload."""
+    payload = get_compiled_quiz_payload(quiz_name)
+    return {question["name"]: idx for idx, question in enumerate(payload["questions"], start=1)}
+
+
+def _new_draft_quiz_activity(quiz_name, student, student_group, attempt_id=None):
+    quiz_activity = frappe.new_doc("Quiz Activity")
+    quiz_activity.student = student
+    quiz_activity.quiz = quiz_name
+    quiz_activity.activity_date = today()
+    if hasattr(quiz_activity, "custom_student_group"):
+        quiz_activity.custom_student_group = student_group
+    if attempt_id and hasattr(quiz_activity, "custom_attempt_id"):
+        quiz_activity.custom_attempt_id = attempt_id
+    quiz_activity.flags.skip_assessment_auto_create = True
+    quiz_activity.insert(ignore_permissions=True, ignore_mandatory=True)
+    return quiz_activity.name
+
+
+def _get_draft_quiz_activity_for_attempt(attempt_id, quiz_activity_name=None):
+    quiz_activity_name = quiz_activity_name or _get_quiz_activity_for_attempt(attempt_id)
+    if not quiz_activity_name and attempt_id:
+        quiz_activity_name = frappe.db.get_value("Quiz Activity", {"custom_attempt_id": attempt_id}, "name")
+    if not quiz_activity_name:
+        return None
+    # A graded activity stays docstatus 0 without an enrollment; it is no longer a draft.
+    activity = frappe.db.get_value("Quiz Activity", quiz_activity_name, ["docstatus", "status"], as_dict=True)
+    if activity and activity.docstatus == 0 and activity.status not in ("Pass", "Fail"):
+        return quiz_activity_name
+    return None
+
+
+def _write_draft_progress_rows(quiz_activity_name, quiz_name, answers, total_questions_val, exclusive=False):
+    """Upsert draft answers ({question: option, None clears}) and refresh the progress score."""
+    answer_key = get_quiz_answer_key(quiz_name)
+    positions = _get_question_positions(quiz_name)
+    rows = []
+    cleared = []
+    for question_name, option_value in answers.items():
+        if isinstance(option_value, list):
+            option_value = option_value[0] if option_value else None
+        if option_value in (None, ""):
+            cleared.append(question_name)
+            continue
+        rows.append({
+            "question": question_name,
+            "idx": positions.get(question_name, 0),
+            "selected_option": _selected_option_text_for_question(question_name, option_value, answer_key),
+            "quiz_result": _quiz_result_for_question(question_name, option_value, answer_key),
+        })
+
+    _upsert_quiz_result_rows(quiz_activity_name, rows, cleared_questions=cleared, exclusive=exclusive)
+
+    if exclusive:
+        answered_count = len(rows)
+        correct_count = sum(1 for row in rows if row["quiz_result"] == "Correct")
+    else:
+        answered_count, correct_count = frappe.db.sql(
+            """
+            SELECT COUNT(*), COALESCE(SUM(quiz_result = 'Correct'), 0)
+            FROM `tabQuiz Result`
+            WHERE parent = %s AND parenttype = 'Quiz Activity' AND parentfield = 'result'
+            """,
+            (quiz_activity_name,),
+        )[0]
+        answered_count, correct_count = int(answered_count), int(correct_count)
+    score_total = total_questions_val if total_questions_val > 0 else max(answered_count, 1)
+    # Drafts have no graded score: store the counters in the same statement as the score.
+    frappe.db.set_value(
+        "Quiz Activity",
+        quiz_activity_name,
+        {
+            "score": f"{answered_count}/{score_total}",
+            **draft_score_fields(correct_count, answered_count, total_questions_val),
+        },
+        update_modified=True,
+    )
+    return answered_count
+
+
+def _apply_public_quiz_progress_delta(
+    quiz_name, student, student_group, attempt_id, delta, seq, total_questions_val, base_seq=0
+):
+    """Upsert only the changed answers of a draft Quiz Activity."""
+    quiz_activity_name = _get_draft_quiz_activity_for_attempt(attempt_id)
+
+    if not quiz_activity_name and base_seq:
+        # Earlier deltas were applied to an activity we can no longer find.
+        return {"status": "resync_required", "message": "Send the full answer map"}
+
+    if not quiz_activity_name:
+        quiz_activity_name = _new_draft_quiz_activity(quiz_name, student, student_group, attempt_id)
+
+    answered_count = _write_draft_progress_rows(quiz_activity_name, quiz_name, delta, total_questions_val)
+    return {
+        "status": "success",
+        "activity_id": quiz_activity_name,
+        "answered_count": answered_count,
+        "total_questions": total_questions_val,
+        "is_completed": False,
+    }
+
+
+def _buffer_public_quiz_progress(
+    quiz_name, student, student_group, attempt_id, seq, total_questions_val, delta=None, answers=None, base_seq=0
+):
+    """Apply a progress update to the attempt's Redis buffer instead of the database."""
+    progress_key = _progress_cache_key(attempt_id)
+
+    def apply(buffer):
+        if quiz_progress_buffer.is_submitted(progress_key):
+            return None, _submitted_progress_response(attempt_id)
+        if not buffer:
+            if _get_graded_activity_for_attempt(attempt_id):
+                # The tombstone expired or was lost; the database still knows it was graded.
+                return None, _submitted_progress_response(attempt_id)
+            if delta is not None and base_seq:
+                # Buffer expired or was lost; the client still holds the full answer map.
+                return None, {"status": "resync_required", "message": "Send the full answer map"}
+            buffer = {
+                "attempt_id": attempt_id,
+                "quiz_name": quiz_name,
+                "student": student,
+                "student_group": student_group,
+                "answers": {},
+                "seq": 0,
+            }
+
+        if seq and seq <= (buffer.get("seq") or 0):
+            return None, {
+                "status": "success",
+                "ignored": True,
+                "seq": seq,
+                "last_seq": buffer.get("seq"),
+                "activity_id": quiz_progress_buffer.get_flush_state(progress_key).get("activity_id"),
+            }
+
+        if delta is not None:
+            for question_name, option_value in delta.items():
+                if isinstance(option_value, list):
+                    option_value = option_value[0] if option_value else None
+                if option_value in (None, ""):
+                    buffer["answers"].pop(question_name, None)
+                else:
+                    buffer["answers"][question_name] = option_value
+        else:
+            buffer["answers"] = _to_answer_map(answers)
+
+        buffer["seq"] = seq or (buffer.get("seq") or 0) + 1
+        buffer["total_questions"] = total_questions_val
+        return buffer, {
+            "status": "success",
+            "buffered": True,
+            "answered_count": len(buffer["answers"]),
+            "total_questions": total_questions_val,
+            "is_completed": False,
+            "seq": buffer["seq"],
+        }
+
+    try:
+        result = quiz_progress_buffer.update_buffer(progress_key, attempt_id, apply)
+    except quiz_progress_buffer.BufferBusy:
+        # Nothing was stored; the client keeps its baseline and resends on the next sync.
+        return {"status": "error", "message": "Quiz progress is busy, retrying"}
+
+    if result.get("buffered"):
+        result["activity_id"] = quiz_progress_buffer.get_flush_state(progress_key).get(
+            "activity_id"
+        ) or _get_quiz_activity_for_attempt(attempt_id)
+    return result
+
+
+def _submitted_progress_response(attempt_id):
+    return {
+        "status": "success",
+        "ignored": True,
+        "submitted": True,
+        "activity_id": _get_quiz_activity_for_attempt(attempt_id),
+    }
+
+
+def flush_public_quiz_progress(attempt_id):
+    """Write an attempt's buffered answers to its draft Quiz Activity and commit.
+
+    Returns the Quiz Activity name, or None when there is nothing to flush or
+    another worker (a flusher or the attempt's submission) holds the flush lock.
+    """
+    progress_key = _progress_cache_key(attempt_id)
+    if not progress_key:
+        return None
+
+    lock_token = quiz_progress_buffer.acquire_flush_lock(attempt_id)
+    if not lock_token:
+        return None
 
+    try:
+        if quiz_progress_buffer.is_submitted(progress_key) or _get_graded_activity_for_attempt(attempt_id):
+            # Graded attempts own their activity; a late autosave must not recreate a draft.
+            quiz_progress_buffer.mark_submitted(progress_key, attempt_id)
+            return None
+
+        buffer = quiz_progress_buffer.get_buffer(progress_key)
+        flush_state = quiz_progress_buffer.get_flush_state(progress_key)
+        if not buffer or (buffer.get("seq") or 0) <= (flush_state.get("seq") or 0):
+            return flush_state.get("activity_id") or _get_quiz_activity_for_attempt(attempt_id)
+
+        quiz_activity_name = _get_draft_quiz_activity_for_attempt(attempt_id, flush_state.get("activity_id"))
+        if not quiz_activity_name:
+            quiz_activity_name = _new_draft_quiz_activity(
+                buffer["quiz_name"], buffer["student"], buffer["student_group"], attempt_id
+            )
+
+        total_questions_val = int(buffer.get("total_questions") or 0) or get_quiz_expected_question_count(
+            buffer["quiz_name"]
+        )
+        _write_draft_progress_rows(
+            quiz_activity_name, buffer["quiz_name"], buffer.get("answers") or {}, total_questions_val, exclusive=True
+        )
+        frappe.db.commit()
+
+        _set_quiz_activity_for_attempt(attempt_id, quiz_activity_name)
+        try:
+            quiz_progress_buffer.mark_flushed(progress_key, attempt_id, buffer["seq"], quiz_activity_name)
+        except quiz_progress_buffer.BufferBusy:
+            # The attempt stays dirty; the next run rewrites the same answers.
+            pass
+        return quiz_activity_name
+    finally:
+        quiz_progress_buffer.release_flush_lock(attempt_id, lock_token)
+
+
+def flush_public_quiz_progress_buffers():
+    """Scheduled: flush attempts whose buffered answers are older than the flush interval."""
+    started = time.time()
+    interval = quiz_progress_buffer.get_flush_interval()
+    flushed = failed = 0
+    for attempt_id in quiz_progress_buffer.get_dirty_attempts():
+        buffer = quiz_progress_buffer.get_buffer(_progress_cache_key(attempt_id))
+        if not buffer:
+            quiz_progress_buffer.discard_buffer(_progress_cache_key(attempt_id), attempt_id)
+            continue
+        if started - (buffer.get("dirty_since") or started) < interval:
+            continue
+        try:
+            if flush_public_quiz_progress(attempt_id):
+                flushed += 1
+        except Exception:
+            failed += 1
+            frappe.db.rollback()
+            diag.error(
+                "Error flushing quiz progress for attempt {}",
+                attempt_id,
+                title="Public Quiz Progress Flush",
+            )
+    quiz_progress_buffer.record_flush_run(flushed, failed, time.time() - started)
+    return {"flushed": flushed, "failed": failed}
+
+
+def recover_public_quiz_progress_buffers():
+    """Scheduled: re-queue buffers that never made it into the dirty set."""
+    return quiz_progress_buffer.find_unflushed_buffers("public_quiz_activity:")
+
+
+@frappe.whitelist()
+def get_public_quiz_progress_buffer_stats():
+    """Write-behind metric: buffered attempts and how far the oldest lags behind the database."""
+    if not _is_admin_or_system_manager():
+        frappe.throw(_("Not permitted"), frappe.PermissionError)
+    return {"status": "success", **quiz_progress_buffer.get_buffer_stats(_progress_cache_key)}
+
+
+@frappe.whitelist(allow_guest=True, methods=["POST"])
+def upsert_public_quiz_progress(
+    quiz_name,
+    student,
+    student_group,
+    answers=None,
+    attempt_id=None,
+    total_questions=None,
+    delta=None,
+    seq=None,
+    base_seq=None,
+):
+    """Persist draft Quiz Activity as user answers questions one-by-one.
+
+    Clients send either the full `answers` map or a `delta` of changed answers
+    (None clears an answer) with an increasing `seq`; stale or duplicate
+    sequence numbers are acknowledged and ignored. `base_seq` is the last seq
+    the client saw acknowledged, so a delta on top of lost state asks for a resync.
+
+    With write-behind enabled the update only touches the attempt's Redis
+    buffer; `flush_public_quiz_progress_buffers` writes it to the database.
+    """
     try:
         if not quiz_name or not student or not student_group:
             return {"status": "error", "message": "Quiz, student, and student group are required"}
 
+        try:
+            seq = int(seq or 0)
+            base_seq = int(base_seq or 0)
+        except (TypeError, ValueError):
+            seq = base_seq = 0
+        write_behind = bool(attempt_id) and quiz_progress_buffer.is_write_behind_enabled()
+        if seq and attempt_id and not write_behind:
+            # Claim the seq up front: a concurrent older update is then ignored, and a
+            # failed write leaves the client's baseline unmoved so it resends the answers.
+            last_seq = _claim_progress_seq(attempt_id, seq)
+            if last_seq:
+                return _stale_progress_response(attempt_id, seq, last_seq)
+
         eligibility = get_assessment_eligibility(student, student_group)
         if not eligibility.get("eligible"):
             return {"status": "error", "message": eligibility.get("message"), "eligibility": eligibility}
 
+        total_questions_val = int(total_questions or 0) or get_quiz_expected_question_count(quiz_name)
+
+        if isinstance(delta, str):
+            try:
+                delta = json.loads(delta)
+            except Exception:
+                delta = {}
+
+        if write_behind:
+            if isinstance(answers, str):
+                try:
+                    answers = json.loads(answers)
+                except Exception:
+                    answers = {}
+            return _buffer_public_quiz_progress(
+                quiz_name,
+                student,
+                student_group,
+                attempt_id,
+                seq,
+                total_questions_val,
+                delta=delta if delta is not None and seq else None,
+                answers=answers,
+                base_seq=base_seq,
+            )
+
+        if delta is not None and attempt_id and seq:
+            result = _apply_public_quiz_progress_delta(
+                quiz_name, student, student_group, attempt_id, delta or {}, seq, total_questions_val, base_seq
+            )
+            if result.get("status") != "success":
+                return result
+            if not _is_latest_progress_seq(attempt_id, seq):
+                frappe.db.rollback()
+                return _stale_progress_response(attempt_id, seq, _claim_progress_seq(attempt_id, seq))
+            frappe.db.commit()
+            _set_quiz_activity_for_attempt(attempt_id, result["activity_id"])
+            return dict(result, seq=seq)
+
         if isinstance(answers, str):
             try:
                 answers = json.loads(answers)
@@ -223,33 +783,31 @@ def upsert_public_quiz_progress(quiz_name, student, student_group, answers=None,
                 answers = {}
 
         answer_map = _to_answer_map(answers)
-        total_questions_val = int(total_questions or 0) or get_quiz_expected_question_count(quiz_name)
         answered_count = len([v for v in answer_map.values() if v not in (None, "")])
 
-        quiz_activity_name = _get_quiz_activity_for_attempt(attempt_id)
-        quiz_activity = None
-        if quiz_activity_name and frappe.db.exists("Quiz Activity", quiz_activity_name):
+        quiz_activity_name = _get_draft_quiz_activity_for_attempt(attempt_id)
+        if quiz_activity_name:
             quiz_activity = frappe.get_doc("Quiz Activity", quiz_activity_name)
-            if quiz_activity.docstatus != 0:
-                quiz_activity = None
-
-        if not quiz_activity:
+        else:
             quiz_activity = frappe.new_doc("Quiz Activity")
             quiz_activity.student = student
             quiz_activity.quiz = quiz_name
             quiz_activity.activity_date = today()
             if hasattr(quiz_activity, "custom_student_group"):
                 quiz_activity.custom_student_group = student_group
+            if attempt_id and hasattr(quiz_activity, "custom_attempt_id"):
+                quiz_activity.custom_attempt_id = attempt_id
 
         quiz_activity.flags.skip_assessment_auto_create = True
         quiz_activity.result = []
+        answer_key = get_quiz_answer_key(quiz_name)
         for question_name, option_id in answer_map.items():
             if option_id in (None, ""):
                 continue
             quiz_activity.append("result", {
                 "question": question_name,
-                "selected_option": _selected_option_text_for_question(question_name, option_id),
-                "quiz_result": _quiz_result_for_question(question_name, option_id)
+                "selected_option": _selected_option_text_for_question(question_name, option_id, answer_key),
+                "quiz_result": _quiz_result_for_question(question_name, option_id, answer_key)
             })
 
         if total_questions_val > 0:
@@ -258,6 +816,9 @@ def upsert_public_quiz_progress(quiz_name, student, student_group, answers=None,
             quiz_activity.score = f"{answered_count}/{max(answered_count, 1)}"
 
         _save_quiz_activity_with_replaceable_results(quiz_activity, ignore_mandatory=True)
+        if attempt_id and not _is_latest_progress_seq(attempt_id, seq):
+            frappe.db.rollback()
+            return _stale_progress_response(attempt_id, seq, _claim_progress_seq(attempt_id, seq))
         frappe.db.commit()
 
         _set_quiz_activity_for_attempt(attempt_id, quiz_activity.name)
@@ -268,13 +829,11 @@ def upsert_public_quiz_progress(quiz_name, student, student_group, answers=None,
             "answered_count": answered_count,
             "total_questions": total_questions_val,
             "is_completed": False,
+            "seq": seq,
         }
     except Exception as e:
         frappe.db.rollback()
-        frappe.log_error(
-            f"Error saving public quiz progress: {str(e)}\nTraceback: {frappe.get_traceback()}",
-            "Public Quiz Progress",
-        )
+        diag.error("Error saving public quiz progress: {}", str(e), title="Public Quiz Progress")
         return {"status": "error", "message": "Failed to save quiz progress"}
 
 
@@ -300,6 +859,12 @@ def log_public_quiz_audit(event_type, quiz_name=None, student=None, student_grou
 def get_student_groups(academic_year=None, course=None, from_date=None, to_date=None):
     """Get student groups with optional filters"""
     try:
+        etag = make_etag(
+            "student_groups", get_student_group_list_version(), academic_year, course, from_date, to_date
+        )
+        if is_not_modified(etag):
+            return NOT_MODIFIED
+
         filters = {"disabled": 0}
         
         # Add filters based on parameters
@@ -331,7 +896,7 @@ def get_student_groups(academic_year=None, course=None, from_date=None, to_date=
             "student_groups": student_groups
         }
     except Exception as e:
-        frappe.log_error(f"Error getting student groups: {str(e)}", "Quiz API")
+        diag.error("Error getting student groups: {}", str(e), title="Quiz API")
         return {
             "status": "error",
             "message": "Failed to load student groups"
@@ -341,6 +906,9 @@ def get_student_groups(academic_year=None, course=None, from_date=None, to_date=
 def get_academic_years():
     """Get all academic years from student groups"""
     try:
+        if is_not_modified(make_etag("academic_years", get_student_group_list_version())):
+            return NOT_MODIFIED
+
         academic_years = frappe.get_all(
             "Student Group",
             fields=["academic_year"],
@@ -363,7 +931,7 @@ def get_academic_years():
             "academic_years": formatted_years
         }
     except Exception as e:
-        frappe.log_error(f"Error getting academic years: {str(e)}", "Quiz API")
+        diag.error("Error getting academic years: {}", str(e), title="Quiz API")
         return {
             "status": "error",
             "message": "Failed to load academic years"
@@ -373,6 +941,9 @@ def get_academic_years():
 def get_courses():
     """Get all courses from student groups"""
     try:
+        if is_not_modified(make_etag("courses", get_student_group_list_version())):
+            return NOT_MODIFIED
+
         courses = frappe.get_all(
             "Student Group",
             fields=["course"],
@@ -395,7 +966,7 @@ def get_courses():
             "courses": formatted_courses
         }
     except Exception as e:
-        frappe.log_error(f"Error getting courses: {str(e)}", "Quiz API")
+        diag.error("Error getting courses: {}", str(e), title="Quiz API")
         return {
             "status": "error",
             "message": "Failed to load courses"
@@ -424,7 +995,7 @@ def get_students_by_group(student_group):
             "students": students
         }
     except Exception as e:
-        frappe.log_error(f"Error getting students by group: {str(e)}", "Quiz API")
+        diag.error("Error getting students by group: {}", str(e), title="Quiz API")
         return {
             "status": "error",
             "message": "Failed to load students"
@@ -485,7 +1056,7 @@ def get_course_evaluation_prefill(student_group=None, student=None):
             },
         }
     except Exception as e:
-        frappe.log_error(f"Error building course evaluation prefill: {str(e)}", "Quiz API")
+        diag.error("Error building course evaluation prefill: {}", str(e), title="Quiz API")
         return {
             "status": "error",
             "message": "Failed to build prefill values",
@@ -495,13 +1066,10 @@ def get_course_evaluation_prefill(student_group=None, student=None):
 def get_available_quizzes(student_group, student):
     """Get available quizzes for a student in a specific group"""
     try:
-        print(f"=== QUIZ API DEBUG START ===")
-        print(f"Input - Student Group: {student_group}, Student: {student}")
-        frappe.log_error(f"=== QUIZ API DEBUG START ===", "Quiz API Debug")
-        frappe.log_error(f"Input - Student Group: {student_group}, Student: {student}", "Quiz API Debug")
+        diag.debug("Input - Student Group: {}, Student: {}", student_group, student)
         
         if not student_group or not student:
-            print("ERROR: Missing student_group or student")
+            diag.debug("ERROR: Missing student_group or student")
             return {
                 "status": "error",
                 "message": "Student group and student are required"
@@ -519,12 +1087,10 @@ def get_available_quizzes(student_group, student):
         # Get the student group details
         student_group_doc = frappe.get_doc("Student Group", student_group)
         course_name = student_group_doc.course
-        print(f"Student Group Course: {course_name}")
-        frappe.log_error(f"Student Group Course: {course_name}", "Quiz API Debug")
+        diag.debug("Student Group Course: {}", course_name)
         
         if not course_name:
-            print("ERROR: No course found for student group")
-            frappe.log_error(f"No course found for student group {student_group}", "Quiz API Debug")
+            diag.debug("No course found for student group {}", student_group)
             return {
                 "status": "success",
                 "quizzes": []
@@ -536,30 +1102,25 @@ def get_available_quizzes(student_group, student):
             filters={"title": course_name},
             fields=["name", "title"]
         )
-        print(f"Found LMS Courses: {lms_courses}")
-        frappe.log_error(f"Found LMS Courses: {lms_courses}", "Quiz API Debug")
+        diag.debug("Found LMS Courses: {}", lms_courses)
         
         if not lms_courses:
-            print(f"ERROR: No LMS Course found with title: {course_name}")
-            frappe.log_error(f"No LMS Course found with title: {course_name}", "Quiz API Debug")
+            diag.debug("No LMS Course found with title: {}", course_name)
             return {
                 "status": "success",
                 "quizzes": []
             }
         
         lms_course = lms_courses[0].name
-        print(f"Using LMS Course: {lms_course}")
-        frappe.log_error(f"Using LMS Course: {lms_course}", "Quiz API Debug")
+        diag.debug("Using LMS Course: {}", lms_course)
         
         # Get the User ID from the Student record
         student_doc = frappe.get_doc("Student", student)
         user_id = student_doc.student_email_id
-        print(f"Student {student} maps to User: {user_id}")
-        frappe.log_error(f"Student {student} maps to User: {user_id}", "Quiz API Debug")
+        diag.debug("Student {} maps to User: {}", student, user_id)
         
         if not user_id:
-            print(f"ERROR: No User ID found for Student {student}")
-            frappe.log_error(f"No User ID found for Student {student}", "Quiz API Debug")
+            diag.debug("No User ID found for Student {}", student)
             return {
                 "status": "success",
                 "quizzes": []
@@ -575,116 +1136,35 @@ def get_available_quizzes(student_group, student):
             },
             fields=["name", "member", "course", "member_type"]
         )
-        print(f"LMS Enrollment check for user {user_id} in course {lms_course}: {enrollment}")
-        frappe.log_error(f"Enrollment found: {len(enrollment)} records", "Quiz API Debug")
+        diag.debug("LMS Enrollment check for user {} in course {}: {}", user_id, lms_course, enrollment)
+        diag.debug("Enrollment found: {} records", len(enrollment))
         
         if not enrollment:
-            print(f"ERROR: User {user_id} not enrolled in LMS course {lms_course}")
-            frappe.log_error(f"User {user_id} not enrolled in LMS course {lms_course} (Course: {course_name})", "Quiz API Debug")
+            diag.debug("User {} not enrolled in LMS course {} (Course: {})", user_id, lms_course, course_name)
             # Let's also check all enrollments for this user
             all_enrollments = frappe.get_all(
                 "LMS Enrollment",
                 filters={"member": user_id},
                 fields=["name", "member", "course", "member_type"]
             )
-            print(f"All enrollments for user {user_id}: {all_enrollments}")
-            frappe.log_error(f"All enrollments: {len(all_enrollments)} records", "Quiz API Debug")
-            return {
-                "status": "success",
-                "quizzes": []
-            }
-        
-        # Get all course lessons for this course
-        course_lessons = frappe.get_all(
-            "Course Lesson",
-            filters={"course": lms_course},
-            fields=["name", "title", "content"]
-        )
-        print(f"Found {len(course_lessons)} course lessons for course {lms_course}")
-        frappe.log_error(f"Found {len(course_lessons)} course lessons for course {lms_course}", "Quiz API Debug")
-        
-        quiz_ids = []
-        
-        # Extract quiz IDs from course lesson content
-        for lesson in course_lessons:
-            print(f"Processing lesson: {lesson['name']} - {lesson['title']}")
-            frappe.log_error(f"Processing lesson: {lesson['name']} - {lesson['title']}", "Quiz API Debug")
-            
-            if lesson.get('content'):
-                print(f"Lesson has content, length: {len(lesson['content'])}")
-                frappe.log_error(f"Lesson has content, length: {len(lesson['content'])}", "Quiz API Debug")
-                try:
-                    import json
-                    content = json.loads(lesson['content'])
-                    print(f"Parsed content: {content}")
-                    frappe.log_error(f"Content parsed successfully", "Quiz API Debug")
-                    
-                    # Look for quiz blocks in the content
-                    for block in content.get("blocks", []):
-                        print(f"Processing block: {block}")
-                        frappe.log_error(f"Processing block type: {block.get('type', 'unknown')}", "Quiz API Debug")
-                        
-                        if block.get("type") == "quiz":
-                            quiz_id = block.get("data", {}).get("quiz")
-                            print(f"Found quiz block with ID: {quiz_id}")
-                            frappe.log_error(f"Found quiz block with ID: {quiz_id}", "Quiz API Debug")
-                            if quiz_id:
-                                quiz_ids.append(quiz_id)
-                        
-                        # Also check for quizzes in video uploads
-                        if block.get("type") == "upload":
-                            quizzes_in_video = block.get("data", {}).get("quizzes", [])
-                            print(f"Found upload block with quizzes: {quizzes_in_video}")
-                            frappe.log_error(f"Found upload block with {len(quizzes_in_video)} quizzes", "Quiz API Debug")
-                            for quiz_row in quizzes_in_video:
-                                if quiz_row.get("quiz"):
-                                    quiz_ids.append(quiz_row.get("quiz"))
-                
-                except (json.JSONDecodeError, KeyError) as e:
-                    print(f"ERROR parsing lesson content for {lesson['name']}: {str(e)}")
-                    frappe.log_error(f"Error parsing lesson content for {lesson['name']}: {str(e)}", "Quiz API Debug")
-                    continue
-            else:
-                print(f"Lesson {lesson['name']} has no content")
-                frappe.log_error(f"Lesson {lesson['name']} has no content", "Quiz API Debug")
-        
-        # Remove duplicates
-        quiz_ids = list(set(quiz_ids))
-        print(f"Found {len(quiz_ids)} unique quiz IDs: {quiz_ids}")
-        frappe.log_error(f"Found {len(quiz_ids)} unique quiz IDs: {quiz_ids}", "Quiz API Debug")
-        
-        if not quiz_ids:
-            print("ERROR: No quiz IDs found in any course lessons")
-            frappe.log_error("ERROR: No quiz IDs found in any course lessons", "Quiz API Debug")
+            diag.debug("All enrollments for user {}: {}", user_id, all_enrollments)
+            diag.debug("All enrollments: {} records", len(all_enrollments))
             return {
                 "status": "success",
                 "quizzes": []
             }
         
-        # Get quiz details
-        print(f"Fetching quiz details for IDs: {quiz_ids}")
-        frappe.log_error(f"Fetching quiz details for IDs: {quiz_ids}", "Quiz API Debug")
+        # Quizzes embedded in lesson content come from the lesson -> quiz index.
+        quizzes = get_course_quizzes(lms_course)
+        diag.debug("Found {} quizzes: {}", len(quizzes), quizzes)
         
-        quizzes = frappe.get_all(
-            "LMS Quiz",
-            filters={"name": ["in", quiz_ids]},
-            fields=["name", "title", "total_marks", "passing_percentage", "max_attempts"],
-            order_by="title"
-        )
-        
-        print(f"Found {len(quizzes)} quizzes: {quizzes}")
-        frappe.log_error(f"Found {len(quizzes)} quizzes: {quizzes}", "Quiz API Debug")
-        
-        print(f"=== QUIZ API DEBUG END ===")
-        frappe.log_error(f"=== QUIZ API DEBUG END ===", "Quiz API Debug")
         
         return {
             "status": "success",
             "quizzes": quizzes
         }
     except Exception as e:
-        print(f"EXCEPTION in quiz API: {str(e)}")
-        frappe.log_error(f"Error getting available quizzes: {str(e)}", "Quiz API Debug")
+        diag.warning("Error getting available quizzes: {}", str(e))
         return {
             "status": "error",
             "message": "Failed to load quizzes"
@@ -694,16 +1174,10 @@ def get_available_quizzes(student_group, student):
 def get_available_quizzes_from_mcqs(student_group, student):
     """Get available quizzes from MCQS Assignment for a student in a specific group"""
     try:
-        print("=" * 80)
-        print("MCQS QUIZ API DEBUG START")
-        print(f"Input - Student Group: {student_group}, Student: {student}")
-        print("=" * 80)
-        
-        frappe.log_error(f"=== MCQS QUIZ API DEBUG START ===", "MCQS Quiz API")
-        frappe.log_error(f"Input - Student Group: {student_group}, Student: {student}", "MCQS Quiz API")
+        diag.debug("Input - Student Group: {}, Student: {}", student_group, student)
         
         if not student_group or not student:
-            print("ERROR: Missing student_group or student")
+            diag.debug("ERROR: Missing student_group or student")
             return {
                 "status": "error",
                 "message": "Student group and student are required"
@@ -718,318 +1192,73 @@ def get_available_quizzes_from_mcqs(student_group, student):
                 "quizzes": [],
             }
         
-        # Get MCQS Assignment records for this student group
-        # Try both by name (since autoname is format:{student_group}) and by student_group field
-        print(f"\n[STEP 1] Searching for MCQS Assignment by name: {student_group}")
-        mcqs_assignments_by_name = frappe.get_all(
-            "MCQS Assignment",
-            filters={"name": student_group},
-            fields=["name", "student_group", "mcqs"]
-        )
-        print(f"[STEP 1] Found {len(mcqs_assignments_by_name)} assignments by name: {mcqs_assignments_by_name}")
-        
-        print(f"\n[STEP 2] Searching for MCQS Assignment by student_group field: {student_group}")
-        mcqs_assignments_by_field = frappe.get_all(
-            "MCQS Assignment",
-            filters={"student_group": student_group},
-            fields=["name", "student_group", "mcqs"]
+        catalog = get_group_quiz_catalog(student_group)
+        quiz_names = catalog["quiz_names"]
+        diag.debug(
+            "Quiz catalog for {}: {} assignments, quizzes {}",
+            student_group,
+            catalog["assignments"],
+            quiz_names,
         )
-        print(f"[STEP 2] Found {len(mcqs_assignments_by_field)} assignments by field: {mcqs_assignments_by_field}")
-        
-        # Also try to get by partial match in case of naming issues
-        all_mcqs_assignments = frappe.get_all(
-            "MCQS Assignment",
-            fields=["name", "student_group", "mcqs"],
-            limit=100
-        )
-        # Log without truncation by using shorter message
-        frappe.log_error(f"Found {len(all_mcqs_assignments)} total MCQS Assignments", "MCQS Quiz API")
-        
-        # Combine both results and remove duplicates
-        print(f"\n[STEP 3] Combining results...")
-        all_assignments = {}
-        for assignment in mcqs_assignments_by_name + mcqs_assignments_by_field:
-            # Handle both dict and object access
-            assgn_name = assignment.get('name') if isinstance(assignment, dict) else getattr(assignment, 'name', None)
-            if assgn_name:
-                all_assignments[assgn_name] = assignment
-        
-        mcqs_assignments = list(all_assignments.values())
-        print(f"[STEP 3] Total unique assignments: {len(mcqs_assignments)}")
-        for i, assgn in enumerate(mcqs_assignments):
-            assgn_name = assgn.get('name') if isinstance(assgn, dict) else getattr(assgn, 'name', 'N/A')
-            assgn_mcqs = assgn.get('mcqs') if isinstance(assgn, dict) else getattr(assgn, 'mcqs', 'N/A')
-            print(f"  Assignment {i+1}: name={assgn_name}, mcqs={assgn_mcqs}")
-        
-        # If still not found, try to get document directly by name
-        if not mcqs_assignments:
-            try:
-                mcqs_doc = frappe.get_doc("MCQS Assignment", student_group)
-                mcqs_assignments = [{
-                    "name": mcqs_doc.name,
-                    "student_group": mcqs_doc.student_group,
-                    "mcqs": mcqs_doc.mcqs
-                }]
-                frappe.log_error(f"Found MCQS Assignment by direct doc access: {mcqs_assignments}", "MCQS Quiz API")
-            except frappe.DoesNotExistError:
-                frappe.log_error(f"MCQS Assignment document '{student_group}' does not exist", "MCQS Quiz API")
-            except Exception as e:
-                frappe.log_error(f"Error accessing MCQS Assignment document: {str(e)}", "MCQS Quiz API")
-        
-        frappe.log_error(f"Found {len(mcqs_assignments)} MCQS Assignment records", "MCQS Quiz API")
-        for i, assgn in enumerate(mcqs_assignments[:3]):  # Log first 3 only
-            # Handle both dict and object access
-            assgn_name = assgn.get('name') if isinstance(assgn, dict) else getattr(assgn, 'name', 'N/A')
-            assgn_student_group = assgn.get('student_group') if isinstance(assgn, dict) else getattr(assgn, 'student_group', 'N/A')
-            assgn_mcqs = assgn.get('mcqs') if isinstance(assgn, dict) else getattr(assgn, 'mcqs', 'N/A')
-            frappe.log_error(f"Assignment {i+1}: name={assgn_name}, student_group={assgn_student_group}, mcqs={assgn_mcqs}", "MCQS Quiz API")
-        
-        if not mcqs_assignments:
-            frappe.log_error(f"No MCQS Assignment found for student group: {student_group}", "MCQS Quiz API")
+
+        if not catalog["assignments"]:
             return {
                 "status": "success",
                 "quizzes": [],
                 "debug": f"No MCQS Assignment found for student group: {student_group}"
             }
-        
-        # Get unique quiz names from MCQS Assignment
-        print(f"\n[STEP 4] Extracting quiz names from assignments...")
-        quiz_names = []
-        for assignment in mcqs_assignments:
-            # Handle both dict and object access
-            mcqs_value = assignment.get('mcqs') if isinstance(assignment, dict) else getattr(assignment, 'mcqs', None)
-            print(f"  Assignment mcqs value: {mcqs_value} (type: {type(mcqs_value)})")
-            if mcqs_value:
-                quiz_names.append(mcqs_value)
-        quiz_names = list(set(quiz_names))  # Remove duplicates
-        
-        print(f"[STEP 4] Found {len(quiz_names)} unique quiz names: {quiz_names}")
-        frappe.log_error(f"Found {len(quiz_names)} unique quiz names", "MCQS Quiz API")
-        for i, qn in enumerate(quiz_names[:5]):  # Log first 5 only
-            frappe.log_error(f"Quiz {i+1}: {qn}", "MCQS Quiz API")
-        
+
         if not quiz_names:
-            print("[ERROR] MCQS Assignment found but no quizzes linked!")
-            frappe.log_error(f"MCQS Assignment found but no quizzes linked", "MCQS Quiz API")
             return {
                 "status": "success",
                 "quizzes": [],
                 "debug": "MCQS Assignment found but no quizzes are linked. Please check that the 'MCQS' field in MCQS Assignment has a Quiz selected.",
                 "debug_details": {
                     "student_group": student_group,
-                    "assignments_found": len(mcqs_assignments),
+                    "assignments_found": catalog["assignments"],
                     "quiz_names": []
                 }
             }
-        
-        # Get quiz details from Quiz doctype (Education module)
-        # Try by name first (since Quiz autoname is field:title, name = title)
-        print(f"\n[STEP 5] Looking up Quiz records for: {quiz_names}")
-        quizzes = []
-        for quiz_name in quiz_names:
-            quiz_found = False
-            print(f"\n  [STEP 5.{len(quizzes)+1}] Looking for Quiz: '{quiz_name}'")
-            try:
-                # First, try direct document access to see if it exists
-                try:
-                    print(f"    Trying direct access: frappe.get_doc('Quiz', '{quiz_name}')")
-                    quiz_doc = frappe.get_doc("Quiz", quiz_name)
-                    print(f"    ✓ Found Quiz by direct access! name={quiz_doc.name}, title={quiz_doc.title}")
-                    # If we get here, the quiz exists
-                    quizzes.append({
-                        "name": quiz_doc.name,
-                        "title": quiz_doc.title or quiz_doc.name,
-                        "passing_score": getattr(quiz_doc, 'passing_score', 75),
-                        "max_attempts": getattr(quiz_doc, 'max_attempts', 0)
-                    })
-                    frappe.log_error(f"Found Quiz '{quiz_name}' by direct access", "MCQS Quiz API")
-                    quiz_found = True
-                    continue
-                except frappe.DoesNotExistError:
-                    print(f"    ✗ Quiz '{quiz_name}' does not exist (DoesNotExistError)")
-                    # Quiz doesn't exist with this exact name, try get_all
-                    pass
-                except Exception as e:
-                    print(f"    ✗ Error accessing Quiz directly: {str(e)[:150]}")
-                    frappe.log_error(f"Error accessing Quiz '{quiz_name}' directly: {str(e)[:150]}", "MCQS Quiz API")
-                
-                # Try to get quiz by name using get_all
-                if not quiz_found:
-                    print(f"    Trying get_all with name filter: name='{quiz_name}'")
-                    quiz_list = frappe.get_all(
-                        "Quiz",
-                        filters={"name": quiz_name},
-                        fields=["name", "title", "passing_score", "max_attempts"],
-                        limit=1
-                    )
-                    print(f"    get_all result: {quiz_list}")
-                    if quiz_list:
-                        quizzes.extend(quiz_list)
-                        print(f"    ✓ Found Quiz by get_all with name filter!")
-                        frappe.log_error(f"Found Quiz '{quiz_name}' by get_all with name filter", "MCQS Quiz API")
-                        quiz_found = True
-                        continue
-                
-                # Try by title as fallback
-                if not quiz_found:
-                    print(f"    Trying get_all with title filter: title='{quiz_name}'")
-                    quiz_list = frappe.get_all(
-                        "Quiz",
-                        filters={"title": quiz_name},
-                        fields=["name", "title", "passing_score", "max_attempts"],
-                        limit=1
-                    )
-                    print(f"    get_all result: {quiz_list}")
-                    if quiz_list:
-                        quizzes.extend(quiz_list)
-                        print(f"    ✓ Found Quiz by get_all with title filter!")
-                        frappe.log_error(f"Found Quiz '{quiz_name}' by get_all with title filter", "MCQS Quiz API")
-                        quiz_found = True
-                        continue
-                
-                # If still not found, list all quizzes to help debug
-                if not quiz_found:
-                    all_quizzes = frappe.get_all("Quiz", fields=["name", "title"], limit=20)
-                    quiz_info = []
-                    for q in all_quizzes[:10]:  # Show first 10
-                        quiz_info.append(f"name='{q.get('name', 'N/A')}' title='{q.get('title', 'N/A')}'")
-                    frappe.log_error(f"Quiz '{quiz_name}' not found. Available quizzes: {'; '.join(quiz_info)}", "MCQS Quiz API")
-                    
-                    # Also check if there's a similar quiz name (case-insensitive)
-                    similar_quizzes = frappe.get_all(
-                        "Quiz",
-                        filters={"title": ["like", f"%{quiz_name}%"]},
-                        fields=["name", "title"],
-                        limit=5
-                    )
-                    if similar_quizzes:
-                        similar_info = [f"'{q.get('name', 'N/A')}' ({q.get('title', 'N/A')})" for q in similar_quizzes]
-                        frappe.log_error(f"Similar quiz names found: {', '.join(similar_info)}", "MCQS Quiz API")
-                
-            except Exception as e:
-                frappe.log_error(f"Error looking up quiz '{quiz_name}': {str(e)[:150]}", "MCQS Quiz API")
-                continue
-        
-        # Remove duplicates
-        seen = set()
-        unique_quizzes = []
-        for q in quizzes:
-            # Handle both dict and object access
-            quiz_name = q.get('name') if isinstance(q, dict) else getattr(q, 'name', None)
-            if quiz_name and quiz_name not in seen:
-                seen.add(quiz_name)
-                unique_quizzes.append(q)
-        quizzes = unique_quizzes
-        
-        frappe.log_error(f"Found {len(quizzes)} Quiz records", "MCQS Quiz API")
-        
-        print(f"\n[STEP 6] Final quiz count: {len(quizzes)}")
-        if not quizzes:
+
+        if not catalog["quizzes"]:
             quiz_names_str = ", ".join(quiz_names[:3])  # Show first 3 only
-            print(f"[ERROR] No Quiz records found for: {quiz_names_str}")
-            
-            # List all available quizzes for debugging
-            all_quizzes = frappe.get_all("Quiz", fields=["name", "title"], limit=50)
-            print(f"[DEBUG] Available Quizzes in system ({len(all_quizzes)}):")
-            for q in all_quizzes[:20]:
-                q_name = q.get('name') if isinstance(q, dict) else getattr(q, 'name', 'N/A')
-                q_title = q.get('title') if isinstance(q, dict) else getattr(q, 'title', 'N/A')
-                print(f"  - name='{q_name}', title='{q_title}'")
-            
-            frappe.log_error(f"No Quiz records found for: {quiz_names_str}", "MCQS Quiz API")
+            diag.warning("No Quiz records found for: {}", quiz_names_str)
             return {
                 "status": "success",
                 "quizzes": [],
-                "debug": f"Quiz names found in MCQS Assignment ({quiz_names_str}) but no Quiz records exist. Check if Quiz '{quiz_names[0] if quiz_names else 'N/A'}' exists in Quiz doctype.",
+                "debug": f"Quiz names found in MCQS Assignment ({quiz_names_str}) but no Quiz records exist. Check if Quiz '{quiz_names[0]}' exists in Quiz doctype.",
                 "debug_details": {
                     "student_group": student_group,
                     "quiz_names_from_mcqs": quiz_names,
                     "quizzes_found": 0
                 }
             }
-        
-        # Calculate total marks for each quiz
-        print(f"\n[STEP 7] Processing {len(quizzes)} quizzes to calculate total marks...")
-        print(f"[STEP 7] Quizzes list: {quizzes}")
-        quiz_list = []
-        for idx, quiz in enumerate(quizzes):
-            print(f"\n  [STEP 7.{idx+1}] Processing quiz (type: {type(quiz)}): {quiz}")
-            try:
-                # Handle both dict and object access
-                quiz_name = quiz.get('name') if isinstance(quiz, dict) else getattr(quiz, 'name', None)
-                quiz_title = quiz.get('title') if isinstance(quiz, dict) else getattr(quiz, 'title', None)
-                quiz_passing_score = quiz.get('passing_score') if isinstance(quiz, dict) else getattr(quiz, 'passing_score', 75)
-                quiz_max_attempts = quiz.get('max_attempts') if isinstance(quiz, dict) else getattr(quiz, 'max_attempts', 0)
-                
-                print(f"    Quiz name: {quiz_name}, title: {quiz_title}")
-                
-                if not quiz_name:
-                    print(f"    ✗ ERROR: Quiz record has no name!")
-                    frappe.log_error(f"Quiz record has no name: {quiz}", "MCQS Quiz API")
-                    continue
-                
-                # Get total marks from quiz questions
-                print(f"    Getting quiz document: frappe.get_doc('Quiz', '{quiz_name}')")
-                quiz_doc = frappe.get_doc("Quiz", quiz_name)
-                print(f"    Quiz document retrieved: name={quiz_doc.name}, title={quiz_doc.title}")
-                
-                total_marks = 0
-                if hasattr(quiz_doc, 'question') and quiz_doc.question:
-                    print(f"    Quiz has {len(quiz_doc.question)} questions")
-                    # QuizQuestion table doesn't have marks field
-                    # Use default of 1 mark per question, or count questions
-                    # Since QuizQuestion doesn't store marks, we'll use 1 mark per question as default
-                    total_marks = len(quiz_doc.question)
-                    print(f"    Total marks (1 per question): {total_marks}")
-                else:
-                    print(f"    Quiz has no questions or question attribute doesn't exist")
-                    total_marks = 0
-                
-                print(f"    Total marks calculated: {total_marks}")
-                
-                quiz_item = {
-                    "name": quiz_name,
-                    "title": quiz_title or quiz_name,  # Fallback to name if title is None
-                    "total_marks": total_marks,
-                    "passing_percentage": quiz_passing_score or 75,
-                    "max_attempts": quiz_max_attempts or 0
-                }
-                print(f"    ✓ Adding quiz to list: {quiz_item}")
-                quiz_list.append(quiz_item)
-            except frappe.DoesNotExistError as e:
-                quiz_name = quiz.get('name') if isinstance(quiz, dict) else getattr(quiz, 'name', 'Unknown')
-                print(f"    ✗ ERROR: Quiz '{quiz_name}' does not exist: {str(e)}")
-                frappe.log_error(f"Quiz '{quiz_name}' does not exist", "MCQS Quiz API")
-                continue
-            except Exception as e:
-                error_msg = str(e)[:200]  # Truncate error message to avoid issues
-                quiz_name = quiz.get('name') if isinstance(quiz, dict) else getattr(quiz, 'name', 'Unknown')
-                print(f"    ✗ ERROR processing quiz {quiz_name}: {error_msg}")
-                print(f"    Full error: {frappe.get_traceback()}")
-                frappe.log_error(f"Error processing quiz {quiz_name}: {error_msg}\nTraceback: {frappe.get_traceback()}", "MCQS Quiz API")
-                continue
-        
-        print(f"\n[STEP 7] Returning {len(quiz_list)} quizzes")
-        print("=" * 80)
-        print("MCQS QUIZ API DEBUG END")
-        print("=" * 80)
-        
-        frappe.log_error(f"=== MCQS QUIZ API DEBUG END - Returning {len(quiz_list)} quizzes ===", "MCQS Quiz API")
-        
+
+        quiz_list = [
+            {
+                "name": quiz["name"],
+                "title": quiz["title"],
+                "total_marks": quiz["total_marks"],
+                "passing_percentage": quiz["passing_percentage"],
+                "max_attempts": quiz["max_attempts"],
+            }
+            for quiz in catalog["quizzes"]
+        ]
+
         return {
             "status": "success",
             "quizzes": quiz_list,
             "eligibility": eligibility,
             "debug_info": {
                 "student_group": student_group,
-                "assignments_found": len(mcqs_assignments),
+                "assignments_found": catalog["assignments"],
                 "quiz_names_from_mcqs": quiz_names,
                 "quizzes_found": len(quiz_list)
             }
         }
     except Exception as e:
         error_msg = f"Error getting quizzes from MCQS Assignment: {str(e)}"
-        frappe.log_error(error_msg + f"\nTraceback: {frappe.get_traceback()}", "MCQS Quiz API")
+        diag.error(error_msg, title="MCQS Quiz API")
         return {
             "status": "error",
             "message": error_msg
@@ -1058,6 +1287,25 @@ def _get_section_profile_for_quiz(quiz_name, student_group=None):
     return frappe.get_doc("Quiz Section Profile", profile_name)
 
 
+def _section_quiz_etag(quiz_name, student_group, lang_code):
+    """ETag for a section-wise payload, resolved from cached stamps without loading the profile."""
+    profile_name = (get_section_profile_name(quiz_name, student_group) if student_group else None) or quiz_name
+    profile_version = get_version_stamp(
+        f"quiz_section_profile:{profile_name}",
+        lambda: frappe.db.get_value("Quiz Section Profile", profile_name, "modified"),
+    )
+    return make_etag(
+        "section_quiz",
+        quiz_name,
+        get_quiz_version(quiz_name),
+        profile_name,
+        profile_version,
+        lang_code,
+        get_quiz_translation_generation(quiz_name),
+        "translated",
+    )
+
+
 @frappe.whitelist(allow_guest=True, methods=["GET", "POST"])
 def get_available_section_quizzes_from_mcqs(student_group, student=None):
     """Return only MCQS assignments configured for Section Wise MCQs."""
@@ -1065,235 +1313,130 @@ def get_available_section_quizzes_from_mcqs(student_group, student=None):
         if not student_group:
             return {"status": "error", "message": "Student group is required"}
 
-        assignments = frappe.get_all(
-            "MCQS Assignment",
-            filters={
-                "student_group": student_group,
-                "assignment_flow": "Section Wise MCQs",
-            },
-            fields=["name", "mcqs", "quiz_section_profile"],
-            order_by="modified desc",
-        )
-
-        quizzes = []
-        seen = set()
-        for assignment in assignments:
-            quiz_name = assignment.get("mcqs")
-            if not quiz_name or quiz_name in seen or not frappe.db.exists("Quiz", quiz_name):
-                continue
-
-            profile_name = assignment.get("quiz_section_profile") or frappe.db.exists("Quiz Section Profile", quiz_name)
-            if not profile_name:
-                continue
-
-            quiz_doc = frappe.get_doc("Quiz", quiz_name)
-            question_count = frappe.db.count("Quiz Question", {"parent": quiz_name})
-            section_count = frappe.db.count("Quiz Section Item", {"parent": profile_name})
-            quizzes.append({
-                "name": quiz_doc.name,
-                "title": quiz_doc.title or quiz_doc.name,
-                "total_marks": question_count,
-                "passing_percentage": quiz_doc.passing_score or 75,
-                "max_attempts": quiz_doc.max_attempts or 0,
-                "quiz_section_profile": profile_name,
-                "section_count": section_count,
-            })
-            seen.add(quiz_name)
+        quizzes = [
+            {
+                "name": quiz["name"],
+                "title": quiz["title"],
+                "total_marks": quiz["total_marks"],
+                "passing_percentage": quiz["passing_percentage"],
+                "max_attempts": quiz["max_attempts"],
+                "quiz_section_profile": quiz["quiz_section_profile"],
+                "section_count": quiz["section_count"],
+            }
+            for quiz in get_group_quiz_catalog(student_group)["section_quizzes"]
+        ]
 
         return {
             "status": "success",
             "quizzes": quizzes,
         }
     except Exception as e:
-        frappe.log_error(
-            f"Error getting section quizzes: {str(e)}\nTraceback: {frappe.get_traceback()}",
-            "Section Quiz API",
-        )
+        diag.error("Error getting section quizzes: {}", str(e), title="Section Quiz API")
         return {"status": "error", "message": "Failed to load section quizzes"}
 
 
-def _normalize_quiz_language(lang):
-    """Normalize incoming language code for quiz content localization."""
-    if not lang:
-        return "en"
-    code = str(lang).strip().lower()
-    if code.startswith("zh"):
-        return "zh"
-    if code.startswith("hi"):
-        return "hi"
-    if code.startswith("ar"):
-        return "ar"
-    if code.startswith("ur"):
-        return "ur"
-    return "en"
-
-
-def _lookup_translation(text, lang_code):
-    """Try direct Translation doctype lookup for runtime content strings."""
-    if not text or lang_code == "en":
-        return ""
-
-    try:
-        translated = frappe.db.get_value(
-            "Translation",
-            {"language": lang_code, "source_text": text},
-            "translated_text",
-        )
-        if translated:
-            return translated
-
-        stripped = text.strip()
-        if stripped and stripped != text:
-            translated = frappe.db.get_value(
-                "Translation",
-                {"language": lang_code, "source_text": stripped},
-                "translated_text",
-            )
-            if translated:
-                return translated
-    except Exception:
-        # Ignore lookup failures and fall back to standard translation resolver.
-        pass
-
-    return ""
-
-
-def _google_target_lang(lang_code):
-    if lang_code == "zh":
-        return "zh-CN"
-    return lang_code
-
-
-def _google_translate_text(text, lang_code, timeout_sec=4):
-    """Translate text with Google public translate endpoint."""
-    if not text or lang_code == "en":
-        return ""
-
-    try:
-        q = urllib.parse.quote(text)
-        target = urllib.parse.quote(_google_target_lang(lang_code))
-        url = (
-            "https://translate.googleapis.com/translate_a/single"
-            f"?client=gtx&sl=auto&tl={target}&dt=t&q={q}"
-        )
-        req = urllib.request.Request(
-            url,
-            headers={"User-Agent": "Mozilla/5.0"},
-        )
-        with urllib.request.urlopen(req, timeout=timeout_sec) as resp:
-            payload = resp.read().decode("utf-8", errors="ignore")
-        data = json.loads(payload)
-        if not isinstance(data, list) or not data or not isinstance(data[0], list):
-            return ""
-        parts = []
-        for chunk in data[0]:
-            if isinstance(chunk, list) and chunk and chunk[0]:
-                parts.append(str(chunk[0]))
-        return "".join(parts).strip()
-    except Exception:
-        return ""
-
-
-def _save_translation(source_text, translated_text, lang_code):
-    if not source_text or not translated_text or lang_code == "en":
-        return
-
-    try:
-        existing_name = frappe.db.exists(
-            "Translation",
-            {"language": lang_code, "source_text": source_text},
-        )
-        if existing_name:
-            if frappe.db.get_value("Translation", existing_name, "translated_text") != translated_text:
-                frappe.db.set_value("Translation", existing_name, "translated_text", translated_text, update_modified=False)
-            return
-
-        doc = frappe.get_doc(
-            {
-                "doctype": "Translation",
-                "language": lang_code,
-                "source_text": source_text,
-                "translated_text": translated_text,
-            }
-        )
-        doc.insert(ignore_permissions=True)
-    except Exception:
-        pass
-
-
-def _enqueue_translation_if_missing(text, lang_code):
-    """Queue translation without blocking request latency."""
-    if not text or lang_code == "en":
-        return
-
-    # Per-request dedupe
-    req_cache = getattr(frappe.local, "quiz_translation_cache", None)
-    if req_cache is None:
-        req_cache = {}
-        frappe.local.quiz_translation_cache = req_cache
-
-    cache_key = f"{lang_code}::{text}"
-    if cache_key in req_cache:
-        return
-    req_cache[cache_key] = True
-
-    # Cross-request throttle to avoid enqueue storms for same source text.
-    try:
-        cache = frappe.cache()
-        throttle_key = f"quiz_translate_enqueue::{cache_key}"
-        if cache.get_value(throttle_key):
-            return
-        cache.set_value(throttle_key, 1, expires_in_sec=600)
-    except Exception:
-        pass
-
-    try:
-        frappe.enqueue(
-            "numerouno.numerouno.api.quiz_api.translate_and_store_text",
-            queue="short",
-            timeout=120,
-            source_text=text,
-            lang_code=lang_code,
-            enqueue_after_commit=True,
-        )
-    except Exception:
-        pass
-
-
 def translate_and_store_text(source_text, lang_code):
-    """Background job: translate and persist into Translation doctype."""
-    if not source_text or not lang_code or lang_code == "en":
-        return
+    """Background job kept for translation jobs queued before batching."""
+    translate_missing_texts([source_text], lang_code)
 
-    if _lookup_translation(source_text, lang_code):
-        return
 
-    translated = _google_translate_text(source_text, lang_code)
-    if translated:
-        _save_translation(source_text, translated, lang_code)
-
-
-def _tr_text(value, lang_code="en"):
-    text = value or ""
-    if not text:
-        return ""
+def _build_quiz_payload(quiz_name, lang_code="en"):
+    """Compile quiz metadata, questions and options for one language in bulk queries.
 
-    translated = _lookup_translation(text, lang_code)
-    if translated:
-        return translated
-
-    # Hybrid mode:
-    # 1) Try quick inline translation so first load can show translated text.
-    # 2) If it fails, queue background translation and return source text.
-    translated = _google_translate_text(text, lang_code, timeout_sec=1.5)
-    if translated:
-        _save_translation(text, translated, lang_code)
-        return translated
-
-    # Non-blocking fallback
-    _enqueue_translation_if_missing(text, lang_code)
+    Returns `(payload, ttl)` for `get_versioned_quiz_value`.
+    """
+    quiz = frappe.db.get_value(
+        "Quiz",
+        quiz_name,
+        ["name", "title", "passing_score", "max_attempts"],
+        as_dict=True,
+    )
+    if not quiz:
+        raise frappe.DoesNotExistError(f"Quiz {quiz_name} not found")
+
+    quiz_questions = frappe.get_all(
+        "Quiz Question",
+        filters={"parent": quiz_name, "parenttype": "Quiz"},
+        fields=["question_link", "idx", "custom_section_key"],
+        order_by="idx asc",
+    )
+    question_links = list({row.question_link for row in quiz_questions if row.question_link})
+
+    question_rows = {}
+    options_by_question = {}
+    if question_links:
+        for row in frappe.get_all(
+            "Question",
+            filters={"name": ["in", question_links]},
+            fields=["name", "question", "question_type"],
+        ):
+            question_rows[row.name] = row
+
+        for opt in frappe.get_all(
+            "Options",
+            filters={"parent": ["in", question_links], "parenttype": "Question"},
+            fields=["parent", "option", "is_correct", "idx"],
+            order_by="parent asc, idx asc",
+        ):
+            options_by_question.setdefault(opt.parent, []).append(opt)
+
+    texts = [quiz.title]
+    for question_name in question_links:
+        if question_name in question_rows:
+            texts.append(question_rows[question_name].question)
+        texts.extend(opt.option for opt in options_by_question.get(question_name, []))
+    translations, missing = resolve_translations(texts, lang_code)
+
+    def tr(value):
+        return translations.get(value, value) if value else ""
+
+    questions = []
+    for quiz_question in quiz_questions:
+        question = question_rows.get(quiz_question.question_link)
+        if not question:
+            continue
+
+        question_data = {
+            "name": question.name,
+            "question": tr(question.question),
+            "type": question.question_type or "Single Correct Answer",
+            "marks": 1,  # Quiz Question doesn't store marks
+            "section_key": (quiz_question.custom_section_key or "").strip(),
+            "options": [],
+        }
+        for opt_idx, opt in enumerate(options_by_question.get(question.name, [])):
+            option_text = tr(opt.option)
+            if option_text:
+                question_data["options"].append({
+                    "id": opt_idx + 1,
+                    "text": option_text,
+                    "is_correct": opt.is_correct or 0,
+                })
+        questions.append(question_data)
 
-    return _(text)
+    payload = {
+        "quiz": {
+            "name": quiz.name,
+            "title": tr(quiz.title),
+            "total_marks": len(questions),
+            "passing_percentage": quiz.passing_score or 75,
+            "max_attempts": quiz.max_attempts or 0,
+        },
+        "questions": questions,
+    }
+    # Untranslated strings are being filled in the background; re-check soon.
+    payload["translations_pending"] = bool(missing)
+    return payload, (QUIZ_PARTIAL_PAYLOAD_TTL if missing else QUIZ_PAYLOAD_TTL)
+
+
+def get_compiled_quiz_payload(quiz_name, lang_code="en"):
+    """Return the cached language-specific quiz payload, rebuilding it when the quiz or its translations change."""
+    return get_versioned_quiz_value(
+        "payload",
+        quiz_name,
+        lambda name: _build_quiz_payload(name, lang_code),
+        suffix=f"{lang_code}:{get_quiz_translation_generation(quiz_name)}",
+    )
 
 
 @frappe.whitelist(allow_guest=True, methods=['GET', 'POST'])
@@ -1301,117 +1444,38 @@ def get_quiz_questions_from_quiz(quiz_name, lang=None):
     """Get quiz questions from Quiz doctype (Education module)"""
     previous_lang = getattr(frappe.local, "lang", None)
     try:
-        lang_code = _normalize_quiz_language(lang)
+        lang_code = normalize_quiz_language(lang)
         frappe.local.lang = lang_code
-        print(f"\n{'='*80}")
-        print(f"GET QUIZ QUESTIONS - Quiz: {quiz_name}, Lang: {lang_code}")
-        print(f"{'='*80}")
-        
+
         if not quiz_name:
             return {
                 "status": "error",
                 "message": "Quiz name is required"
             }
-        
-        # Get quiz details
-        print(f"Getting Quiz document: {quiz_name}")
-        quiz_doc = frappe.get_doc("Quiz", quiz_name)
-        quiz_title = _tr_text(quiz_doc.title, lang_code)
-        print(f"Quiz found: {quiz_doc.name} - {quiz_title}")
-        
-        # Reload to ensure we have all child table entries
-        quiz_doc.reload()
-        print(f"Quiz reloaded. Checking question table...")
-        
-        # Get questions - use direct database query to ensure we get all questions
-        questions_in_db = frappe.get_all(
-            "Quiz Question",
-            filters={"parent": quiz_name},
-            fields=["name", "question_link", "idx"],
-            order_by="idx"
-        )
-        print(f"Direct DB query found {len(questions_in_db)} Quiz Question records")
-        for qq in questions_in_db:
-            print(f"  DB Record: name={qq.get('name')}, question_link={qq.get('question_link')}, idx={qq.get('idx')}")
-        
-        # Also check document's child table for comparison
-        doc_question_count = len(quiz_doc.question) if quiz_doc.question else 0
-        print(f"Quiz document has {doc_question_count} questions in question table")
-        
-        # Use database query results instead of document child table to ensure we get all questions
-        questions = []
-        question_links_to_process = [qq.get('question_link') for qq in questions_in_db if qq.get('question_link')]
-        
-        print(f"Processing {len(question_links_to_process)} questions from database query...")
-        for idx, question_link in enumerate(question_links_to_process):
-            print(f"\n  Processing question {idx+1} of {len(question_links_to_process)}:")
-            print(f"    Question Link: {question_link}")
-            
-            if not question_link:
-                print(f"    ✗ ERROR: QuizQuestion has no question_link")
-                continue
-                
-            try:
-                question_doc = frappe.get_doc("Question", question_link)
-                print(f"    Question document: {question_doc.name}")
-                print(f"    Question type: {getattr(question_doc, 'question_type', 'N/A')}")
-                
-                question_data = {
-                    "name": question_doc.name,
-                    "question": _tr_text(question_doc.question, lang_code),
-                    "type": getattr(question_doc, 'question_type', 'Single Correct Answer'),
-                    "marks": 1,  # Default to 1 mark since QuizQuestion doesn't have marks
-                    "options": []
-                }
-                
-                # Question doctype uses 'options' table (child table)
-                # Options table has: 'option' (text) and 'is_correct' (checkbox)
-                if hasattr(question_doc, 'options') and question_doc.options:
-                    print(f"    Question has {len(question_doc.options)} options")
-                    for opt_idx, opt in enumerate(question_doc.options):
-                        option_text = _tr_text(getattr(opt, 'option', ''), lang_code)
-                        is_correct = getattr(opt, 'is_correct', 0)
-                        if option_text:
-                            question_data["options"].append({
-                                "id": opt_idx + 1,
-                                "text": option_text,
-                                "is_correct": is_correct
-                            })
-                            print(f"      Option {opt_idx+1}: {option_text} (correct: {is_correct})")
-                else:
-                    print(f"    ✗ WARNING: Question has no options table")
-                
-                questions.append(question_data)
-                print(f"    ✓ Question {idx+1} added successfully (Total: {len(questions)})")
-            except Exception as e:
-                print(f"    ✗ ERROR loading question {question_link}: {str(e)}")
-                frappe.log_error(f"Error loading question {question_link}: {str(e)}\nTraceback: {frappe.get_traceback()}", "Quiz API")
-                continue
-        
-        if not questions:
-            print(f"✗ WARNING: No questions were successfully loaded!")
-        
-        # Calculate total marks (1 per question since QuizQuestion doesn't store marks)
-        total_marks = len(questions)
-        print(f"\nTotal questions: {len(questions)}, Total marks: {total_marks}")
-        print(f"{'='*80}\n")
-        
+
+        # A payload still missing translations gets no ETag; the translated rebuild
+        # would otherwise share its quiz version and be answered with a 304.
+        payload = get_compiled_quiz_payload(quiz_name, lang_code)
+        if not payload.get("translations_pending") and is_not_modified(
+            make_etag(
+                "quiz",
+                quiz_name,
+                get_quiz_version(quiz_name),
+                lang_code,
+                get_quiz_translation_generation(quiz_name),
+                "translated",
+            )
+        ):
+            return NOT_MODIFIED
+
         return {
             "status": "success",
-            "quiz": {
-                "name": quiz_doc.name,
-                "title": quiz_title,
-                "total_marks": total_marks,
-                "passing_percentage": quiz_doc.passing_score or 75,
-                "max_attempts": quiz_doc.max_attempts or 0
-            },
-            "questions": questions
+            "quiz": payload["quiz"],
+            "questions": payload["questions"],
         }
     except Exception as e:
         error_msg = f"Error getting quiz questions: {str(e)}"
-        print(f"\n✗ ERROR: {error_msg}")
-        print(f"Traceback: {frappe.get_traceback()}")
-        frappe.log_error(f"{error_msg}\nTraceback: {frappe.get_traceback()}", "Quiz API")
+        diag.error(error_msg, title="Quiz API")
         return {
             "status": "error",
             "message": f"Failed to load quiz questions: {str(e)}"
@@ -1425,13 +1489,18 @@ def get_section_quiz_questions_from_quiz(quiz_name, student_group=None, lang=Non
     """Get Quiz questions grouped by Quiz Section Profile sections."""
     previous_lang = getattr(frappe.local, "lang", None)
     try:
-        lang_code = _normalize_quiz_language(lang)
+        lang_code = normalize_quiz_language(lang)
         frappe.local.lang = lang_code
 
         if not quiz_name:
             return {"status": "error", "message": "Quiz name is required"}
 
-        quiz_doc = frappe.get_doc("Quiz", quiz_name)
+        payload = get_compiled_quiz_payload(quiz_name, lang_code)
+        if not payload.get("translations_pending") and is_not_modified(
+            _section_quiz_etag(quiz_name, student_group, lang_code)
+        ):
+            return NOT_MODIFIED
+
         profile_doc = _get_section_profile_for_quiz(quiz_name, student_group)
         if not profile_doc:
             return {
@@ -1459,90 +1528,314 @@ def get_section_quiz_questions_from_quiz(quiz_name, student_group=None, lang=Non
             sections.append(section)
             section_map[section_key.lower()] = section
 
-        quiz_questions = frappe.get_all(
-            "Quiz Question",
-            filters={"parent": quiz_name},
-            fields=["question_link", "idx", "custom_section_key"],
-            order_by="idx asc",
-        )
+        unmapped_questions = []
+        for question in payload["questions"]:
+            section_key = question.get("section_key") or ""
+            section = section_map.get(section_key.lower())
+            if not section:
+                unmapped_questions.append(question["name"])
+                continue
+            # Copy so the cached payload is never mutated in-process.
+            section["questions"].append({**question, "section_title": section.get("title")})
+
+        questions = []
+        for section in sections:
+            questions.extend(section["questions"])
+
+        if unmapped_questions:
+            return {
+                "status": "error",
+                "message": (
+                    f"{len(unmapped_questions)} question(s) are missing a matching Section Key. "
+                    "Please map every Quiz Question row to the Quiz Section Profile."
+                ),
+            }
+
+        return {
+            "status": "success",
+            "quiz": {
+                **payload["quiz"],
+                "total_marks": len(questions),
+                "quiz_section_profile": profile_doc.name,
+                "require_all_sections_pass": profile_doc.require_all_sections_pass,
+                "enforce_overall_percentage": profile_doc.enforce_overall_percentage,
+            },
+            "sections": sections,
+            "questions": questions,
+        }
+    except Exception as e:
+        diag.error("Error getting section quiz questions: {}", str(e), title="Section Quiz API")
+        return {"status": "error", "message": f"Failed to load section quiz: {str(e)}"}
+    finally:
+        frappe.local.lang = previous_lang
+
+
+QUIZ_SUBMIT_LOCK_TTL = 60
+
+
+def _acquire_quiz_submit_lock(attempt_id):
+    """Take the attempt's submit lock without waiting; returns its token or None."""
+    return quiz_progress_buffer._acquire_lock(f"quiz_submit_lock:{attempt_id}", QUIZ_SUBMIT_LOCK_TTL)
+
+
+def _release_quiz_submit_lock(attempt_id, token):
+    # Compare-and-delete: a submit that outlived the TTL must not drop a retry's lock.
+    quiz_progress_buffer._release_lock(f"quiz_submit_lock:{attempt_id}", token)
+
+
+GRADED_ACTIVITY_FIELDS = [
+    "name",
+    "score",
+    "status",
+    "custom_assesment_result",
+    "custom_expected_total",
+    "custom_score_percentage",
+    "custom_section_results",
+]
+
+
+def _get_graded_activity_for_attempt(attempt_id):
+    """Quiz Activity already graded for this attempt, if the submission went through before."""
+    if not attempt_id:
+        return None
+    return frappe.db.get_value(
+        "Quiz Activity",
+        {"custom_attempt_id": attempt_id, "status": ["in", ["Pass", "Fail"]]},
+        GRADED_ACTIVITY_FIELDS,
+        as_dict=True,
+    )
+
+
+def _submission_response(activity, duplicate=False):
+    """Submit response built from the stored, materialized Quiz Activity."""
+    try:
+        raw_score, score_out_of = (int(part) for part in str(activity.score).split("/", 1))
+    except (TypeError, ValueError):
+        raw_score = score_out_of = 0
+    if activity.custom_expected_total:
+        percentage = frappe.utils.flt(activity.custom_score_percentage)
+    else:
+        percentage = (raw_score / score_out_of * 100) if score_out_of else 0
+    section_result = frappe.parse_json(activity.custom_section_results) if activity.custom_section_results else None
+    assessment_result_id = activity.custom_assesment_result
+
+    return {
+        "status": "success",
+        "message": "Quiz submitted successfully",
+        "duplicate": duplicate,
+        "assessment_result_id": assessment_result_id,
+        "assessment_result_error": None,
+        "assessment_status": "created" if assessment_result_id else "queued",
+        "activity_id": activity.name,
+        "activity_error": None,
+        "score": round(percentage),
+        "score_exact": round(percentage, 2),
+        "raw_score": raw_score,
+        "total_marks": score_out_of,
+        "score_out_of": score_out_of,
+        "percentage": percentage,
+        "passed": activity.status == "Pass",
+        "weighted_percentage": section_result.get("weighted_percentage") if section_result else None,
+        "sections": section_result.get("sections") if section_result else None,
+    }
+
+
+def _replay_submission(graded_activity, quiz_name, student, student_group, attempt_id):
+    _log_public_quiz_audit(
+        event_type="submission_replayed",
+        quiz_name=quiz_name,
+        student=student,
+        student_group=student_group,
+        attempt_id=attempt_id,
+        details={"activity_id": graded_activity.name},
+    )
+    return _submission_response(graded_activity, duplicate=True)
+
+
+def _mark_attempt_submitted(attempt_id):
+    """Drop the attempt's progress buffer and refuse later autosaves for it."""
+    try:
+        quiz_progress_buffer.mark_submitted(_progress_cache_key(attempt_id), attempt_id)
+    except quiz_progress_buffer.BufferBusy:
+        # The flusher also checks for a graded activity before writing anything.
+        diag.warning("Could not tombstone progress buffer for attempt {}", attempt_id)
+
+
+def _grade_quiz_submission(quiz_name, answers, expected_question_count):
+    """Grade answers against the cached answer-key index (no per-question loads)."""
+    answer_key = get_quiz_answer_key(quiz_name)
+    raw_score = 0
+    total_marks = 0
+    graded_answers = []
+    for answer_data in answers:
+        question_name = answer_data.get("question")
+        selected_answers = _selected_answers_for_check(answer_data.get("answers", []))
+        marks = answer_data.get("marks", 1)
+        total_marks += marks
+
+        entry = _get_answer_key_entry(answer_key, question_name)
+        is_correct = is_answer_correct(entry, selected_answers)
+        raw_score += marks if is_correct else 0
+        graded_answers.append({
+            "question": question_name,
+            "selected_option": _safe_selected_option_text(_selected_option_text(entry, selected_answers)),
+            "quiz_result": "Correct" if is_correct else "Wrong",
+        })
+
+    # Score against full quiz length, not just the answered subset.
+    score_out_of = expected_question_count or total_marks
+    percentage = (raw_score / score_out_of * 100) if score_out_of > 0 else 0
+    return {
+        "graded_answers": graded_answers,
+        "raw_score": raw_score,
+        "score_out_of": score_out_of,
+        "percentage": percentage,
+    }
+
+
+def _save_graded_quiz_activity(
+    quiz_name, student, student_group, attempt_id, grading, passed, assessment_plan=None, section_result=None
+):
+    """Write the graded Quiz Activity (reusing the attempt's draft); the caller commits."""
+    course = frappe.db.get_value("Student Group", student_group, "course")
+    enrollment = None
+    if course:
+        enrollment = frappe.db.get_value("Course Enrollment", {"student": student, "course": course}, "name")
 
-        unmapped_questions = []
-        for quiz_question in quiz_questions:
-            question_link = quiz_question.get("question_link")
-            if not question_link:
-                continue
+    existing_activity_name = _get_draft_quiz_activity_for_attempt(attempt_id)
+    if existing_activity_name:
+        quiz_activity = frappe.get_doc("Quiz Activity", existing_activity_name)
+    else:
+        quiz_activity = frappe.new_doc("Quiz Activity")
 
-            section_key = (quiz_question.get("custom_section_key") or "").strip()
-            section = section_map.get(section_key.lower())
-            if not section:
-                unmapped_questions.append(question_link)
-                continue
+    if enrollment:
+        quiz_activity.enrollment = enrollment
+    else:
+        quiz_activity.flags.ignore_mandatory = True
+    quiz_activity.student = student
+    quiz_activity.quiz = quiz_name
+    quiz_activity.score = f"{grading['raw_score']}/{grading['score_out_of']}"
+    quiz_activity.status = "Pass" if passed else "Fail"
+    quiz_activity.activity_date = today()
+    # Preserve exact context from public quiz submission to avoid fallback guessing.
+    if hasattr(quiz_activity, "custom_student_group"):
+        quiz_activity.custom_student_group = student_group
+    if attempt_id and hasattr(quiz_activity, "custom_attempt_id"):
+        quiz_activity.custom_attempt_id = attempt_id
+    if assessment_plan and hasattr(quiz_activity, "custom_assesment_plan"):
+        quiz_activity.custom_assesment_plan = assessment_plan
+    if section_result and hasattr(quiz_activity, "custom_section_results"):
+        quiz_activity.custom_section_results = json.dumps(section_result, sort_keys=True, separators=(",", ":"))
+    # Assessment documents are materialized by the background job, not the insert hook.
+    quiz_activity.flags.skip_assessment_auto_create = True
+
+    quiz_activity.result = []
+    for graded in grading["graded_answers"]:
+        quiz_activity.append("result", graded)
+
+    quiz_activity = _save_quiz_activity_with_replaceable_results(
+        quiz_activity,
+        ignore_mandatory=not bool(enrollment),
+    )
 
-            question_doc = frappe.get_doc("Question", question_link)
-            question_data = {
-                "name": question_doc.name,
-                "question": _tr_text(question_doc.question, lang_code),
-                "type": getattr(question_doc, "question_type", "Single Correct Answer"),
-                "marks": 1,
-                "section_key": section_key,
-                "section_title": section.get("title"),
-                "options": [],
-            }
+    if enrollment and quiz_activity.docstatus == 0:
+        quiz_activity.reload()
+        quiz_activity._doc_before_save = None
+        quiz_activity.submit()
 
-            for opt_idx, opt in enumerate(getattr(question_doc, "options", None) or []):
-                option_text = _tr_text(getattr(opt, "option", ""), lang_code)
-                if option_text:
-                    question_data["options"].append({
-                        "id": opt_idx + 1,
-                        "text": option_text,
-                        "is_correct": getattr(opt, "is_correct", 0),
-                    })
+    return quiz_activity.name
 
-            section["questions"].append(question_data)
 
-        questions = []
-        for section in sections:
-            questions.extend(section["questions"])
+def enqueue_quiz_submission_assessment(quiz_activity_name):
+    frappe.enqueue(
+        "numerouno.numerouno.api.quiz_api.materialize_quiz_submission_assessment",
+        queue="default",
+        timeout=600,
+        job_id=f"quiz_submission_assessment::{quiz_activity_name}",
+        deduplicate=True,
+        quiz_activity_name=quiz_activity_name,
+    )
 
-        if unmapped_questions:
-            return {
-                "status": "error",
-                "message": (
-                    f"{len(unmapped_questions)} question(s) are missing a matching Section Key. "
-                    "Please map every Quiz Question row to the Quiz Section Profile."
-                ),
-            }
 
-        return {
-            "status": "success",
-            "quiz": {
-                "name": quiz_doc.name,
-                "title": _tr_text(quiz_doc.title, lang_code),
-                "total_marks": len(questions),
-                "passing_percentage": quiz_doc.passing_score or 75,
-                "max_attempts": quiz_doc.max_attempts or 0,
-                "quiz_section_profile": profile_doc.name,
-                "require_all_sections_pass": profile_doc.require_all_sections_pass,
-                "enforce_overall_percentage": profile_doc.enforce_overall_percentage,
-            },
-            "sections": sections,
-            "questions": questions,
-        }
-    except Exception as e:
-        frappe.log_error(
-            f"Error getting section quiz questions: {str(e)}\nTraceback: {frappe.get_traceback()}",
-            "Section Quiz API",
+def materialize_quiz_submission_assessment(quiz_activity_name):
+    """Background job: create or link the Assessment Plan/Result for a graded Quiz Activity.
+
+    Safe to run more than once; an activity that already links an existing
+    Assessment Result is left alone.
+    """
+    activity = frappe.db.get_value(
+        "Quiz Activity",
+        quiz_activity_name,
+        ["name", "quiz", "student", "custom_student_group", "custom_attempt_id", "custom_assesment_result"],
+        as_dict=True,
+    )
+    if not activity:
+        return {"status": "error", "message": f"Quiz Activity {quiz_activity_name} not found"}
+    if activity.custom_assesment_result and frappe.db.exists("Assessment Result", activity.custom_assesment_result):
+        return {"status": "info", "assessment_result_id": activity.custom_assesment_result}
+
+    try:
+        result = create_assessment_result_from_quiz_activity(quiz_activity_name) or {}
+    except Exception:
+        frappe.db.rollback()
+        result = {"status": "error", "message": frappe.get_traceback()}
+
+    assessment_result_id = result.get("assessment_result_id") or result.get("assessment_result")
+    if result.get("status") in ("success", "info") and assessment_result_id:
+        frappe.db.commit()
+        _log_public_quiz_audit(
+            event_type="assessment_result_created",
+            quiz_name=activity.quiz,
+            student=activity.student,
+            student_group=activity.custom_student_group,
+            attempt_id=activity.custom_attempt_id,
+            details={"activity_id": quiz_activity_name, "assessment_result_id": assessment_result_id},
         )
-        return {"status": "error", "message": f"Failed to load section quiz: {str(e)}"}
-    finally:
-        frappe.local.lang = previous_lang
+        return {"status": "success", "assessment_result_id": assessment_result_id}
+
+    assessment_result_error = result.get("message") or "Assessment Result creation failed"
+    diag.warning(
+        "Assessment Result for Quiz Activity {} failed: {}",
+        quiz_activity_name,
+        assessment_result_error,
+    )
+    try:
+        from frappe.desk.doctype.comment.comment import add_comment
+
+        add_comment(
+            reference_doctype="Quiz Activity",
+            reference_name=quiz_activity_name,
+            content=(
+                f"⚠️ Assessment Result Creation Failed:\n{assessment_result_error}\n\n"
+                "Please use the 'Create Assessment Result' button to create it manually."
+            ),
+            comment_email=frappe.session.user or "system",
+            comment_by=frappe.session.user or "system",
+        )
+        frappe.db.commit()
+    except Exception:
+        frappe.db.rollback()
+    _log_public_quiz_audit(
+        event_type="assessment_result_missing",
+        quiz_name=activity.quiz,
+        student=activity.student,
+        student_group=activity.custom_student_group,
+        attempt_id=activity.custom_attempt_id,
+        details={"activity_id": quiz_activity_name, "assessment_result_error": assessment_result_error},
+    )
+    return {"status": "error", "message": assessment_result_error}
 
 
 @frappe.whitelist(allow_guest=True, methods=['GET', 'POST'])
 def submit_quiz_from_mcqs(quiz_name, student, student_group, answers, attempt_id=None):
-    """Submit quiz attempt and create Assessment Result"""
-    import json
-    
+    """Grade a quiz attempt and persist its Quiz Activity in one transaction.
+
+    Submissions are keyed by `attempt_id`: a retry for an attempt that was
+    already graded returns the stored activity's outcome without grading or
+    writing, and one that arrives while the first is still running is told to
+    retry (`"retry": True`), which then replays it. The
+    Assessment Plan/Result is materialized by a background job.
+    """
     try:
         if not quiz_name or not student or not student_group:
             return {
@@ -1550,6 +1843,11 @@ def submit_quiz_from_mcqs(quiz_name, student, student_group, answers, attempt_id
                 "message": "Quiz name, student, and student group are required"
             }
 
+        # A replay is answered from the stored activity before any grading or eligibility work.
+        graded_activity = _get_graded_activity_for_attempt(attempt_id)
+        if graded_activity:
+            return _replay_submission(graded_activity, quiz_name, student, student_group, attempt_id)
+
         eligibility = get_assessment_eligibility(student, student_group)
         if not eligibility.get("eligible"):
             return {
@@ -1558,21 +1856,6 @@ def submit_quiz_from_mcqs(quiz_name, student, student_group, answers, attempt_id
                 "eligibility": eligibility,
             }
 
-        from numerouno.numerouno.doctype.nyc_reassessment_checklist.nyc_reassessment_checklist import check_retest_allowed
-        retest = check_retest_allowed(student, student_group, quiz_name)
-        if not retest.get("allowed"):
-            return {
-                "status": "error",
-                "message": retest.get("message"),
-                "retest": retest,
-            }
-        
-        # Get quiz details
-        quiz_doc = frappe.get_doc("Quiz", quiz_name)
-        
-        # Get student details
-        student_doc = frappe.get_doc("Student", student)
-        
         # Parse answers
         if isinstance(answers, str):
             answers = json.loads(answers)
@@ -1598,535 +1881,111 @@ def submit_quiz_from_mcqs(quiz_name, student, student_group, answers, attempt_id
                     "Please answer all {0} questions before submitting. Only {1} answers were received."
                 ).format(expected_question_count, len(submitted_questions)),
             }
-        
-        # Calculate raw score first (raw marks), then scale to 100 for UI response
-        raw_score = 0
-        total_marks = 0
-        
-        # Get MCQS Assignment for this quiz and student group
-        mcqs_assignment = frappe.get_all(
-            "MCQS Assignment",
-            filters={
-                "student_group": student_group,
-                "mcqs": quiz_name
-            },
-            fields=["name"],
-            limit=1
-        )
-        
-        if not mcqs_assignment:
+
+        grading = _grade_quiz_submission(quiz_name, answers, expected_question_count)
+        percentage = grading["percentage"]
+        section_result = None
+        section_profile = get_section_profile_name(quiz_name, student_group)
+        scheme = get_section_scheme(quiz_name, section_profile) if section_profile else None
+        if scheme:
+            # Section-wise assignments pass on the profile's section thresholds and weights.
+            section_result = score_section_submission(scheme, grading["graded_answers"])
+            passed = section_result["passed"]
+        else:
+            passing_score = frappe.db.get_value("Quiz", quiz_name, "passing_score")
+            passed = percentage >= (passing_score or 75)
+
+        submit_token = _acquire_quiz_submit_lock(attempt_id) if attempt_id else None
+        if attempt_id and not submit_token:
+            graded_activity = _get_graded_activity_for_attempt(attempt_id)
+            if graded_activity:
+                return _replay_submission(graded_activity, quiz_name, student, student_group, attempt_id)
+            # The first submission is still running; the client resends and gets its replay.
             return {
                 "status": "error",
-                "message": "MCQS Assignment not found for this quiz and student group"
+                "retry": True,
+                "message": _("This attempt is already being submitted. Please wait."),
             }
-        
-        # Get student group details
-        student_group_doc = frappe.get_doc("Student Group", student_group)
-        
-        # Process answers and calculate score
-        for answer_data in answers:
-            question_name = answer_data.get("question")
-            selected_answers = answer_data.get("answers", [])
-            marks = answer_data.get("marks", 1)
-            total_marks += marks
-            
-            # Get question details
-            question_doc = frappe.get_doc("Question", question_name)
-            
-            # Check if answer is correct
-            is_correct = check_quiz_answer(question_doc, selected_answers)
-            score = marks if is_correct else 0
-            raw_score += score
-        
-        # Score against full quiz length, not just the answered subset.
-        score_out_of = expected_question_count or total_marks
-        percentage = (raw_score / score_out_of * 100) if score_out_of > 0 else 0
-        scaled_score = round(percentage, 2)
-        display_score = round(percentage)
-        passed = percentage >= (quiz_doc.passing_score or 75)
-        
-        # Create Assessment Result
-        # First, we need to find or create an Assessment Plan
-        # For now, we'll create a simple assessment result without assessment plan
-        # You may need to adjust this based on your Assessment Plan setup
-        
-        print(f"\n{'='*80}")
-        print(f"QUIZ SUBMISSION - Creating Records")
-        print(f"Quiz: {quiz_name}, Student: {student}, Student Group: {student_group}")
-        print(f"Score: {display_score}/100 (raw: {raw_score}/{score_out_of}, {percentage:.1f}%) - {'Passed' if passed else 'Failed'}")
-        print(f"{'='*80}\n")
-        
-        # Try to find existing assessment plan for this student group and course
-        assessment_plan = None
-        if student_group_doc.course:
-            assessment_plans = frappe.get_all(
-                "Assessment Plan",
-                filters={
-                    "student_group": student_group,
-                    "course": student_group_doc.course,
-                    "docstatus": ["<", 2]
-                },
-                fields=["name"],
-                order_by="docstatus desc, modified desc",
-                limit=1
-            )
-            if assessment_plans:
-                assessment_plan = assessment_plans[0].get('name') if isinstance(assessment_plans[0], dict) else assessment_plans[0].name
-                print(f"[ASSESSMENT PLAN] Found: {assessment_plan}")
-            else:
-                print(f"[ASSESSMENT PLAN] No assessment plan found. Creating new one...")
-                
-                # Create Assessment Plan if it doesn't exist
-                try:
-                    # Get course details for defaults
-                    course_doc = frappe.get_doc("Course", student_group_doc.course)
-                    
-                    # Get or create Assessment Group (required field)
-                    assessment_group = None
-                    assessment_groups = frappe.get_all(
-                        "Assessment Group",
-                        fields=["name"],
-                        limit=1
-                    )
-                    if assessment_groups:
-                        assessment_group = assessment_groups[0].get('name') if isinstance(assessment_groups[0], dict) else assessment_groups[0].name
-                    else:
-                        # Create a default Assessment Group if none exists
-                        try:
-                            ag_doc = frappe.new_doc("Assessment Group")
-                            ag_doc.assessment_group_name = f"Default Assessment Group"
-                            ag_doc.insert(ignore_permissions=True)
-                            frappe.db.commit()
-                            assessment_group = ag_doc.name
-                            print(f"  ✓ Created Assessment Group: {assessment_group}")
-                        except Exception as e:
-                            print(f"  ✗ Error creating Assessment Group: {str(e)}")
-                            # Try to use a default name
-                            assessment_group = "Default"
-                    
-                    # Get grading scale from course or create default
-                    grading_scale = getattr(course_doc, 'default_grading_scale', None)
-                    if not grading_scale:
-                        # Try to find any grading scale
-                        grading_scales = frappe.get_all("Grading Scale", fields=["name"], limit=1)
-                        if grading_scales:
-                            grading_scale = grading_scales[0].get('name') if isinstance(grading_scales[0], dict) else grading_scales[0].name
-                        else:
-                            grading_scale = None  # Will try to create without it first
-                    
-                    # Create or get Assessment Criteria - use "Written Assessment"
-                    assessment_criteria_name = None
-                    criteria_name = "Written Assessment"
-                    criteria_list = frappe.get_all(
-                        "Assessment Criteria",
-                        filters={"assessment_criteria": criteria_name},
-                        fields=["name"],
-                        limit=1
-                    )
-                    if criteria_list:
-                        assessment_criteria_name = criteria_list[0].get('name') if isinstance(criteria_list[0], dict) else criteria_list[0].name
-                        print(f"  ✓ Found Assessment Criteria: {assessment_criteria_name}")
-                    else:
-                        # Create Assessment Criteria with name "Written Assessment"
-                        try:
-                            criteria_doc = frappe.new_doc("Assessment Criteria")
-                            criteria_doc.assessment_criteria = criteria_name
-                            criteria_doc.insert(ignore_permissions=True)
-                            frappe.db.commit()
-                            assessment_criteria_name = criteria_doc.name
-                            print(f"  ✓ Created Assessment Criteria: {assessment_criteria_name} ({criteria_name})")
-                        except Exception as e:
-                            print(f"  ✗ Error creating Assessment Criteria: {str(e)}")
-                            # Use criteria name directly
-                            assessment_criteria_name = criteria_name
-                    
-                    # Create Assessment Plan
-                    plan_doc = frappe.new_doc("Assessment Plan")
-                    plan_doc.student_group = student_group
-                    plan_doc.course = student_group_doc.course
-                    plan_doc.assessment_name = f"Quiz Assessment - {quiz_name}"
-                    plan_doc.assessment_group = assessment_group
-                    plan_doc.schedule_date = today()
-                    plan_doc.from_time = "09:00:00"  # Default time
-                    plan_doc.to_time = "17:00:00"    # Default time
-                    plan_doc.maximum_assessment_score = score_out_of
-                    
-                    if grading_scale:
-                        plan_doc.grading_scale = grading_scale
-                    
-                    # Add assessment criteria to the plan
-                    if assessment_criteria_name:
-                        plan_doc.append("assessment_criteria", {
-                            "assessment_criteria": assessment_criteria_name,
-                            "maximum_score": score_out_of
-                        })
-                    
-                    # Set program and academic year from student group if available
-                    if hasattr(student_group_doc, 'program') and student_group_doc.program:
-                        plan_doc.program = student_group_doc.program
-                    if hasattr(student_group_doc, 'academic_year') and student_group_doc.academic_year:
-                        plan_doc.academic_year = student_group_doc.academic_year
-                    if hasattr(student_group_doc, 'academic_term') and student_group_doc.academic_term:
-                        plan_doc.academic_term = student_group_doc.academic_term
-                    
-                    plan_doc.insert(ignore_permissions=True)
-                    plan_doc.submit()
-                    frappe.db.commit()
-                    assessment_plan = plan_doc.name
-                    print(f"  ✓ Created Assessment Plan: {assessment_plan}")
-                    
-                except Exception as e:
-                    error_msg = f"Error creating Assessment Plan: {str(e)}"
-                    print(f"  ✗ {error_msg}")
-                    frappe.log_error(f"{error_msg}\nTraceback: {frappe.get_traceback()}", "Quiz Submission")
-                    assessment_plan = None
-        else:
-            print(f"[ASSESSMENT PLAN] Skipped - No course found in student group")
-        
-        # Create Assessment Result if assessment plan exists
-        assessment_result_id = None
-        assessment_result_error = None
-        if assessment_plan:
-            try:
-                print(f"\n[ASSESSMENT RESULT] Creating Assessment Result...")
-                assessment_result = frappe.new_doc("Assessment Result")
-                assessment_result.assessment_plan = assessment_plan
-                assessment_result.student = student
-                # Keep explicit student group context to satisfy validations/custom logic.
-                if hasattr(assessment_result, "student_group"):
-                    assessment_result.student_group = student_group
-                assessment_result.total_score = raw_score
-                
-                # Assessment Result requires details table with Assessment Result Detail
-                # Get criteria from the Assessment Plan's assessment_criteria table
-                plan_doc = frappe.get_doc("Assessment Plan", assessment_plan)
-                
-                if hasattr(plan_doc, 'assessment_criteria') and plan_doc.assessment_criteria:
-                    # Use the criteria from the plan - look for "Written Assessment"
-                    written_assessment_found = False
-                    for plan_criteria in plan_doc.assessment_criteria:
-                        criteria_name = plan_criteria.assessment_criteria
-                        criteria_max_score = plan_criteria.maximum_score
-                        
-                        # Prefer "Written Assessment" criteria
-                        if "Written Assessment" in criteria_name:
-                            assessment_result.append("details", {
-                                "assessment_criteria": criteria_name,
-                                "maximum_score": criteria_max_score,
-                                "score": raw_score if criteria_max_score >= raw_score else raw_score
-                            })
-                            print(f"    Added detail: {criteria_name} (max: {criteria_max_score}, score: {raw_score})")
-                            written_assessment_found = True
-                            break
-                    
-                    # If "Written Assessment" not found, use the first criteria
-                    if not written_assessment_found and plan_doc.assessment_criteria:
-                        first_criteria = plan_doc.assessment_criteria[0]
-                        assessment_result.append("details", {
-                            "assessment_criteria": first_criteria.assessment_criteria,
-                            "maximum_score": first_criteria.maximum_score,
-                            "score": raw_score
-                        })
-                        print(f"    Added first criteria: {first_criteria.assessment_criteria}")
-                else:
-                    print(f"  ✗ WARNING: Assessment Plan has no criteria. Cannot create Assessment Result without details.")
-                    assessment_result = None
-                
-                if assessment_result:
-                    # Set custom_company field (required)
-                    company = None
-                    try:
-                        # Try to get company from various sources
-                        # First try user default
-                        company = frappe.defaults.get_user_default("Company")
-                        if not company:
-                            # Try global default
-                            company = frappe.defaults.get_global_default("company")
-                        if not company:
-                            # Try system settings
-                            company = frappe.db.get_single_value("System Settings", "default_company")
-                        if not company:
-                            # Get first available company
-                            companies = frappe.get_all("Company", fields=["name"], limit=1)
-                            if companies:
-                                company = companies[0].get('name') if isinstance(companies[0], dict) else companies[0].name
-                        
-                        if company:
-                            assessment_result.custom_company = company
-                            print(f"    Set company: {company}")
-                        else:
-                            print(f"    ✗ WARNING: No company found. Assessment Result may fail validation.")
-                    except Exception as e:
-                        print(f"    ✗ WARNING: Error getting company: {str(e)}")
-                    
-                    assessment_result.insert(ignore_permissions=True)
-                    frappe.db.commit()
-                    assessment_result_id = assessment_result.name
-                    print(f"  ✓ Assessment Result created: {assessment_result_id}")
-
-                    # Submit by default for public quiz flow
-                    try:
-                        assessment_result.reload()
-                        assessment_result.submit()
-                        frappe.db.commit()
-                        print(f"  ✓ Assessment Result submitted: {assessment_result_id}")
-                    except Exception as submit_error:
-                        error_msg = f"Failed to submit Assessment Result {assessment_result_id}: {str(submit_error)}"
-                        print(f"  ✗ {error_msg}")
-                        frappe.log_error(f"{error_msg}\nTraceback: {frappe.get_traceback()}", "Quiz Submission")
-                        assessment_result_error = error_msg
-            except Exception as e:
-                error_msg = f"Error creating Assessment Result: {str(e)}"
-                print(f"  ✗ {error_msg}")
-                frappe.log_error(f"{error_msg}\nTraceback: {frappe.get_traceback()}", "Quiz Submission")
-                # Store error for later - will be added to Quiz Activity comments
-                assessment_result_error = error_msg
-        else:
-            print(f"[ASSESSMENT RESULT] Skipped - No assessment plan found")
-            assessment_result_error = "No Assessment Plan found for this Student Group and Course. Please create an Assessment Plan first."
-        
-        # Try to create Quiz Activity even if enrollment is missing
-        enrollment = None
-        if student_group_doc.course:
-            enrollments = frappe.get_all(
-                "Course Enrollment",
-                filters={
-                    "student": student,
-                    "course": student_group_doc.course
-                },
-                fields=["name"],
-                limit=1
-            )
-            if enrollments:
-                enrollment = enrollments[0].get('name') if isinstance(enrollments[0], dict) else enrollments[0].name
-                print(f"[ENROLLMENT] Found: {enrollment}")
-            else:
-                print(f"[ENROLLMENT] No enrollment found for student={student}, course={student_group_doc.course}")
 
-        activity_id = None
-        activity_error = None
         try:
-            print(f"\n[QUIZ ACTIVITY] Creating/Updating Quiz Activity...")
-
-            quiz_activity = None
-            existing_activity_name = _get_quiz_activity_for_attempt(attempt_id)
-            if existing_activity_name and frappe.db.exists("Quiz Activity", existing_activity_name):
-                existing_activity = frappe.get_doc("Quiz Activity", existing_activity_name)
-                if existing_activity.docstatus == 0:
-                    quiz_activity = existing_activity
-
-            if not quiz_activity:
-                quiz_activity = frappe.new_doc("Quiz Activity")
-
-            if enrollment:
-                quiz_activity.enrollment = enrollment
-            else:
-                quiz_activity.flags.ignore_mandatory = True
-            quiz_activity.student = student
-            quiz_activity.quiz = quiz_name
-            quiz_activity.score = f"{raw_score}/{score_out_of}"
-            quiz_activity.status = "Pass" if passed else "Fail"
-            quiz_activity.activity_date = today()
-            # Preserve exact context from public quiz submission to avoid fallback guessing.
-            if hasattr(quiz_activity, "custom_student_group"):
-                quiz_activity.custom_student_group = student_group
-            if assessment_plan and hasattr(quiz_activity, "custom_assesment_plan"):
-                quiz_activity.custom_assesment_plan = assessment_plan
-            
-            quiz_activity.result = []
-            # Add result details
-            for answer_data in answers:
-                question_name = answer_data.get("question")
-                selected_answers = answer_data.get("answers", [])
-                
-                question_doc = frappe.get_doc("Question", question_name)
-                is_correct = check_quiz_answer(question_doc, selected_answers)
-                
-                # Format selected option text
-                # Question doctype uses 'question_type' and 'options' table
-                selected_option_text = ""
-                question_type = getattr(question_doc, 'question_type', 'Single Correct Answer')
-                
-                if question_type in ["Single Correct Answer", "Multiple Correct Answer"]:
-                    # Get option text from options table
-                    if hasattr(question_doc, 'options') and question_doc.options:
-                        option_texts = []
-                        for opt_id in selected_answers:
-                            # Options are 1-indexed, so subtract 1 for array index
-                            opt_idx = opt_id - 1
-                            if 0 <= opt_idx < len(question_doc.options):
-                                opt = question_doc.options[opt_idx]
-                                opt_text = getattr(opt, 'option', '')
-                                if opt_text:
-                                    option_texts.append(opt_text)
-                        selected_option_text = ", ".join(option_texts)
-                else:
-                    selected_option_text = ", ".join(map(str, selected_answers))
-                
-                quiz_activity.append("result", {
-                    "question": question_name,
-                    "selected_option": _safe_selected_option_text(selected_option_text),
-                    "quiz_result": "Correct" if is_correct else "Wrong"
-                })
-
-            quiz_activity = _save_quiz_activity_with_replaceable_results(
-                quiz_activity,
-                ignore_mandatory=not bool(enrollment),
-            )
+            # A submission that just released the lock may have graded this attempt.
+            graded_activity = _get_graded_activity_for_attempt(attempt_id)
+            if graded_activity:
+                return _replay_submission(graded_activity, quiz_name, student, student_group, attempt_id)
+
+            from numerouno.numerouno.doctype.nyc_reassessment_checklist.nyc_reassessment_checklist import check_retest_allowed
+            retest = check_retest_allowed(student, student_group, quiz_name)
+            if not retest.get("allowed"):
+                return {
+                    "status": "error",
+                    "message": retest.get("message"),
+                    "retest": retest,
+                }
 
-            if enrollment and quiz_activity.docstatus == 0:
-                quiz_activity.reload()
-                quiz_activity._doc_before_save = None
-                quiz_activity.submit()
+            assignment = get_assignment_scaffolding(student_group, quiz_name)
+            if not assignment:
+                return {
+                    "status": "error",
+                    "message": "MCQS Assignment not found for this quiz and student group"
+                }
 
-            frappe.db.commit()
-            activity_id = quiz_activity.name
-            _set_quiz_activity_for_attempt(attempt_id, activity_id)
-            print(f"  ✓ Quiz Activity created: {activity_id}")
+            flush_token = None
+            if attempt_id and quiz_progress_buffer.is_write_behind_enabled():
+                # Hold the flush lock until the graded activity is committed so no flush
+                # can insert a second draft for this attempt. A running flush writes one
+                # attempt and finishes quickly; past that, the client resubmits.
+                flush_token = quiz_progress_buffer.acquire_flush_lock(
+                    attempt_id, wait=quiz_progress_buffer.FLUSH_LOCK_WAIT
+                )
+                if not flush_token:
+                    return {
+                        "status": "error",
+                        "retry": True,
+                        "message": _("Your answers are still being saved. Please submit again."),
+                    }
 
-            if assessment_result_id:
-                try:
-                    meta = frappe.get_meta("Quiz Activity")
-                    if meta.has_field("custom_assesment_result"):
-                        frappe.db.set_value(
-                            "Quiz Activity",
-                            activity_id,
-                            "custom_assesment_result",
-                            assessment_result_id,
-                            update_modified=False,
-                        )
-                        frappe.db.commit()
-                        print(f"  ✓ Linked Assessment Result to Quiz Activity: {assessment_result_id}")
-                except Exception as link_err:
-                    frappe.log_error(
-                        f"Failed to link Assessment Result {assessment_result_id} to Quiz Activity {activity_id}: {str(link_err)}\n"
-                        f"Traceback: {frappe.get_traceback()}",
-                        "Quiz Submission",
-                    )
-            
-            # Add error message to Quiz Activity comments if Assessment Result creation failed
-            if assessment_result_error:
-                try:
-                    from frappe.desk.doctype.comment.comment import add_comment
-                    comment_text = f"⚠️ Assessment Result Creation Failed:\n{assessment_result_error}\n\nPlease use the 'Create Assessment Result' button to create it manually."
-                    add_comment(
-                        reference_doctype="Quiz Activity",
-                        reference_name=activity_id,
-                        content=comment_text,
-                        comment_email=frappe.session.user or "system",
-                        comment_by=frappe.session.user or "system"
-                    )
-                    print(f"  ✓ Error message added to Quiz Activity comments")
-                except Exception as comment_error:
-                    print(f"  ✗ Could not add comment: {str(comment_error)}")
-            
-        except Exception as e:
-            error_msg = f"Error creating Quiz Activity: {str(e)}"
-            print(f"  ✗ {error_msg}")
-            frappe.log_error(f"{error_msg}\nTraceback: {frappe.get_traceback()}", "Quiz Submission")
-            activity_error = error_msg
-        
-        # Fallback: if Assessment Result wasn't created directly, try creating it from Quiz Activity
-        if not assessment_result_id and activity_id:
             try:
-                print(f"\n[ASSESSMENT RESULT FALLBACK] Trying creation from Quiz Activity: {activity_id}")
-                fallback_result = create_assessment_result_from_quiz_activity(activity_id)
-                fallback_status = (fallback_result or {}).get("status")
-                fallback_assessment_id = (fallback_result or {}).get("assessment_result_id") or (fallback_result or {}).get("assessment_result")
-                if fallback_status in ("success", "info") and fallback_assessment_id:
-                    assessment_result_id = fallback_assessment_id
-                    assessment_result_error = None
-                    print(f"  ✓ Fallback Assessment Result created: {assessment_result_id}")
-                else:
-                    print(f"  ✗ Fallback failed: {fallback_result}")
-                    assessment_result_error = (
-                        (fallback_result or {}).get("message")
-                        or "Fallback Assessment Result creation failed"
-                    )
-                    _log_public_quiz_audit(
-                        event_type="assessment_result_missing",
-                        quiz_name=quiz_name,
-                        student=student,
-                        student_group=student_group,
-                        attempt_id=attempt_id,
-                        details={
-                            "activity_id": activity_id,
-                            "assessment_result_error": assessment_result_error,
-                        },
-                    )
-            except Exception as fallback_err:
-                print(f"  ✗ Fallback exception: {str(fallback_err)}")
-                frappe.log_error(
-                    f"Fallback Assessment Result creation failed: {str(fallback_err)}\nTraceback: {frappe.get_traceback()}",
-                    "Quiz Submission"
+                activity_id = _save_graded_quiz_activity(
+                    quiz_name, student, student_group, attempt_id, grading, passed,
+                    assessment_plan=assignment.assessment_plan,
+                    section_result=section_result,
                 )
-                assessment_result_error = str(fallback_err)
+                frappe.db.commit()
+            except Exception as e:
+                frappe.db.rollback()
+                diag.error("Error creating Quiz Activity: {}", str(e), title="Quiz Submission")
                 _log_public_quiz_audit(
-                    event_type="assessment_result_exception",
+                    event_type="quiz_activity_missing",
                     quiz_name=quiz_name,
                     student=student,
                     student_group=student_group,
                     attempt_id=attempt_id,
-                    details={
-                        "activity_id": activity_id,
-                        "assessment_result_error": assessment_result_error,
-                    },
+                    details={"activity_error": str(e)},
                 )
-        
-        print(f"\n{'='*80}")
-        print(f"SUBMISSION COMPLETE")
-        print(f"Assessment Result: {assessment_result_id or 'Not created'}")
-        print(f"Quiz Activity: {activity_id or 'Not created'}")
-        print(f"{'='*80}\n")
-
-        frappe.logger().info(
-            f"[PUBLIC QUIZ SUBMIT] Completed submission for quiz={quiz_name}, "
-            f"student={student}, student_group={student_group}, "
-            f"activity_id={activity_id or 'NONE'}, assessment_result_id={assessment_result_id or 'NONE'}"
-        )
+                return {
+                    "status": "error",
+                    "message": (
+                        "Quiz answers were received but Quiz Activity could not be created. "
+                        f"Course Evaluation was not recorded as quiz completion. Reason: {str(e)}"
+                    ),
+                    "activity_id": None,
+                    "activity_error": str(e),
+                }
+            else:
+                if attempt_id:
+                    _mark_attempt_submitted(attempt_id)
+            finally:
+                if flush_token:
+                    quiz_progress_buffer.release_flush_lock(attempt_id, flush_token)
+        finally:
+            if submit_token:
+                _release_quiz_submit_lock(attempt_id, submit_token)
+
+        if attempt_id:
+            _set_quiz_activity_for_attempt(attempt_id, activity_id)
+
+        enqueue_quiz_submission_assessment(activity_id)
 
-        if not activity_id:
-            message = (
-                "Quiz answers were received but Quiz Activity could not be created. "
-                "Course Evaluation was not recorded as quiz completion."
-            )
-            if activity_error:
-                message = f"{message} Reason: {activity_error}"
-            frappe.logger().error(
-                f"[PUBLIC QUIZ SUBMIT] Quiz Activity missing after submission for "
-                f"quiz={quiz_name}, student={student}, student_group={student_group}. "
-                f"activity_error={activity_error or 'N/A'}"
-            )
-            _log_public_quiz_audit(
-                event_type="quiz_activity_missing",
-                quiz_name=quiz_name,
-                student=student,
-                student_group=student_group,
-                attempt_id=attempt_id,
-                details={"activity_error": activity_error},
-            )
-            return {
-                "status": "error",
-                "message": message,
-                "assessment_result_id": assessment_result_id,
-                "assessment_result_error": assessment_result_error,
-                "activity_id": None,
-                "activity_error": activity_error,
-                "score": display_score,
-                "score_exact": scaled_score,
-                "raw_score": raw_score,
-                "total_marks": score_out_of,
-                "score_out_of": score_out_of,
-                "percentage": percentage,
-                "passed": passed,
-            }
-        
-        # Return result
-        response_message = "Quiz submitted successfully"
-        if not assessment_result_id:
-            response_message = (
-                "Quiz submitted and Quiz Activity created, but Assessment Result was not created automatically."
-            )
         _log_public_quiz_audit(
             event_type="submission_completed",
             quiz_name=quiz_name,
@@ -2135,32 +1994,18 @@ def submit_quiz_from_mcqs(quiz_name, student, student_group, answers, attempt_id
             attempt_id=attempt_id,
             details={
                 "activity_id": activity_id,
-                "assessment_result_id": assessment_result_id,
-                "assessment_result_error": assessment_result_error,
-                "score": display_score,
+                "assessment_status": "queued",
+                "score": round(percentage),
                 "percentage": percentage,
                 "passed": passed,
             },
         )
+        return _submission_response(
+            frappe.db.get_value("Quiz Activity", activity_id, GRADED_ACTIVITY_FIELDS, as_dict=True)
+        )
 
-        return {
-            "status": "success",
-            "message": response_message,
-            "assessment_result_id": assessment_result_id,
-            "assessment_result_error": assessment_result_error,
-            "activity_id": activity_id,
-            "activity_error": activity_error,
-            "score": display_score,
-            "score_exact": scaled_score,
-            "raw_score": raw_score,
-            "total_marks": score_out_of,
-            "score_out_of": score_out_of,
-            "percentage": percentage,
-            "passed": passed
-        }
-        
     except Exception as e:
-        frappe.log_error(f"Error submitting quiz: {str(e)}", "Quiz API")
+        diag.error("Error submitting quiz: {}", str(e), title="Quiz API")
         return {
             "status": "error",
             "message": f"Failed to submit quiz: {str(e)}"
@@ -2278,42 +2123,18 @@ def _update_quiz_activity_plan_link(quiz_activity_name, assessment_plan):
         frappe.logger().error(f"[QUIZ ACTIVITY] Failed to update custom_assesment_plan: {str(update_err)}")
 
 
-def _auto_create_assessment_plan(student_group_doc, student_group, quiz_name, total_marks, quiz_activity_name, student):
-    frappe.logger().info("[ASSESSMENT PLAN] Starting resilient auto-creation of Assessment Plan...")
-
-    course_doc = frappe.get_doc("Course", student_group_doc.course)
-
-    assessment_groups = frappe.get_all("Assessment Group", fields=["name"], limit=1)
-    if assessment_groups:
-        assessment_group = assessment_groups[0].name
-    else:
-        ag_doc = frappe.new_doc("Assessment Group")
-        ag_doc.assessment_group_name = "Default Assessment Group"
-        ag_doc.insert(ignore_permissions=True)
-        frappe.db.commit()
-        assessment_group = ag_doc.name
-
-    grading_scale = getattr(course_doc, "default_grading_scale", None)
-    if not grading_scale:
-        grading_scales = frappe.get_all("Grading Scale", fields=["name"], limit=1)
-        if grading_scales:
-            grading_scale = grading_scales[0].name
-
-    criteria_name = "Written Assessment"
-    criteria_list = frappe.get_all(
-        "Assessment Criteria",
-        filters={"assessment_criteria": criteria_name},
-        fields=["name"],
-        limit=1,
+def _create_quiz_assessment_plan(student_group, quiz_name, total_marks, assessment_criteria=None):
+    """Insert and submit a "Quiz Assessment - <quiz>" plan in the group's next free slot."""
+    from numerouno.numerouno.utils.assessment_scaffolding import (
+        get_default_assessment_group,
+        get_default_grading_scale,
+        get_written_assessment_criteria,
     )
-    if criteria_list:
-        assessment_criteria_name = criteria_list[0].name
-    else:
-        criteria_doc = frappe.new_doc("Assessment Criteria")
-        criteria_doc.assessment_criteria = criteria_name
-        criteria_doc.insert(ignore_permissions=True)
-        frappe.db.commit()
-        assessment_criteria_name = criteria_doc.name
+
+    student_group_doc = frappe.get_doc("Student Group", student_group)
+    assessment_group = get_default_assessment_group()
+    grading_scale = get_default_grading_scale(student_group_doc.course)
+    assessment_criteria = assessment_criteria or get_written_assessment_criteria()
 
     schedule_date, from_time, to_time = _find_available_assessment_slot(student_group)
     if not schedule_date:
@@ -2339,7 +2160,7 @@ def _auto_create_assessment_plan(student_group_doc, student_group, quiz_name, to
         plan_doc.grading_scale = grading_scale
 
     plan_doc.append("assessment_criteria", {
-        "assessment_criteria": assessment_criteria_name,
+        "assessment_criteria": assessment_criteria,
         "maximum_score": total_marks,
     })
 
@@ -2351,19 +2172,25 @@ def _auto_create_assessment_plan(student_group_doc, student_group, quiz_name, to
         plan_doc.academic_term = student_group_doc.academic_term
 
     plan_doc.insert(ignore_permissions=True)
-    frappe.db.commit()
-    assessment_plan = plan_doc.name
-    frappe.logger().info(f"[ASSESSMENT PLAN] Auto-created Assessment Plan: {assessment_plan}")
+    frappe.logger().info(f"[ASSESSMENT PLAN] Auto-created Assessment Plan: {plan_doc.name}")
 
     try:
         plan_doc.submit()
-        frappe.db.commit()
-        frappe.logger().info(f"[ASSESSMENT PLAN] Auto-created plan submitted: {assessment_plan}")
+        frappe.logger().info(f"[ASSESSMENT PLAN] Auto-created plan submitted: {plan_doc.name}")
     except frappe.ValidationError as submit_ve:
         frappe.logger().warning(
             f"[ASSESSMENT PLAN] Auto-created plan kept in draft after submit validation error: {submit_ve}"
         )
 
+    return plan_doc.name
+
+
+def _auto_create_assessment_plan(student_group_doc, student_group, quiz_name, total_marks, quiz_activity_name, student):
+    frappe.logger().info("[ASSESSMENT PLAN] Starting resilient auto-creation of Assessment Plan...")
+
+    assessment_plan = _create_quiz_assessment_plan(student_group, quiz_name, total_marks)
+    frappe.db.commit()
+
     _update_quiz_activity_plan_link(quiz_activity_name, assessment_plan)
 
     try:
@@ -2376,14 +2203,20 @@ def _auto_create_assessment_plan(student_group_doc, student_group, quiz_name, to
                 f"Student Group: {student_group}\n"
                 f"Course: {student_group_doc.course}\n"
                 f"Student: {student}\n"
-                f"Slot: {schedule_date} {from_time}-{to_time}"
+                "Slot: {0} {1}-{2}".format(
+                    *frappe.db.get_value("Assessment Plan", assessment_plan, ["schedule_date", "from_time", "to_time"])
+                )
             ),
             comment_email=frappe.session.user or "system",
             comment_by=frappe.session.user or "system",
         )
         frappe.db.commit()
     except Exception as comment_err:
-        frappe.log_error(f"Failed to add plan creation comment: {str(comment_err)}", "Quiz Activity Comment Error")
+        diag.error(
+            "Failed to add plan creation comment: {}",
+            str(comment_err),
+            title="Quiz Activity Comment Error",
+        )
 
     return assessment_plan
 
@@ -2402,9 +2235,10 @@ def _update_assessment_result_from_quiz_activity(assessment_result_name, quiz_ac
 
             grade = get_grade(grading_scale, percentage)
         except Exception:
-            frappe.log_error(
-                f"Failed to calculate grade for Assessment Result {assessment_result_name}: {frappe.get_traceback()}",
-                "Assessment Result Quiz Sync",
+            diag.error(
+                "Failed to calculate grade for Assessment Result {}",
+                assessment_result_name,
+                title="Assessment Result Quiz Sync",
             )
 
     updates = {"total_score": total_score}
@@ -2431,9 +2265,10 @@ def _update_assessment_result_from_quiz_activity(assessment_result_name, quiz_ac
 
                 detail_updates["grade"] = get_grade(grading_scale, (float(total_score) / float(detail_maximum)) * 100)
             except Exception:
-                frappe.log_error(
-                    f"Failed to calculate detail grade for Assessment Result {assessment_result_name}: {frappe.get_traceback()}",
-                    "Assessment Result Quiz Sync",
+                diag.error(
+                    "Failed to calculate detail grade for Assessment Result {}",
+                    assessment_result_name,
+                    title="Assessment Result Quiz Sync",
                 )
 
         frappe.db.set_value(target_row.doctype, target_row.name, detail_updates, update_modified=False)
@@ -2448,9 +2283,11 @@ def _update_assessment_result_from_quiz_activity(assessment_result_name, quiz_ac
             ),
         )
     except Exception as comment_err:
-        frappe.log_error(
-            f"Failed to add sync comment to Assessment Result {assessment_result_name}: {str(comment_err)}",
-            "Assessment Result Quiz Sync",
+        diag.error(
+            "Failed to add sync comment to Assessment Result {}: {}",
+            assessment_result_name,
+            str(comment_err),
+            title="Assessment Result Quiz Sync",
         )
 
     frappe.db.commit()
@@ -2607,6 +2444,13 @@ def create_assessment_result_from_quiz_activity(quiz_activity_name):
                 assessment_plan = quiz_activity.custom_assesment_plan
                 frappe.logger().info(f"[ASSESSMENT PLAN] Using Assessment Plan from Quiz Activity: {assessment_plan}")
 
+        # Plan precomputed on the MCQS Assignment (see utils.assessment_scaffolding).
+        scaffolding = get_assignment_scaffolding(student_group, quiz_name) or {}
+        if not assessment_plan and scaffolding.get("assessment_plan"):
+            if frappe.db.exists("Assessment Plan", {"name": scaffolding["assessment_plan"], "docstatus": ["<", 2]}):
+                assessment_plan = scaffolding["assessment_plan"]
+                _update_quiz_activity_plan_link(quiz_activity_name, assessment_plan)
+
         if not assessment_plan and student_group_doc.course:
             assessment_plan = _find_reusable_assessment_plan(student_group, student_group_doc.course, quiz_name)
             if assessment_plan:
@@ -2625,9 +2469,10 @@ def create_assessment_result_from_quiz_activity(quiz_activity_name):
                     )
                 except Exception as e:
                     error_msg = str(getattr(e, "message", None) or (e.args[0] if getattr(e, "args", None) else str(e)))
-                    frappe.log_error(
-                        f"Failed to auto-create Assessment Plan: {error_msg}\n\nTraceback:\n{frappe.get_traceback()}",
-                        "Create Assessment Result from Quiz Activity",
+                    diag.error(
+                        "Failed to auto-create Assessment Plan: {}",
+                        error_msg,
+                        title="Create Assessment Result from Quiz Activity",
                     )
 
                     try:
@@ -2699,7 +2544,7 @@ def create_assessment_result_from_quiz_activity(quiz_activity_name):
                 )
             except Exception as sync_err:
                 error_msg = f"Failed to sync existing Assessment Result {existing_result}: {str(sync_err)}"
-                frappe.log_error(f"{error_msg}\nTraceback: {frappe.get_traceback()}", "Assessment Result Quiz Sync")
+                diag.error(error_msg, title="Assessment Result Quiz Sync")
                 return {
                     "status": "error",
                     "message": error_msg,
@@ -2717,7 +2562,7 @@ def create_assessment_result_from_quiz_activity(quiz_activity_name):
                     frappe.logger().info(f"[ASSESSMENT RESULT] ✓ Existing draft submitted: {existing_result}")
             except Exception as submit_existing_err:
                 error_msg = f"Failed to submit existing Assessment Result {existing_result}: {str(submit_existing_err)}"
-                frappe.log_error(f"{error_msg}\nTraceback: {frappe.get_traceback()}", "Assessment Result Submit Error")
+                diag.error(error_msg, title="Assessment Result Submit Error")
                 return {
                     "status": "error",
                     "message": error_msg,
@@ -2849,7 +2694,11 @@ def create_assessment_result_from_quiz_activity(quiz_activity_name):
             }
         
         # Set company
-        company = frappe.defaults.get_user_default("Company") or frappe.defaults.get_global_default("company")
+        company = (
+            scaffolding.get("company")
+            or frappe.defaults.get_user_default("Company")
+            or frappe.defaults.get_global_default("company")
+        )
         if company and hasattr(assessment_result, 'custom_company'):
             assessment_result.custom_company = company
         
@@ -2871,7 +2720,7 @@ def create_assessment_result_from_quiz_activity(quiz_activity_name):
         except Exception as submit_error:
             # Log error but don't fail - Assessment Result is still created in draft
             error_msg = f"Failed to submit Assessment Result {assessment_result.name}: {str(submit_error)}"
-            frappe.log_error(f"{error_msg}\nTraceback: {frappe.get_traceback()}", "Assessment Result Submit Error")
+            diag.error(error_msg, title="Assessment Result Submit Error")
             frappe.logger().warning(f"[ASSESSMENT RESULT] ⚠ {error_msg}. Assessment Result is in draft status.")
             
             # Add warning comment to Quiz Activity
@@ -2890,7 +2739,11 @@ def create_assessment_result_from_quiz_activity(quiz_activity_name):
                 )
                 frappe.db.commit()
             except Exception as comment_err:
-                frappe.log_error(f"Failed to add warning comment: {str(comment_err)}", "Quiz Activity Comment Error")
+                diag.error(
+                    "Failed to add warning comment: {}",
+                    str(comment_err),
+                    title="Quiz Activity Comment Error",
+                )
         
         # Update Quiz Activity with Assessment Result link and other custom fields
         frappe.logger().info(f"[ASSESSMENT RESULT] Updating Quiz Activity with custom fields...")
@@ -2952,7 +2805,11 @@ def create_assessment_result_from_quiz_activity(quiz_activity_name):
             
         except Exception as update_err:
             frappe.logger().error(f"[ASSESSMENT RESULT] Failed to update Quiz Activity with custom fields: {str(update_err)}")
-            frappe.log_error(f"Failed to update Quiz Activity with custom fields: {str(update_err)}", "Update Quiz Activity Custom Fields")
+            diag.error(
+                "Failed to update Quiz Activity with custom fields: {}",
+                str(update_err),
+                title="Update Quiz Activity Custom Fields",
+            )
         
         # Add success comment to Quiz Activity with clear details
         try:
@@ -2975,7 +2832,11 @@ def create_assessment_result_from_quiz_activity(quiz_activity_name):
             )
             frappe.db.commit()  # Ensure comment is saved
         except Exception as comment_err:
-            frappe.log_error(f"Failed to add success comment: {str(comment_err)}", "Quiz Activity Comment Error")
+            diag.error(
+                "Failed to add success comment: {}",
+                str(comment_err),
+                title="Quiz Activity Comment Error",
+            )
         
         return {
             "status": "success",
@@ -2986,7 +2847,7 @@ def create_assessment_result_from_quiz_activity(quiz_activity_name):
     except Exception as e:
         error_msg = f"Error creating Assessment Result: {str(e)}"
         full_error = f"{error_msg}\n\nTraceback:\n{frappe.get_traceback()}"
-        frappe.log_error(full_error, "Create Assessment Result from Quiz Activity")
+        diag.error(full_error, title="Create Assessment Result from Quiz Activity")
         
         # Add error comment to Quiz Activity - ALWAYS add error to comments
         try:
@@ -3001,7 +2862,11 @@ def create_assessment_result_from_quiz_activity(quiz_activity_name):
             )
         except Exception as comment_error:
             # If adding comment fails, log it but don't fail the whole operation
-            frappe.log_error(f"Failed to add comment to Quiz Activity: {str(comment_error)}", "Create Assessment Result Comment Error")
+            diag.error(
+                "Failed to add comment to Quiz Activity: {}",
+                str(comment_error),
+                title="Create Assessment Result Comment Error",
+            )
         
         return {
             "status": "error",
@@ -3071,9 +2936,10 @@ def get_quiz_activity_answer_reference(quiz_activity_name):
 
         return {"status": "success", "reference": reference}
     except Exception as e:
-        frappe.log_error(
-            f"Failed get_quiz_activity_answer_reference: {str(e)}\nTraceback: {frappe.get_traceback()}",
-            "Quiz Activity Answer Reference"
+        diag.error(
+            "Failed get_quiz_activity_answer_reference: {}",
+            str(e),
+            title="Quiz Activity Answer Reference",
         )
         return {"status": "error", "message": str(e), "reference": {}}
 
@@ -3165,6 +3031,7 @@ def admin_update_quiz_activity_answers(quiz_activity_name, updates, reason=None)
             },
             update_modified=False
         )
+        materialize_activity_scores([quiz_activity_doc.name])
         frappe.db.commit()
 
         assessment_result_name = _get_linked_assessment_result_name(quiz_activity_doc)
@@ -3226,18 +3093,37 @@ def admin_update_quiz_activity_answers(quiz_activity_name, updates, reason=None)
             "status_value": status_value
         }
     except Exception as e:
-        frappe.log_error(
-            f"Failed admin_update_quiz_activity_answers: {str(e)}\nTraceback: {frappe.get_traceback()}",
-            "Quiz Activity Admin Update"
+        diag.error(
+            "Failed admin_update_quiz_activity_answers: {}",
+            str(e),
+            title="Quiz Activity Admin Update",
         )
         return {
             "status": "error",
             "message": str(e)
         }
 
+
+def _encode_history_cursor(activity):
+    raw = json.dumps([str(activity.activity_date), str(activity.creation), activity.name])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_history_cursor(cursor):
+    try:
+        activity_date, creation, name = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except Exception:
+        frappe.throw(_("Invalid history cursor"))
+    return activity_date, creation, name
+
+
 @frappe.whitelist(allow_guest=True, methods=['GET'])
-def get_quiz_submission_history(student, quiz_name=None, limit=5):
-    """Fetch recent quiz submissions with answer history for a student."""
+def get_quiz_submission_history(student, quiz_name=None, limit=5, cursor=None):
+    """Fetch quiz submissions with answer history for a student, newest first.
+
+    Pages are keyed on (activity_date, creation, name): pass the returned
+    `next_cursor` back as `cursor` to continue. Two queries per page.
+    """
     try:
         if not student:
             return {
@@ -3249,91 +3135,106 @@ def get_quiz_submission_history(student, quiz_name=None, limit=5):
             limit = int(limit) if limit is not None else 5
         except (TypeError, ValueError):
             limit = 5
-        limit = min(max(limit, 1), 50)
+        limit = min(max(limit, 1), 100)
 
-        filters = {"student": student}
+        conditions = ["student = %(student)s"]
+        values = {"student": student, "limit": limit + 1}
         if quiz_name:
-            filters["quiz"] = quiz_name
+            conditions.append("quiz = %(quiz)s")
+            values["quiz"] = quiz_name
+        if cursor:
+            values["after_date"], values["after_creation"], values["after_name"] = _decode_history_cursor(cursor)
+            # Spelled out on the raw columns so `student_history_index` serves the range.
+            conditions.append(
+                """(
+                    activity_date < %(after_date)s
+                    OR (activity_date = %(after_date)s AND (
+                        creation < %(after_creation)s
+                        OR (creation = %(after_creation)s AND name < %(after_name)s)
+                    ))
+                )"""
+            )
 
-        activities = frappe.get_all(
-            "Quiz Activity",
-            filters=filters,
-            fields=["name", "quiz", "score", "status", "activity_date", "creation"],
-            order_by="activity_date desc, creation desc",
-            limit=limit,
-            ignore_permissions=True
+        # activity_date is always set (see `set_default_activity_date`), so the
+        # index on (student, activity_date, creation) also serves the sort.
+        activities = frappe.db.sql(
+            f"""
+            SELECT name, quiz, score, status, activity_date, creation
+            FROM `tabQuiz Activity`
+            WHERE {" AND ".join(conditions)}
+            ORDER BY activity_date DESC, creation DESC, name DESC
+            LIMIT %(limit)s
+            """,
+            values,
+            as_dict=True,
         )
+        has_more = len(activities) > limit
+        activities = activities[:limit]
 
-        history = []
-        for activity in activities:
-            answers = []
-            try:
-                activity_doc = frappe.get_doc("Quiz Activity", activity.name)
-                if hasattr(activity_doc, "result") and activity_doc.result:
-                    for row in activity_doc.result:
-                        answers.append({
-                            "question": row.question,
-                            "selected_option": row.selected_option,
-                            "quiz_result": row.quiz_result
-                        })
-            except Exception:
-                answers = []
+        answers_by_activity = {}
+        if activities:
+            for row in frappe.get_all(
+                "Quiz Result",
+                filters={
+                    "parent": ["in", [activity.name for activity in activities]],
+                    "parenttype": "Quiz Activity",
+                },
+                fields=["parent", "question", "selected_option", "quiz_result"],
+                order_by="parent asc, idx asc",
+            ):
+                answers_by_activity.setdefault(row.parent, []).append({
+                    "question": row.question,
+                    "selected_option": row.selected_option,
+                    "quiz_result": row.quiz_result
+                })
 
-            history.append({
+        history = [
+            {
                 "name": activity.name,
                 "quiz": activity.quiz,
                 "score": activity.score,
                 "status": activity.status,
                 "activity_date": activity.activity_date,
                 "creation": activity.creation,
-                "answers": answers
-            })
+                "answers": answers_by_activity.get(activity.name, [])
+            }
+            for activity in activities
+        ]
 
         return {
             "status": "success",
-            "history": history
+            "history": history,
+            "has_more": has_more,
+            "next_cursor": _encode_history_cursor(activities[-1]) if has_more else None,
         }
     except Exception as e:
-        frappe.log_error(f"Error fetching quiz submission history: {str(e)}", "Quiz API")
+        diag.error("Error fetching quiz submission history: {}", str(e), title="Quiz API")
         return {
             "status": "error",
             "message": f"Failed to fetch submission history: {str(e)}"
         }
 
+def is_answer_correct(entry, selected_answers):
+    """Check selected option ids against an answer-key entry."""
+    if not entry:
+        return False
+    if entry["type"] in ("Single Correct Answer", "Multiple Correct Answer"):
+        correct_answers = entry["correct"]
+        if len(selected_answers) != len(correct_answers):
+            return False
+        return set(selected_answers) == set(correct_answers)
+    # For other types, assume correct if answered
+    return len(selected_answers) > 0
+
+
 def check_quiz_answer(question_doc, selected_answers):
     """Check if the selected answers are correct for Quiz (Education module)"""
     try:
-        # Question doctype uses 'question_type' field, not 'type'
-        question_type = getattr(question_doc, 'question_type', 'Single Correct Answer')
-        
-        print(f"\n[CHECK ANSWER] Question: {question_doc.name}, Type: {question_type}")
-        print(f"  Selected answers: {selected_answers}")
-        
-        if question_type in ["Single Correct Answer", "Multiple Correct Answer"]:
-            # Question doctype uses 'options' table (child table) with 'option' and 'is_correct' fields
-            correct_answers = []
-            if hasattr(question_doc, 'options') and question_doc.options:
-                for idx, opt in enumerate(question_doc.options):
-                    if getattr(opt, 'is_correct', 0):
-                        correct_answers.append(idx + 1)  # Options are 1-indexed
-            
-            print(f"  Correct answers: {correct_answers}")
-            
-            # Check if selected answers match correct answers
-            if len(selected_answers) != len(correct_answers):
-                print(f"  ✗ Answer count mismatch: selected={len(selected_answers)}, correct={len(correct_answers)}")
-                return False
-            
-            is_correct = set(selected_answers) == set(correct_answers)
-            print(f"  {'✓' if is_correct else '✗'} Answer is {'correct' if is_correct else 'incorrect'}")
-            return is_correct
+        if isinstance(question_doc, dict):
+            entry = question_doc
         else:
-            # For other types, assume correct if answered
-            print(f"  Unknown question type, assuming correct if answered")
-            return len(selected_answers) > 0
-    
+            entry = _answer_key_entry_from_doc(question_doc)
+        return is_answer_correct(entry, _selected_answers_for_check(selected_answers))
     except Exception as e:
-        error_msg = f"Error checking answer: {str(e)}"
-        print(f"  ✗ ERROR: {error_msg}")
-        frappe.log_error(f"{error_msg}\nTraceback: {frappe.get_traceback()}", "Quiz API")
+        diag.error("Error checking answer: {}", str(e), title="Quiz API")
         return False
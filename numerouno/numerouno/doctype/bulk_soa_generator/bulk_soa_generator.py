@@ -10,6 +10,10 @@ from erpnext.accounts.party import get_party_account_currency
 from erpnext import get_company_currency
 import json
 
+from numerouno.numerouno.utils.diagnostics import get_diagnostics
+
+diag = get_diagnostics("soa")
+
 
 class BulkSOAGenerator(Document):
     def validate(self):
@@ -65,16 +69,30 @@ def generate_bulk_soa_pdf(doc_name):
         
         # Debug: Print initial data structure
         if doc.report_type == "Accounts Receivable":
-            print(f"\n=== INITIAL AR DATA DEBUG - Customer: {customer} ===")
-            print(f"Total rows from AR report: {len(data)}")
+            diag.debug("=== INITIAL AR DATA DEBUG - Customer: {} ===", customer)
+            diag.debug("Total rows from AR report: {}", len(data))
             if len(data) > 0:
-                print(f"Sample row keys: {list(data[0].keys())}")
-                print(f"First 3 rows sample:")
+                diag.debug("Sample row keys: {}", list(data[0].keys()))
+                diag.debug("First 3 rows sample:")
                 for idx, row in enumerate(data[:3]):
-                    print(f"  Row {idx}: voucher_no={row.get('voucher_no')}, voucher_type={row.get('voucher_type')}")
-                    print(f"    outstanding={row.get('outstanding')}, outstanding_amount={row.get('outstanding_amount')}, outstanding_balance={row.get('outstanding_balance')}")
-                    print(f"    invoiced={row.get('invoiced')}, invoiced_amount={row.get('invoiced_amount')}")
-            print(f"=== END INITIAL AR DATA DEBUG ===\n")
+                    diag.debug(
+                        "  Row {}: voucher_no={}, voucher_type={}",
+                        idx,
+                        row.get('voucher_no'),
+                        row.get('voucher_type'),
+                    )
+                    diag.debug(
+                        "    outstanding={}, outstanding_amount={}, outstanding_balance={}",
+                        row.get('outstanding'),
+                        row.get('outstanding_amount'),
+                        row.get('outstanding_balance'),
+                    )
+                    diag.debug(
+                        "    invoiced={}, invoiced_amount={}",
+                        row.get('invoiced'),
+                        row.get('invoiced_amount'),
+                    )
+            diag.debug("=== END INITIAL AR DATA DEBUG ===")
         
         # For Accounts Receivable: Filter out zero outstanding transactions early
         # This prevents processing invoices that are fully paid (not receivable)
@@ -83,9 +101,9 @@ def generate_bulk_soa_pdf(doc_name):
             precision = frappe.get_precision("Sales Invoice", "outstanding_amount") or 2
             epsilon = 0.5 / (10 ** precision)
             
-            print(f"\n=== EARLY FILTER DEBUG - Customer: {customer} ===")
-            print(f"Total rows from AR report: {len(data)}")
-            print(f"Epsilon value: {epsilon}")
+            diag.debug("=== EARLY FILTER DEBUG - Customer: {} ===", customer)
+            diag.debug("Total rows from AR report: {}", len(data))
+            diag.debug("Epsilon value: {}", epsilon)
             
             filtered_data = []
             skipped_count = 0
@@ -108,9 +126,14 @@ def generate_bulk_soa_pdf(doc_name):
                 
                 # Debug print for first few rows
                 if idx < 5:
-                    print(f"Row {idx}: voucher_no={voucher_no}, voucher_type={voucher_type}")
-                    print(f"  outstanding={row.get('outstanding')}, outstanding_amount={row.get('outstanding_amount')}, outstanding_balance={row.get('outstanding_balance')}")
-                    print(f"  Calculated outstanding_abs={outstanding_abs}, epsilon={epsilon}")
+                    diag.debug("Row {}: voucher_no={}, voucher_type={}", idx, voucher_no, voucher_type)
+                    diag.debug(
+                        "  outstanding={}, outstanding_amount={}, outstanding_balance={}",
+                        row.get('outstanding'),
+                        row.get('outstanding_amount'),
+                        row.get('outstanding_balance'),
+                    )
+                    diag.debug("  Calculated outstanding_abs={}, epsilon={}", outstanding_abs, epsilon)
                 
                 # For transaction rows: Skip if outstanding is zero (fully paid)
                 if voucher_no:
@@ -119,7 +142,12 @@ def generate_bulk_soa_pdf(doc_name):
                         # Skip this row - no outstanding amount means it's fully paid (not receivable)
                         skipped_count += 1
                         if skipped_count <= 10:  # Print first 10 skipped
-                            print(f"  SKIPPED Row {idx}: {voucher_no} - outstanding={outstanding_abs} <= epsilon")
+                            diag.debug(
+                                "  SKIPPED Row {}: {} - outstanding={} <= epsilon",
+                                idx,
+                                voucher_no,
+                                outstanding_abs,
+                            )
                         continue
                 else:
                     # For non-transaction rows (summary/header), only include if they have outstanding > 0
@@ -131,8 +159,8 @@ def generate_bulk_soa_pdf(doc_name):
                 
                 filtered_data.append(row)
             
-            print(f"After early filter: {len(filtered_data)} rows kept, {skipped_count} rows skipped")
-            print(f"=== END EARLY FILTER DEBUG ===\n")
+            diag.debug("After early filter: {} rows kept, {} rows skipped", len(filtered_data), skipped_count)
+            diag.debug("=== END EARLY FILTER DEBUG ===")
             
             data = filtered_data
             
@@ -153,8 +181,8 @@ def generate_bulk_soa_pdf(doc_name):
             precision = frappe.get_precision("Sales Invoice", "outstanding_amount") or 2
             epsilon = 0.5 / (10 ** precision)
             
-            print(f"\n=== FINAL FILTER DEBUG - Customer: {customer} ===")
-            print(f"Rows before final filter: {len(data)}")
+            diag.debug("=== FINAL FILTER DEBUG - Customer: {} ===", customer)
+            diag.debug("Rows before final filter: {}", len(data))
             
             final_filtered_data = []
             skipped_final_count = 0
@@ -175,32 +203,49 @@ def generate_bulk_soa_pdf(doc_name):
                     
                     # Debug print for first few rows
                     if idx < 5:
-                        print(f"Final Filter Row {idx}: {voucher_no}")
-                        print(f"  outstanding={row.get('outstanding')}, outstanding_amount={row.get('outstanding_amount')}")
-                        print(f"  Calculated outstanding_abs={outstanding_abs}")
+                        diag.debug("Final Filter Row {}: {}", idx, voucher_no)
+                        diag.debug(
+                            "  outstanding={}, outstanding_amount={}",
+                            row.get('outstanding'),
+                            row.get('outstanding_amount'),
+                        )
+                        diag.debug("  Calculated outstanding_abs={}", outstanding_abs)
                     
                     # If still zero, try fetching directly from Sales Invoice
                     if outstanding_abs <= epsilon and row.get('voucher_type') == 'Sales Invoice':
                         try:
                             si_doc = frappe.get_doc("Sales Invoice", voucher_no)
                             source_outstanding = abs(flt(si_doc.outstanding_amount))
-                            print(f"  Fetched from source: {voucher_no} -> outstanding={source_outstanding}")
+                            diag.debug(
+                                "  Fetched from source: {} -> outstanding={}",
+                                voucher_no,
+                                source_outstanding,
+                            )
                             outstanding_abs = source_outstanding
                             row['outstanding'] = flt(si_doc.outstanding_amount)
                         except Exception as e:
-                            print(f"  Error fetching {voucher_no}: {str(e)}")
+                            diag.debug("  Error fetching {}: {}", voucher_no, str(e))
                     
                     # Skip if outstanding is still zero
                     if outstanding_abs <= epsilon:
                         skipped_final_count += 1
                         if skipped_final_count <= 10:
-                            print(f"  SKIPPED Final Row {idx}: {voucher_no} - outstanding={outstanding_abs} <= epsilon")
+                            diag.debug(
+                                "  SKIPPED Final Row {}: {} - outstanding={} <= epsilon",
+                                idx,
+                                voucher_no,
+                                outstanding_abs,
+                            )
                         continue
                 
                 final_filtered_data.append(row)
             
-            print(f"After final filter: {len(final_filtered_data)} rows kept, {skipped_final_count} rows skipped")
-            print(f"=== END FINAL FILTER DEBUG ===\n")
+            diag.debug(
+                "After final filter: {} rows kept, {} rows skipped",
+                len(final_filtered_data),
+                skipped_final_count,
+            )
+            diag.debug("=== END FINAL FILTER DEBUG ===")
             
             data = final_filtered_data
             
@@ -257,7 +302,7 @@ def send_bulk_soa_emails(doc_name):
             # Get recipients
             recipients = get_customer_emails(customer_doc)
             if not recipients:
-                frappe.log_error(f"No email found for customer {customer}")
+                diag.warning("No email found for customer {}", customer)
                 error_count += 1
                 continue
             
@@ -372,12 +417,15 @@ def generate_soa_html(doc, customer_doc, columns, data, filters):
             if has_sales_invoices:
                 is_ar_report = True
     
-    print(f"\n=== REPORT TYPE CHECK ===")
-    print(f"doc.report_type = '{doc.report_type}' (type: {type(doc.report_type).__name__})")
-    print(f"filters.report_name = '{filters.get('report_name', '') if filters else 'N/A'}'")
-    print(f"Data has outstanding fields: {data[0].get('outstanding') is not None if data and len(data) > 0 else 'N/A'}")
-    print(f"is_ar_report = {is_ar_report}")
-    print(f"=== END REPORT TYPE CHECK ===\n")
+    diag.debug("=== REPORT TYPE CHECK ===")
+    diag.debug("doc.report_type = '{}' (type: {})", doc.report_type, type(doc.report_type).__name__)
+    diag.debug("filters.report_name = '{}'", filters.get('report_name', '') if filters else 'N/A')
+    diag.debug(
+        "Data has outstanding fields: {}",
+        data[0].get('outstanding') is not None if data and len(data) > 0 else 'N/A',
+    )
+    diag.debug("is_ar_report = {}", is_ar_report)
+    diag.debug("=== END REPORT TYPE CHECK ===")
     
     # Get LPO data for the customer
     lpo_data = get_customer_lpo_data(customer_doc.name, doc.from_date, doc.to_date)
@@ -454,8 +502,8 @@ def generate_soa_html(doc, customer_doc, columns, data, filters):
     # Filter out rows that are not relevant for Accounts Receivable
     # For AR reports, we only want transactions with outstanding amounts > 0
     # Excludes: Fully paid invoices (outstanding = 0), zero-amount transactions, etc.
-    print(f"\n=== HTML GENERATION FILTER DEBUG - Customer: {customer_doc.name} ===")
-    print(f"Rows before HTML filter: {len(data)}")
+    diag.debug("=== HTML GENERATION FILTER DEBUG - Customer: {} ===", customer_doc.name)
+    diag.debug("Rows before HTML filter: {}", len(data))
     
     filtered_data = []
     precision = frappe.get_precision("Sales Invoice", "outstanding_amount") or 2
@@ -474,10 +522,21 @@ def generate_soa_html(doc, customer_doc, columns, data, filters):
         
         # Debug print for first few rows
         if idx < 5:
-            print(f"HTML Filter Row {idx}: voucher_no='{voucher_no}' (type={type(voucher_no).__name__}), voucher_type='{voucher_type}'")
-            print(f"  invoiced={invoiced}, outstanding={outstanding}")
-            print(f"  invoiced_abs={invoiced_abs}, outstanding_abs={outstanding_abs}, epsilon={epsilon}")
-            print(f"  is_ar_report={is_ar_report}")
+            diag.debug(
+                "HTML Filter Row {}: voucher_no='{}' (type={}), voucher_type='{}'",
+                idx,
+                voucher_no,
+                type(voucher_no).__name__,
+                voucher_type,
+            )
+            diag.debug("  invoiced={}, outstanding={}", invoiced, outstanding)
+            diag.debug(
+                "  invoiced_abs={}, outstanding_abs={}, epsilon={}",
+                invoiced_abs,
+                outstanding_abs,
+                epsilon,
+            )
+            diag.debug("  is_ar_report={}", is_ar_report)
         
         # For Accounts Receivable reports: Exclude transactions with zero outstanding amount
         # If outstanding = 0, the invoice is fully paid and not receivable anymore
@@ -494,11 +553,15 @@ def generate_soa_html(doc, customer_doc, columns, data, filters):
             # Skip rows with no voucher_no (empty/invalid rows)
             voucher_no_empty = not voucher_no or (isinstance(voucher_no, str) and voucher_no.strip() == '')
             if idx < 5:
-                print(f"  Checking empty voucher_no: voucher_no='{voucher_no}', empty={voucher_no_empty}")
+                diag.debug(
+                    "  Checking empty voucher_no: voucher_no='{}', empty={}",
+                    voucher_no,
+                    voucher_no_empty,
+                )
             if voucher_no_empty:
                 skipped_html_count += 1
                 if skipped_html_count <= 10:
-                    print(f"  SKIPPED HTML Row {idx}: Empty voucher_no (value='{voucher_no}')")
+                    diag.debug("  SKIPPED HTML Row {}: Empty voucher_no (value='{}')", idx, voucher_no)
                 continue
             
             # For Sales Invoices: Double-check from source document before filtering
@@ -508,12 +571,21 @@ def generate_soa_html(doc, customer_doc, columns, data, filters):
                     si_doc = frappe.get_doc("Sales Invoice", voucher_no)
                     source_outstanding = abs(flt(si_doc.outstanding_amount))
                     if idx < 5:
-                        print(f"  Source check: {voucher_no} -> source_outstanding={source_outstanding}, report_outstanding={outstanding_abs}")
+                        diag.debug(
+                            "  Source check: {} -> source_outstanding={}, report_outstanding={}",
+                            voucher_no,
+                            source_outstanding,
+                            outstanding_abs,
+                        )
                     if source_outstanding <= epsilon:
                         # Source confirms it's fully paid, skip it
                         skipped_html_count += 1
                         if skipped_html_count <= 10:
-                            print(f"  SKIPPED HTML Row {idx}: {voucher_no} - source confirms outstanding=0")
+                            diag.debug(
+                                "  SKIPPED HTML Row {}: {} - source confirms outstanding=0",
+                                idx,
+                                voucher_no,
+                            )
                         continue
                     else:
                         # Use source value (more reliable than report data)
@@ -523,22 +595,43 @@ def generate_soa_html(doc, customer_doc, columns, data, filters):
                     # If we can't verify, skip it to be safe
                     skipped_html_count += 1
                     if skipped_html_count <= 10:
-                        print(f"  SKIPPED HTML Row {idx}: {voucher_no} - ERROR verifying source: {str(e)}")
+                        diag.debug(
+                            "  SKIPPED HTML Row {}: {} - ERROR verifying source: {}",
+                            idx,
+                            voucher_no,
+                            str(e),
+                        )
                     continue
             
             # Skip ALL rows with zero outstanding (regardless of voucher type)
             # This is the main filter - only show what's actually receivable
             should_skip_zero = outstanding_abs <= epsilon
             if idx < 5:
-                print(f"  Checking zero outstanding: outstanding_abs={outstanding_abs}, epsilon={epsilon}, should_skip={should_skip_zero}")
+                diag.debug(
+                    "  Checking zero outstanding: outstanding_abs={}, epsilon={}, should_skip={}",
+                    outstanding_abs,
+                    epsilon,
+                    should_skip_zero,
+                )
             if should_skip_zero:
                 skipped_html_count += 1
                 if skipped_html_count <= 10:
-                    print(f"  SKIPPED HTML Row {idx}: {voucher_no} (type={voucher_type}) - outstanding={outstanding_abs} <= epsilon")
+                    diag.debug(
+                        "  SKIPPED HTML Row {}: {} (type={}) - outstanding={} <= epsilon",
+                        idx,
+                        voucher_no,
+                        voucher_type,
+                        outstanding_abs,
+                    )
                 continue
             
             if idx < 5:
-                print(f"  KEEPING HTML Row {idx}: {voucher_no} - outstanding={outstanding_abs} > epsilon")
+                diag.debug(
+                    "  KEEPING HTML Row {}: {} - outstanding={} > epsilon",
+                    idx,
+                    voucher_no,
+                    outstanding_abs,
+                )
         else:
             # For General Ledger: Skip if both amounts are zero (no meaningful transaction)
             if invoiced_abs <= epsilon and outstanding_abs <= epsilon:
@@ -548,8 +641,8 @@ def generate_soa_html(doc, customer_doc, columns, data, filters):
         # Include the row if it passed all filters (has outstanding amount > 0)
         filtered_data.append(row)
     
-    print(f"After HTML filter: {len(filtered_data)} rows kept, {skipped_html_count} rows skipped")
-    print(f"=== END HTML GENERATION FILTER DEBUG ===\n")
+    diag.debug("After HTML filter: {} rows kept, {} rows skipped", len(filtered_data), skipped_html_count)
+    diag.debug("=== END HTML GENERATION FILTER DEBUG ===")
     
     data = filtered_data
     
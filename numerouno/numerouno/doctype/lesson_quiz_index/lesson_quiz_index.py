@@ -0,0 +1,8 @@
+# Copyright (c) 2026, mohtashim and contributors
+# For license information, please see license.txt
+
+from frappe.model.document import Document
+
+
+class LessonQuizIndex(Document):
+	pass
@@ -290,6 +290,48 @@ def create_from_assessment_result(assessment_result_name):
 	return {"name": doc.name, "existing": False, "retest_status": doc.retest_status, "retest_valid_until": doc.retest_valid_until}
 
 
+def _retest_status(checklist, first_assessment_date):
+	eligibility = get_retest_eligibility(first_assessment_date) if first_assessment_date else {
+		"eligible": True,
+		"retest_valid_until": None,
+		"days_remaining": None,
+		"message": "",
+	}
+
+	if checklist:
+		return {
+			"checklist": checklist.name,
+			"retest_status": checklist.retest_status,
+			"retest_valid_until": checklist.retest_valid_until,
+			**eligibility,
+		}
+
+	return {
+		"checklist": None,
+		"retest_status": "Eligible" if eligibility.get("eligible") else "Expired",
+		"retest_valid_until": eligibility.get("retest_valid_until"),
+		**eligibility,
+	}
+
+
+def _retest_allowed(first_failed_activity):
+	if not first_failed_activity:
+		return {"allowed": True, "eligible": True, "message": ""}
+
+	first = first_failed_activity
+	first_date = first.activity_date or getdate(first.creation)
+	eligibility = get_retest_eligibility(first_date)
+	return {
+		"allowed": eligibility.get("eligible"),
+		"eligible": eligibility.get("eligible"),
+		"first_assessment_date": eligibility.get("first_assessment_date"),
+		"retest_valid_until": eligibility.get("retest_valid_until"),
+		"days_remaining": eligibility.get("days_remaining"),
+		"message": eligibility.get("message"),
+		"first_failed_activity": first.name,
+	}
+
+
 @frappe.whitelist()
 def get_retest_status_for_activity(quiz_activity_name=None, assessment_result_name=None):
 	quiz_activity_name = (quiz_activity_name or "").strip()
@@ -299,28 +341,21 @@ def get_retest_status_for_activity(quiz_activity_name=None, assessment_result_na
 	first_assessment_date = None
 	if quiz_activity_name:
 		checklist_name = _find_existing_checklist({"quiz_activity": quiz_activity_name})
-		if not first_assessment_date:
-			activity = frappe.db.get_value(
-				"Quiz Activity",
-				quiz_activity_name,
-				["activity_date", "creation", "status"],
-				as_dict=True,
-			)
-			if activity:
-				first_assessment_date = activity.activity_date or getdate(activity.creation)
+		activity = frappe.db.get_value(
+			"Quiz Activity",
+			quiz_activity_name,
+			["activity_date", "creation", "status"],
+			as_dict=True,
+		)
+		if activity:
+			first_assessment_date = activity.activity_date or getdate(activity.creation)
 	elif assessment_result_name:
 		checklist_name = _find_existing_checklist({"assessment_result": assessment_result_name})
 		first_assessment_date = frappe.db.get_value("Assessment Result", assessment_result_name, "creation")
 		if first_assessment_date:
 			first_assessment_date = getdate(first_assessment_date)
 
-	eligibility = get_retest_eligibility(first_assessment_date) if first_assessment_date else {
-		"eligible": True,
-		"retest_valid_until": None,
-		"days_remaining": None,
-		"message": "",
-	}
-
+	checklist = None
 	if checklist_name:
 		checklist = frappe.db.get_value(
 			"NYC Reassessment Checklist",
@@ -328,19 +363,7 @@ def get_retest_status_for_activity(quiz_activity_name=None, assessment_result_na
 			["name", "retest_status", "retest_valid_until"],
 			as_dict=True,
 		)
-		return {
-			"checklist": checklist.name,
-			"retest_status": checklist.retest_status,
-			"retest_valid_until": checklist.retest_valid_until,
-			**eligibility,
-		}
-
-	return {
-		"checklist": None,
-		"retest_status": "Eligible" if eligibility.get("eligible") else "Expired",
-		"retest_valid_until": eligibility.get("retest_valid_until"),
-		**eligibility,
-	}
+	return _retest_status(checklist, first_assessment_date)
 
 
 def check_retest_allowed(student, student_group, quiz_name=None):
@@ -356,20 +379,95 @@ def check_retest_allowed(student, student_group, quiz_name=None):
 		order_by="creation asc",
 		limit=1,
 	)
-	if not failed_activities:
-		return {"allowed": True, "eligible": True, "message": ""}
+	return _retest_allowed(failed_activities[0] if failed_activities else None)
+
+
+def get_retest_status_map(quiz_activity_names=None, assessment_result_names=None, student_quizzes=None):
+	"""Batch form of `get_retest_status_for_activity` and `check_retest_allowed` for listings.
+
+	Returns `{"quiz_activity": {name: status}, "assessment_result": {name: status},
+	"student_quiz": {(student, quiz): retest}}` with the same per-key values as
+	the single lookups, from one IN query each on NYC Reassessment Checklist,
+	Quiz Activity and Assessment Result.
+	"""
+	quiz_activity_names = sorted({name for name in quiz_activity_names or () if name})
+	assessment_result_names = sorted({name for name in assessment_result_names or () if name})
+	student_quizzes = {(student, quiz or None) for student, quiz in student_quizzes or () if student}
+
+	checklists = {"quiz_activity": {}, "assessment_result": {}}
+	if quiz_activity_names or assessment_result_names:
+		or_filters = []
+		if quiz_activity_names:
+			or_filters.append(["quiz_activity", "in", quiz_activity_names])
+		if assessment_result_names:
+			or_filters.append(["assessment_result", "in", assessment_result_names])
+		for row in frappe.get_all(
+			"NYC Reassessment Checklist",
+			filters={"docstatus": ["<", 2]},
+			or_filters=or_filters,
+			fields=["name", "quiz_activity", "assessment_result", "retest_status", "retest_valid_until"],
+			order_by="creation desc",
+		):
+			# Newest checklist wins, as in `_find_existing_checklist`.
+			if row.quiz_activity:
+				checklists["quiz_activity"].setdefault(row.quiz_activity, row)
+			if row.assessment_result:
+				checklists["assessment_result"].setdefault(row.assessment_result, row)
+
+	activity_dates = {}
+	first_failed = {}
+	if quiz_activity_names or student_quizzes:
+		conditions = []
+		values = {}
+		if quiz_activity_names:
+			conditions.append("name IN %(activities)s")
+			values["activities"] = tuple(quiz_activity_names)
+		if student_quizzes:
+			failed_condition = "status = 'Fail' AND docstatus < 2 AND student IN %(students)s"
+			values["students"] = tuple({student for student, _quiz in student_quizzes})
+			if all(quiz for _student, quiz in student_quizzes):
+				failed_condition += " AND quiz IN %(quizzes)s"
+				values["quizzes"] = tuple({quiz for _student, quiz in student_quizzes})
+			conditions.append(f"({failed_condition})")
+
+		for row in frappe.db.sql(
+			f"""
+			SELECT name, student, quiz, status, docstatus, activity_date, creation
+			FROM `tabQuiz Activity`
+			WHERE {" OR ".join(conditions)}
+			ORDER BY creation ASC
+			""",
+			values,
+			as_dict=True,
+		):
+			if row.name in quiz_activity_names:
+				activity_dates[row.name] = row.activity_date or getdate(row.creation)
+			if row.status == "Fail" and row.docstatus < 2:
+				for key in ((row.student, row.quiz), (row.student, None)):
+					if key in student_quizzes:
+						first_failed.setdefault(key, row)
+
+	result_dates = {}
+	if assessment_result_names:
+		result_dates = {
+			row.name: getdate(row.creation)
+			for row in frappe.get_all(
+				"Assessment Result",
+				filters={"name": ["in", assessment_result_names]},
+				fields=["name", "creation"],
+			)
+		}
 
-	first = failed_activities[0]
-	first_date = first.activity_date or getdate(first.creation)
-	eligibility = get_retest_eligibility(first_date)
 	return {
-		"allowed": eligibility.get("eligible"),
-		"eligible": eligibility.get("eligible"),
-		"first_assessment_date": eligibility.get("first_assessment_date"),
-		"retest_valid_until": eligibility.get("retest_valid_until"),
-		"days_remaining": eligibility.get("days_remaining"),
-		"message": eligibility.get("message"),
-		"first_failed_activity": first.name,
+		"quiz_activity": {
+			name: _retest_status(checklists["quiz_activity"].get(name), activity_dates.get(name))
+			for name in quiz_activity_names
+		},
+		"assessment_result": {
+			name: _retest_status(checklists["assessment_result"].get(name), result_dates.get(name))
+			for name in assessment_result_names
+		},
+		"student_quiz": {key: _retest_allowed(first_failed.get(key)) for key in student_quizzes},
 	}
 
 
@@ -1,4 +1,5 @@
 import frappe
+from frappe.utils import getdate, today
 
 from numerouno.numerouno.utils.assessment_eligibility import ensure_assessment_eligible
 
@@ -18,3 +19,9 @@ def validate_quiz_activity_eligibility(doc, method=None):
 		return
 
 	ensure_assessment_eligible(doc.student, student_group, throw=True)
+
+
+def set_default_activity_date(doc, method=None):
+	# Submission history pages on the raw activity_date column; it must never be empty.
+	if not doc.activity_date:
+		doc.activity_date = getdate(doc.creation) if doc.creation else today()
@@ -0,0 +1,135 @@
+frappe.pages["diagnostics-console"].on_page_load = function (wrapper) {
+	const page = frappe.ui.make_app_page({
+		parent: wrapper,
+		title: __("Diagnostics Console"),
+		single_column: true,
+	});
+
+	new DiagnosticsConsole(page);
+};
+
+class DiagnosticsConsole {
+	constructor(page) {
+		this.page = page;
+		this.make_filters();
+		this.make_layout();
+		this.bind_actions();
+		this.refresh();
+	}
+
+	make_filters() {
+		this.channel = this.page.add_field({
+			fieldname: "channel",
+			label: __("Channel"),
+			fieldtype: "Select",
+			options: ["", "quiz", "ocr", "soa"],
+			change: () => this.refresh(),
+		});
+		this.level = this.page.add_field({
+			fieldname: "level",
+			label: __("Minimum Level"),
+			fieldtype: "Select",
+			options: ["debug", "info", "warning", "error"],
+			default: "debug",
+			change: () => this.refresh(),
+		});
+		this.endpoint = this.page.add_field({
+			fieldname: "endpoint",
+			label: __("Endpoint Contains"),
+			fieldtype: "Data",
+			change: () => this.refresh(),
+		});
+		this.limit = this.page.add_field({
+			fieldname: "limit",
+			label: __("Limit"),
+			fieldtype: "Int",
+			default: 200,
+		});
+	}
+
+	make_layout() {
+		this.$root = $(`
+			<div class="diagnostics-console">
+				<div class="dc-config text-muted small mb-3"></div>
+				<div class="card">
+					<div class="card-header d-flex justify-content-between align-items-center">
+						<h5 class="mb-0">${__("Recent Entries")}</h5>
+						<span class="dc-count badge badge-secondary"></span>
+					</div>
+					<div class="card-body p-0">
+						<div class="dc-table"></div>
+					</div>
+				</div>
+			</div>
+		`);
+		this.page.main.append(this.$root);
+	}
+
+	bind_actions() {
+		this.page.set_primary_action(__("Refresh"), () => this.refresh(), "refresh");
+		this.page.add_inner_button(__("Clear Buffer"), () => this.clear());
+	}
+
+	refresh() {
+		frappe
+			.call({
+				method: "numerouno.numerouno.page.diagnostics_console.diagnostics_console.get_diagnostics_data",
+				args: {
+					channel: this.channel.get_value(),
+					level: this.level.get_value(),
+					endpoint: this.endpoint.get_value(),
+					limit: this.limit.get_value() || 200,
+				},
+			})
+			.then((r) => this.render(r.message || {}));
+	}
+
+	clear() {
+		frappe.confirm(__("Clear every buffered diagnostics entry?"), () => {
+			frappe
+				.call({
+					method: "numerouno.numerouno.page.diagnostics_console.diagnostics_console.clear_diagnostics",
+				})
+				.then(() => this.refresh());
+		});
+	}
+
+	render(data) {
+		const config = data.config || {};
+		const overrides = Object.keys(config.endpoints || {});
+		this.$root.find(".dc-config").text(
+			`${__("Level")}: ${config.level} | ${__("Sample Rate")}: ${config.sample_rate}` +
+				(overrides.length ? ` | ${__("Endpoint Overrides")}: ${overrides.join(", ")}` : "")
+		);
+
+		const rows = data.entries || [];
+		this.$root.find(".dc-count").text(`${rows.length} ${__("rows")}`);
+		if (!rows.length) {
+			this.$root
+				.find(".dc-table")
+				.html(`<div class="p-4 text-muted text-center">${__("No diagnostics entries for selected filters.")}</div>`);
+			return;
+		}
+
+		const columns = [
+			{ name: __("Time"), format: (row) => frappe.datetime.str_to_user(frappe.datetime.get_datetime_as_string(new Date(row.ts * 1000))) },
+			{ name: __("Level"), format: (row) => row.level },
+			{ name: __("Channel"), format: (row) => row.channel },
+			{ name: __("Endpoint"), format: (row) => row.endpoint },
+			{ name: __("Message"), format: (row) => row.message + (row.context ? ` ${JSON.stringify(row.context)}` : "") },
+		];
+		const $table = $('<table class="table table-bordered table-sm mb-0"></table>');
+		const $thead = $("<thead><tr></tr></thead>");
+		columns.forEach((col) => $thead.find("tr").append(`<th>${col.name}</th>`));
+		const $tbody = $("<tbody></tbody>");
+		rows.forEach((row) => {
+			const $tr = $("<tr></tr>");
+			columns.forEach((col) => {
+				$tr.append(`<td>${frappe.utils.escape_html(String(col.format(row) || ""))}</td>`);
+			});
+			$tbody.append($tr);
+		});
+		$table.append($thead).append($tbody);
+		this.$root.find(".dc-table").html("").append($table);
+	}
+}
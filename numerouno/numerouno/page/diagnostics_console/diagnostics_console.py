@@ -0,0 +1,29 @@
+# Copyright (c) 2026, mohtashim and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.utils import cint
+
+from numerouno.numerouno.utils.diagnostics import LEVELS, _get_config, clear_entries, get_entries
+
+
+@frappe.whitelist()
+def get_diagnostics_data(channel=None, level=None, endpoint=None, limit=200):
+	frappe.only_for("System Manager")
+	config = _get_config()
+	return {
+		"entries": get_entries(channel=channel, level=level, endpoint=endpoint, limit=cint(limit) or 200),
+		"config": {
+			"level": config.get("level") or "warning",
+			"sample_rate": config.get("sample_rate", 1),
+			"endpoints": config.get("endpoints") or {},
+		},
+		"levels": [name for name in LEVELS if name != "off"],
+	}
+
+
+@frappe.whitelist(methods=["POST"])
+def clear_diagnostics():
+	frappe.only_for("System Manager")
+	clear_entries()
+	return {"status": "success"}
@@ -1159,6 +1159,7 @@ function _instructor_portal_boot(page) {
 	var attendanceOffset = 0;
 	var cardsOffset = 0;
 	var quizOffset = 0;
+	var quizCursor = null;
 	var resultOffset = 0;
 	var formSectionOffsets = {
 		resit: 0,
@@ -1519,7 +1520,7 @@ function _instructor_portal_boot(page) {
 			method: "numerouno.numerouno.page.instructor_portal.instructor_portal.get_instructor_quiz_status",
 			args: {
 				limit: pageSize,
-				offset: quizOffset,
+				cursor: quizOffset > 0 ? quizCursor : null,
 				student_group: filterState.student_group,
 				student: filterState.student,
 				course: filterState.course,
@@ -1528,6 +1529,7 @@ function _instructor_portal_boot(page) {
 			callback: function (r) {
 				var message = r.message || {};
 				isAdnocInstructor = !!message.is_adnoc_instructor;
+				quizCursor = message.next_cursor || null;
 				render_quiz_status(message.records || [], quizOffset > 0);
 			},
 			error: function () {
@@ -1761,7 +1763,7 @@ function _instructor_portal_boot(page) {
 
 	function bind_quiz_load_more(count) {
 		$("#quiz-load-more").remove();
-		if (count < pageSize) return;
+		if (count < pageSize || !quizCursor) return;
 
 		$("#quiz-section .portal-panel").append(`
 			<div class="mt-2 text-center">
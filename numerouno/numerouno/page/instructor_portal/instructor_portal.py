@@ -1,7 +1,16 @@
+import base64
+import json
+
 import frappe
 from frappe import _
 
 from numerouno.numerouno.permissions import ADNOC_CERTIFICATE_VIEW_ROLE
+from numerouno.numerouno.utils.instructor_scope import (
+    get_adnoc_scope,
+    get_instructor_scope,
+    get_student_group_names_for_instructors,
+)
+from numerouno.numerouno.utils.quiz_activity_score import get_quiz_question_link_map
 
 
 def _has_adnoc_certificate_view_role(roles):
@@ -9,45 +18,7 @@ def _has_adnoc_certificate_view_role(roles):
 
 
 def _get_instructor_names_for_user(user):
-    instructor_names = set(
-        frappe.get_all("Instructor", filters={"custom_email": user}, pluck="name")
-    )
-
-    employee = frappe.db.get_value("Employee", {"user_id": user}, "name")
-    if employee:
-        instructor_names.update(
-            frappe.get_all("Instructor", filters={"employee": employee}, pluck="name")
-        )
-
-    return sorted(instructor_names)
-
-
-def _get_student_group_names_for_instructors(instructor_names):
-    if not instructor_names:
-        return []
-
-    rows = frappe.get_all(
-        "Student Group Instructor",
-        filters={"instructor": ["in", instructor_names]},
-        fields=["parent"],
-        group_by="parent",
-    )
-    return [row.parent for row in rows]
-
-
-def _get_adnoc_instructor_names(instructor_names):
-    if not instructor_names:
-        return set()
-
-    rows = frappe.get_all(
-        "Instructor",
-        filters={
-            "name": ["in", list(instructor_names)],
-            "custom_is_adnoc_instructor": 1,
-        },
-        pluck="name",
-    )
-    return set(rows)
+    return get_instructor_scope(user)["instructor_names"]
 
 
 def _is_adnoc_instructor(user, roles, instructor_name=None):
@@ -56,11 +27,9 @@ def _is_adnoc_instructor(user, roles, instructor_name=None):
 
     instructor_name = (instructor_name or "").strip()
     if instructor_name:
-        return bool(
-            frappe.db.get_value("Instructor", instructor_name, "custom_is_adnoc_instructor")
-        )
+        return instructor_name in get_adnoc_scope()["instructor_names"]
 
-    return bool(_get_adnoc_instructor_names(_get_instructor_names_for_user(user)))
+    return bool(get_instructor_scope(user)["adnoc_instructor_names"])
 
 
 def _can_download_adnoc_theory_assessment(assessment_result, user, roles):
@@ -80,7 +49,7 @@ def _can_download_adnoc_theory_assessment(assessment_result, user, roles):
             pluck="instructor",
         )
     )
-    adnoc_group_instructors = _get_adnoc_instructor_names(group_instructors)
+    adnoc_group_instructors = group_instructors.intersection(get_adnoc_scope()["instructor_names"])
     if not adnoc_group_instructors:
         return False
 
@@ -111,18 +80,13 @@ def _is_failed_assessment_result(assessment_result):
 
 def _is_failed_quiz_for_assessment_result(assessment_result):
     """Fallback: mark failed if linked Quiz Activity score is below passing."""
-    activity_name = frappe.db.get_value(
+    # Quiz Activity status is materialized from its result rows at write time.
+    status = frappe.db.get_value(
         "Quiz Activity",
         {"custom_assesment_result": assessment_result},
-        "name",
+        "status",
     )
-    if not activity_name:
-        # reverse link from Assessment Result if stored elsewhere is not required
-        return False
-
-    activity = frappe.get_doc("Quiz Activity", activity_name)
-    summary = _get_activity_score_summary([activity]).get(activity_name) or {}
-    return (summary.get("status") or activity.status or "").strip() == "Fail"
+    return (status or "").strip() == "Fail"
 
 
 def _get_student_name_map(student_ids):
@@ -136,96 +100,113 @@ def _get_student_name_map(student_ids):
     )
     return {row.name: row.student_name for row in rows}
 
-def _get_mcqs_assignments(student_group_names):
-    assignment_filters = {}
-    if student_group_names:
-        assignment_filters["student_group"] = ["in", student_group_names]
-    return frappe.get_all(
-        "MCQS Assignment",
-        filters=assignment_filters,
-        fields=["name", "student_group", "mcqs", "modified"],
-        order_by="modified desc",
-    )
-
 
-def _get_group_students(group_names):
-    if not group_names:
-        return {}
-
-    rows = frappe.get_all(
-        "Student Group Student",
-        filters={"parent": ["in", list(group_names)], "active": 1},
-        fields=["parent", "student", "student_name"],
-    )
-    grouped = {}
-    for row in rows:
-        grouped.setdefault(row.parent, []).append(row)
-    return grouped
-
-
-def _get_quiz_passing_score_map(quiz_names):
-    if not quiz_names:
-        return {}
+def _quiz_roster_conditions(student_group_names, student=None):
+    """WHERE clause over the active roster x MCQS Assignment product (`ma`, `sgs`)."""
+    conditions = ["sgs.active = 1"]
+    values = {}
+    if student_group_names is not None:
+        conditions.append("ma.student_group IN %(student_groups)s")
+        values["student_groups"] = tuple(student_group_names)
+    if student:
+        conditions.append("sgs.student = %(student)s")
+        values["student"] = student
+    return conditions, values
 
-    rows = frappe.get_all(
-        "Quiz",
-        filters={"name": ["in", list(quiz_names)]},
-        fields=["name", "passing_score"],
-    )
-    return {row.name: float(row.passing_score or 75) for row in rows}
 
+def _encode_quiz_status_cursor(row):
+    raw = json.dumps([row["sort_name"], row["quiz"] or "", row["student_group"], row["student"]])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
 
-def _get_quiz_question_link_map(quiz_names):
-    """Map quiz -> {question_name: question_creation} using question_link when available."""
-    if not quiz_names:
-        return {}
 
-    has_question_link = frappe.get_meta("Quiz Question").has_field("question_link")
-    fields = ["parent", "question_link", "question"] if has_question_link else ["parent", "question"]
-    rows = frappe.get_all(
-        "Quiz Question",
-        filters={"parent": ["in", list(quiz_names)]},
-        fields=fields,
-        ignore_permissions=True,
+def _decode_quiz_status_cursor(cursor):
+    try:
+        sort_name, quiz, student_group, student = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except Exception:
+        frappe.throw(_("Invalid quiz status cursor"))
+    return sort_name, quiz, student_group, student
+
+
+def _get_quiz_roster_page(student_group_names, student=None, limit=200, offset=0, cursor=None):
+    """One page of (student, quiz) rows, ordered by (student_name, quiz) in the database.
+
+    `student_group` and `student` break ties so the keyset is unique. Returns
+    `(rows, next_cursor)`; `offset` is only honoured when no cursor is given.
+    """
+    conditions, values = _quiz_roster_conditions(student_group_names, student)
+    values["limit"] = limit + 1
+    values["offset"] = 0
+    if cursor:
+        values["after_name"], values["after_quiz"], values["after_group"], values["after_student"] = (
+            _decode_quiz_status_cursor(cursor)
+        )
+        conditions.append(
+            "(IFNULL(sgs.student_name, ''), IFNULL(ma.mcqs, ''), ma.student_group, sgs.student)"
+            " > (%(after_name)s, %(after_quiz)s, %(after_group)s, %(after_student)s)"
+        )
+    else:
+        values["offset"] = offset
+
+    rows = frappe.db.sql(
+        f"""
+        SELECT
+            sgs.student,
+            sgs.student_name,
+            IFNULL(sgs.student_name, '') AS sort_name,
+            ma.student_group,
+            ma.mcqs AS quiz
+        FROM `tabMCQS Assignment` ma
+        INNER JOIN `tabStudent Group Student` sgs ON sgs.parent = ma.student_group
+        WHERE {" AND ".join(conditions)}
+        ORDER BY IFNULL(sgs.student_name, ''), IFNULL(ma.mcqs, ''), ma.student_group, sgs.student
+        LIMIT %(limit)s OFFSET %(offset)s
+        """,
+        values,
+        as_dict=True,
     )
-
-    question_ids = set()
-    quiz_questions = {}
-    for row in rows:
-        question_name = None
-        if has_question_link:
-            question_name = (row.get("question_link") or "").strip()
-        if not question_name:
-            # Legacy quizzes may store the Question name in `question`
-            candidate = (row.get("question") or "").strip()
-            if candidate.startswith("QUESTION-") or frappe.db.exists("Question", candidate):
-                question_name = candidate
-        if not question_name:
-            continue
-        quiz_questions.setdefault(row.parent, set()).add(question_name)
-        question_ids.add(question_name)
-
-    created_map = {}
-    if question_ids:
-        for row in frappe.get_all(
-            "Question",
-            filters={"name": ["in", list(question_ids)]},
-            fields=["name", "creation"],
-            ignore_permissions=True,
-        ):
-            created_map[row.name] = row.creation
-
-    return {
-        quiz: {question: created_map.get(question) for question in questions}
-        for quiz, questions in quiz_questions.items()
-    }
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return rows, _encode_quiz_status_cursor(rows[-1]) if has_more else None
+
+
+def _get_quiz_roster_totals(student_group_names, student=None):
+    """Total, passed and failed (student, quiz) rows over the whole scope in one aggregate query.
+
+    A row counts as passed when any attempt passed and as failed when an
+    attempt failed and none passed, mirroring `_activity_display_rank`.
+    """
+    conditions, values = _quiz_roster_conditions(student_group_names, student)
+    totals = frappe.db.sql(
+        f"""
+        SELECT
+            COUNT(*) AS total,
+            IFNULL(SUM(roster.status_rank = 2), 0) AS passed,
+            IFNULL(SUM(roster.status_rank = 1), 0) AS failed
+        FROM (
+            SELECT (
+                SELECT MAX(CASE qa.status WHEN 'Pass' THEN 2 WHEN 'Fail' THEN 1 ELSE 0 END)
+                FROM `tabQuiz Activity` qa
+                WHERE qa.student = sgs.student AND qa.quiz = ma.mcqs
+            ) AS status_rank
+            FROM `tabMCQS Assignment` ma
+            INNER JOIN `tabStudent Group Student` sgs ON sgs.parent = ma.student_group
+            WHERE {" AND ".join(conditions)}
+        ) roster
+        """,
+        values,
+        as_dict=True,
+    )[0]
+    total = int(totals.total or 0)
+    passed = int(totals.passed or 0)
+    failed = int(totals.failed or 0)
+    return {"total": total, "passed": passed, "failed": failed, "pending": total - passed - failed}
 
 
 def _get_quiz_distinct_question_count_map(quiz_names):
     """Count unique Question links per quiz (duplicate Quiz Question rows count once)."""
     return {
         quiz: len(questions)
-        for quiz, questions in _get_quiz_question_link_map(quiz_names).items()
+        for quiz, questions in get_quiz_question_link_map(quiz_names).items()
     }
 
 
@@ -271,84 +252,6 @@ def _get_latest_submitted_plan_map(group_names):
     return plan_map
 
 
-def _get_activity_score_summary(activities):
-    activity_names = [row.name for row in activities if row.name]
-    if not activity_names:
-        return {}
-
-    result_rows = frappe.get_all(
-        "Quiz Result",
-        filters={"parent": ["in", activity_names], "parenttype": "Quiz Activity"},
-        fields=["parent", "quiz_result", "question"],
-        ignore_permissions=True,
-    )
-
-    summary = {}
-    for row in result_rows:
-        if not row.question:
-            continue
-        data = summary.setdefault(
-            row.parent,
-            {"correct_questions": set(), "answered_questions": set()},
-        )
-        data["answered_questions"].add(row.question)
-        if (row.quiz_result or "").strip().lower() == "correct":
-            data["correct_questions"].add(row.question)
-
-    passing_scores = _get_quiz_passing_score_map({row.quiz for row in activities if row.quiz})
-    activity_quiz_map = {row.name: row.quiz for row in activities if row.name}
-    activity_date_map = {
-        row.name: (getattr(row, "creation", None) or getattr(row, "activity_date", None))
-        for row in activities
-        if row.name
-    }
-    quiz_names = {quiz for quiz in activity_quiz_map.values() if quiz}
-    quiz_question_maps = _get_quiz_question_link_map(quiz_names)
-
-    for activity_name, data in summary.items():
-        quiz_name = activity_quiz_map.get(activity_name)
-        question_map = quiz_question_maps.get(quiz_name) or {}
-        activity_on = activity_date_map.get(activity_name)
-        if activity_on:
-            from frappe.utils import get_datetime
-
-            try:
-                activity_on = get_datetime(activity_on)
-            except Exception:
-                activity_on = None
-
-        # Ignore questions that were added to the bank after this attempt was taken.
-        if activity_on and question_map:
-            expected_questions = {
-                question
-                for question, created_on in question_map.items()
-                if not created_on or created_on <= activity_on
-            }
-        else:
-            expected_questions = set(question_map.keys())
-
-        # Always include answered questions so historical scores stay stable.
-        expected_questions |= set(data["answered_questions"])
-        expected_total = len(expected_questions) or len(data["answered_questions"])
-        correct = len(data["correct_questions"])
-        answered = len(data["answered_questions"])
-        is_complete = answered >= expected_total
-        percentage = (correct / expected_total * 100) if expected_total else 0
-        passing_score = passing_scores.get(quiz_name, 75)
-
-        data["correct"] = correct
-        data["answered"] = answered
-        data["score"] = f"{correct}/{expected_total}"
-        # Unanswered questions already reduce percentage via expected_total.
-        # Do not force Fail just because newer questions were added later.
-        data["status"] = "Pass" if percentage >= passing_score else "Fail"
-        data["is_complete"] = is_complete
-        data["expected_total"] = expected_total
-        data["percentage"] = percentage
-
-    return summary
-
-
 def _activity_display_rank(activity, summary):
     """Higher rank wins when multiple Quiz Activities exist for the same student + quiz."""
     summary = summary or {}
@@ -408,66 +311,56 @@ def _get_assessment_result_map(activities):
     return assessment_result_map
 
 
-def _attach_nyc_retest_info(row):
+def _attach_nyc_retest_info(rows):
 	"""Add NYC reassessment checklist / 3-month retest info for failed attempts."""
 	from numerouno.numerouno.doctype.nyc_reassessment_checklist.nyc_reassessment_checklist import (
-		check_retest_allowed,
-		get_retest_status_for_activity,
+		get_retest_status_map,
 	)
 
-	row["nyc_checklist"] = None
-	row["retest_eligible"] = None
-	row["retest_valid_until"] = None
-	row["retest_message"] = ""
-
-	if (row.get("status") or "") != "Fail":
+	failed_rows = []
+	for row in rows:
+		row["nyc_checklist"] = None
+		row["retest_eligible"] = None
+		row["retest_valid_until"] = None
+		row["retest_message"] = ""
+		if (row.get("status") or "") == "Fail":
+			failed_rows.append(row)
+	if not failed_rows:
 		return
 
-	activity_name = row.get("activity")
-	assessment_result = row.get("assessment_result")
-	if activity_name:
-		status = get_retest_status_for_activity(quiz_activity_name=activity_name)
-	elif assessment_result:
-		status = get_retest_status_for_activity(assessment_result_name=assessment_result)
-	else:
-		retest = check_retest_allowed(row.get("student"), row.get("student_group"), row.get("quiz"))
-		row["retest_eligible"] = retest.get("allowed")
-		row["retest_valid_until"] = retest.get("retest_valid_until")
-		row["retest_message"] = retest.get("message")
-		return
-
-	row["nyc_checklist"] = status.get("checklist")
-	row["retest_eligible"] = status.get("eligible")
-	row["retest_valid_until"] = status.get("retest_valid_until")
-	row["retest_message"] = status.get("message")
-	row["retest_status"] = status.get("retest_status")
-
-
-def _sync_activity_score_fields(activities, score_summary):
-    updated = False
-    for activity in activities:
-        summary = score_summary.get(activity.name)
-        if not summary:
-            continue
-
-        if activity.score == summary["score"] and activity.status == summary["status"]:
-            continue
-
-        frappe.db.set_value(
-            "Quiz Activity",
-            activity.name,
-            {
-                "score": summary["score"],
-                "status": summary["status"],
-            },
-            update_modified=False,
-        )
-        activity.score = summary["score"]
-        activity.status = summary["status"]
-        updated = True
+	retest_map = get_retest_status_map(
+		quiz_activity_names=[row.get("activity") for row in failed_rows if row.get("activity")],
+		assessment_result_names=[
+			row.get("assessment_result")
+			for row in failed_rows
+			if not row.get("activity") and row.get("assessment_result")
+		],
+		student_quizzes=[
+			(row.get("student"), row.get("quiz"))
+			for row in failed_rows
+			if not row.get("activity") and not row.get("assessment_result")
+		],
+	)
 
-    if updated:
-        frappe.db.commit()
+	for row in failed_rows:
+		activity_name = row.get("activity")
+		assessment_result = row.get("assessment_result")
+		if activity_name:
+			status = retest_map["quiz_activity"][activity_name]
+		elif assessment_result:
+			status = retest_map["assessment_result"][assessment_result]
+		else:
+			retest = retest_map["student_quiz"].get((row.get("student"), row.get("quiz") or None)) or {}
+			row["retest_eligible"] = retest.get("allowed")
+			row["retest_valid_until"] = retest.get("retest_valid_until")
+			row["retest_message"] = retest.get("message")
+			continue
+
+		row["nyc_checklist"] = status.get("checklist")
+		row["retest_eligible"] = status.get("eligible")
+		row["retest_valid_until"] = status.get("retest_valid_until")
+		row["retest_message"] = status.get("message")
+		row["retest_status"] = status.get("retest_status")
 
 
 def _course_requires_make_model(course):
@@ -514,33 +407,18 @@ def _attach_make_model_meta(records):
 def _resolve_student_group_names(user, roles, instructor_name=None):
     instructor_name = (instructor_name or "").strip()
     if user == "Administrator" or "System Manager" in roles:
-        allowed_instructors = None
+        scope = None
     elif _has_adnoc_certificate_view_role(roles):
-        allowed_instructors = sorted(
-            frappe.get_all(
-                "Instructor",
-                filters={"custom_is_adnoc_instructor": 1},
-                pluck="name",
-            )
-        )
+        scope = get_adnoc_scope()
     else:
-        allowed_instructors = _get_instructor_names_for_user(user)
+        scope = get_instructor_scope(user)
 
-    if instructor_name:
-        if allowed_instructors is not None and instructor_name not in allowed_instructors:
-            return []
-        if _has_adnoc_certificate_view_role(roles) and not frappe.db.get_value(
-            "Instructor", instructor_name, "custom_is_adnoc_instructor"
-        ):
-            return []
-        instructor_names = [instructor_name]
-    else:
-        instructor_names = allowed_instructors
-
-    if instructor_names is None:
-        return None
+    if not instructor_name:
+        return None if scope is None else scope["student_group_names"]
 
-    return _get_student_group_names_for_instructors(instructor_names)
+    if scope is not None and instructor_name not in scope["instructor_names"]:
+        return []
+    return get_student_group_names_for_instructors([instructor_name])
 
 
 def _scope_student_group_names(student_group_names, student_group=None, course=None):
@@ -900,8 +778,13 @@ def get_instructor_portal_data(
 
 @frappe.whitelist()
 def get_instructor_quiz_status(
-    limit=200, offset=0, student_group=None, student=None, course=None, instructor=None
+    limit=200, offset=0, student_group=None, student=None, course=None, instructor=None, cursor=None
 ):
+    """Quiz status per (student, assigned quiz), paged in the database.
+
+    Pass the returned `next_cursor` back as `cursor` for the next page; totals
+    and pass/fail/pending counts cover every row in scope, not just the page.
+    """
     limit = int(limit or 200)
     offset = int(offset or 0)
     user = frappe.session.user
@@ -920,6 +803,9 @@ def get_instructor_quiz_status(
         "pending": 0,
         "passed": 0,
         "failed": 0,
+        "limit": limit,
+        "offset": offset,
+        "next_cursor": None,
         "is_adnoc_instructor": is_adnoc_instructor,
     }
 
@@ -930,42 +816,28 @@ def get_instructor_quiz_status(
     if student_group_names == []:
         return empty_response
 
-    assignments = _get_mcqs_assignments(student_group_names)
-    if not assignments:
-        return {
-            "records": [],
-            "total": 0,
-            "pending": 0,
-            "passed": 0,
-            "failed": 0,
-            "is_adnoc_instructor": is_adnoc_instructor,
-        }
+    roster_rows, next_cursor = _get_quiz_roster_page(student_group_names, student, limit, offset, cursor)
+    if not roster_rows and not (cursor or offset):
+        return empty_response
+    totals = _get_quiz_roster_totals(student_group_names, student)
 
-    group_names = {row.student_group for row in assignments if row.student_group}
-    group_students = _get_group_students(group_names)
+    group_names = {row.student_group for row in roster_rows if row.student_group}
     group_course_map = _get_group_course_map(group_names)
     bulk_course_map = _get_bulk_result_course_map(set(group_course_map.values()))
     bulk_plan_map = _get_latest_submitted_plan_map(group_names)
 
-    rows = []
-    for assignment in assignments:
-        students = group_students.get(assignment.student_group, [])
-        for student_row in students:
-            if student and student_row.student != student:
-                continue
-            rows.append({
-                "student": student_row.student,
-                "student_name": student_row.student_name,
-                "student_group": assignment.student_group,
-                "course": group_course_map.get(assignment.student_group),
-                "bulk_result_enabled": bulk_course_map.get(group_course_map.get(assignment.student_group), False),
-                "bulk_assessment_plan": bulk_plan_map.get(assignment.student_group),
-                "quiz": assignment.mcqs,
-            })
-
-    rows.sort(key=lambda r: ((r.get("student_name") or "").lower(), r.get("quiz") or ""))
-    total = len(rows)
-    page_rows = rows[offset:offset + limit]
+    page_rows = [
+        {
+            "student": row.student,
+            "student_name": row.student_name,
+            "student_group": row.student_group,
+            "course": group_course_map.get(row.student_group),
+            "bulk_result_enabled": bulk_course_map.get(group_course_map.get(row.student_group), False),
+            "bulk_assessment_plan": bulk_plan_map.get(row.student_group),
+            "quiz": row.quiz,
+        }
+        for row in roster_rows
+    ]
 
     student_ids = {row["student"] for row in page_rows if row.get("student")}
     quiz_names = {row["quiz"] for row in page_rows if row.get("quiz")}
@@ -994,19 +866,27 @@ def get_instructor_quiz_status(
                 "custom_student_group",
                 "custom_assesment_plan",
                 "custom_assesment_result",
+                "custom_correct_count",
+                "custom_expected_total",
+                "custom_score_percentage",
+                "custom_is_complete",
             ],
             order_by="creation desc",
             ignore_permissions=True,
         )
-        score_summary = _get_activity_score_summary(activities)
-        _sync_activity_score_fields(activities, score_summary)
+        score_summary = {
+            activity.name: {
+                "correct": activity.custom_correct_count or 0,
+                "is_complete": bool(activity.custom_is_complete),
+            }
+            for activity in activities
+            # Rows not yet backfilled fall back to the stored score/status.
+            if activity.custom_expected_total
+        }
         assessment_result_map = _get_assessment_result_map(activities)
         for activity in activities:
-            summary = score_summary.get(activity.name)
-            if summary:
-                activity.score = summary["score"]
-                activity.status = summary["status"]
-                activity.percentage = summary.get("percentage")
+            if activity.custom_expected_total:
+                activity.percentage = activity.custom_score_percentage or 0
 
             key = (activity.student, activity.quiz)
             existing = activity_map.get(key)
@@ -1031,7 +911,6 @@ def get_instructor_quiz_status(
         for result in bulk_results:
             bulk_result_map[(result.student, result.assessment_plan)] = result
 
-    pending = passed = failed = 0
     for row in page_rows:
         activity = activity_map.get((row.get("student"), row.get("quiz")))
         if activity:
@@ -1045,29 +924,20 @@ def get_instructor_quiz_status(
         else:
             row["status"] = "Pending"
 
-        _attach_nyc_retest_info(row)
-
         if row.get("bulk_result_enabled") and row.get("bulk_assessment_plan"):
             bulk_result = bulk_result_map.get((row.get("student"), row.get("bulk_assessment_plan")))
             if bulk_result:
                 row["bulk_assessment_result"] = bulk_result.name
                 row["bulk_assessment_result_docstatus"] = bulk_result.docstatus
 
-        if row["status"] == "Pass":
-            passed += 1
-        elif row["status"] == "Fail":
-            failed += 1
-        else:
-            pending += 1
+    _attach_nyc_retest_info(page_rows)
 
     return {
         "records": page_rows,
-        "total": total,
-        "pending": pending,
-        "passed": passed,
-        "failed": failed,
+        **totals,
         "limit": limit,
         "offset": offset,
+        "next_cursor": next_cursor,
         "is_adnoc_instructor": is_adnoc_instructor,
     }
 
@@ -1153,6 +1023,36 @@ def get_instructor_results(
     }
 
 
+@frappe.whitelist()
+def get_instructor_eligibility_matrix(student_group=None, student_groups=None, course=None, instructor=None):
+    """Assessment eligibility for every student of one or more groups, as a schedule x student matrix."""
+    from numerouno.numerouno.utils.assessment_eligibility import get_group_assessment_eligibility
+
+    user = frappe.session.user
+    roles = frappe.get_roles(user)
+
+    if isinstance(student_groups, str):
+        student_groups = frappe.parse_json(student_groups) if student_groups.strip().startswith("[") else [
+            name.strip() for name in student_groups.split(",")
+        ]
+    requested = [name for name in [student_group, *(student_groups or [])] if (name or "").strip()]
+
+    student_group_names = _resolve_student_group_names(user, roles, instructor)
+    if student_group_names == []:
+        return {"groups": []}
+
+    if requested:
+        group_names = []
+        for name in requested:
+            group_names.extend(_scope_student_group_names(student_group_names, name, course))
+    else:
+        group_names = _scope_student_group_names(student_group_names, None, course)
+        if group_names is None:
+            frappe.throw(_("Select a Student Group or Course to load the eligibility matrix."))
+
+    return {"groups": get_group_assessment_eligibility(group_names)}
+
+
 @frappe.whitelist()
 def update_assessment_result_make_model(assessment_result, make, model, capacity=None):
     assessment_result = (assessment_result or "").strip()
@@ -0,0 +1,50 @@
+# Copyright (c) 2026, mohtashim and Contributors
+# See license.txt
+
+import json
+
+import frappe
+
+from numerouno.numerouno.api import quiz_api
+from numerouno.numerouno.utils.exam_load_test import delete_exam_seed, seed_exam_site
+
+
+class SeededExamMixin:
+	"""Seed one exam (group, students, quiz) per test class and delete it afterwards.
+
+	List it before `FrappeTestCase`. The seed and the quiz endpoints commit, so
+	the records are deleted rather than rolled back.
+	"""
+
+	seed_candidates = 2
+	seed_questions = 3
+
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		cls.seed = seed_exam_site(candidates=cls.seed_candidates, questions=cls.seed_questions)
+
+	@classmethod
+	def tearDownClass(cls):
+		frappe.set_user("Administrator")
+		delete_exam_seed(cls.seed)
+		super().tearDownClass()
+
+	def submit_first_options(self, attempt_id):
+		"""Submit the first option of every question as a guest, like the public quiz page."""
+		payload = quiz_api.get_quiz_questions_from_quiz(self.seed["quiz"])
+		answers = [
+			{"question": question["name"], "answers": [question["options"][0]["id"]], "marks": 1}
+			for question in payload["questions"]
+		]
+		frappe.set_user("Guest")
+		try:
+			return quiz_api.submit_quiz_from_mcqs(
+				quiz_name=self.seed["quiz"],
+				student=self.seed["students"][0],
+				student_group=self.seed["student_group"],
+				answers=json.dumps(answers),
+				attempt_id=attempt_id,
+			)
+		finally:
+			frappe.set_user("Administrator")
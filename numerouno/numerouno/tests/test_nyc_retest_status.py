@@ -0,0 +1,127 @@
+# Copyright (c) 2026, mohtashim and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, add_months, getdate, today
+
+from numerouno.numerouno.doctype.nyc_reassessment_checklist.nyc_reassessment_checklist import (
+	check_retest_allowed,
+	get_retest_status_for_activity,
+	get_retest_status_map,
+)
+
+
+def _insert(values):
+	"""Insert a row without hooks; the status lookups only read these columns."""
+	doc = frappe.get_doc(values)
+	doc.db_insert()
+	return doc.name
+
+
+class TestNYCRetestStatusMap(FrappeTestCase):
+	def setUp(self):
+		# Rolled back with the test class; nothing here is committed.
+		suffix = frappe.generate_hash(length=8)
+		student = f"_Test NYC Student {suffix}"
+		quiz = f"_Test NYC Quiz {suffix}"
+		recent = add_days(today(), -10)
+		expired = add_days(today(), -120)
+
+		self.first_result = _insert(
+			{
+				"doctype": "Assessment Result",
+				"name": f"_Test NYC Result A {suffix}",
+				"student": student,
+				"creation": expired,
+				"modified": expired,
+			}
+		)
+		self.retest_result = _insert(
+			{
+				"doctype": "Assessment Result",
+				"name": f"_Test NYC Result B {suffix}",
+				"student": student,
+				"creation": recent,
+				"modified": recent,
+			}
+		)
+		self.first_activity = _insert(
+			{
+				"doctype": "Quiz Activity",
+				"name": f"_Test NYC Activity A {suffix}",
+				"student": student,
+				"quiz": quiz,
+				"status": "Fail",
+				"activity_date": expired,
+				"custom_assesment_result": self.first_result,
+				"creation": expired,
+				"modified": expired,
+			}
+		)
+		self.retest_activity = _insert(
+			{
+				"doctype": "Quiz Activity",
+				"name": f"_Test NYC Activity B {suffix}",
+				"student": student,
+				"quiz": quiz,
+				"status": "Fail",
+				"activity_date": recent,
+				"custom_assesment_result": self.retest_result,
+				"creation": recent,
+				"modified": recent,
+			}
+		)
+		self.checklist = _insert(
+			{
+				"doctype": "NYC Reassessment Checklist",
+				"name": f"_Test NYC Checklist {suffix}",
+				"student": student,
+				"quiz_activity": self.retest_activity,
+				"assessment_result": self.retest_result,
+				"first_assessment_date": recent,
+				"retest_status": "Eligible",
+				"retest_valid_until": add_months(getdate(recent), 3),
+				"creation": recent,
+				"modified": recent,
+			}
+		)
+		self.student_quiz = (student, quiz)
+
+	def test_empty_input(self):
+		self.assertEqual(
+			get_retest_status_map(),
+			{"quiz_activity": {}, "assessment_result": {}, "student_quiz": {}},
+		)
+
+	def test_matches_single_lookups(self):
+		activities = [self.first_activity, self.retest_activity]
+		results = [self.first_result, self.retest_result]
+		student, quiz = self.student_quiz
+		retest_map = get_retest_status_map(
+			quiz_activity_names=activities,
+			assessment_result_names=results,
+			student_quizzes=[self.student_quiz, (student, None)],
+		)
+
+		for name in activities:
+			self.assertEqual(
+				retest_map["quiz_activity"][name],
+				get_retest_status_for_activity(quiz_activity_name=name),
+			)
+		for name in results:
+			self.assertEqual(
+				retest_map["assessment_result"][name],
+				get_retest_status_for_activity(assessment_result_name=name),
+			)
+		self.assertEqual(retest_map["student_quiz"][self.student_quiz], check_retest_allowed(student, None, quiz))
+		self.assertEqual(retest_map["student_quiz"][(student, None)], check_retest_allowed(student, None))
+
+		# The seeded rows themselves: a checklist on the retest, an expired first attempt.
+		self.assertEqual(retest_map["quiz_activity"][self.retest_activity]["checklist"], self.checklist)
+		self.assertEqual(retest_map["assessment_result"][self.retest_result]["checklist"], self.checklist)
+		self.assertIsNone(retest_map["quiz_activity"][self.first_activity]["checklist"])
+		self.assertEqual(retest_map["quiz_activity"][self.first_activity]["retest_status"], "Expired")
+		retest = retest_map["student_quiz"][self.student_quiz]
+		self.assertFalse(retest["allowed"])
+		self.assertEqual(retest["first_failed_activity"], self.first_activity)
@@ -0,0 +1,225 @@
+# Copyright (c) 2026, mohtashim and Contributors
+# See license.txt
+
+import json
+import os
+import uuid
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from numerouno.numerouno.api import certificate_verification, customer_portal, quiz_api
+from numerouno.numerouno.page.instructor_portal import instructor_portal
+from numerouno.numerouno.page.management_dashboard import management_dashboard
+from numerouno.numerouno.utils.exam_load_test import delete_exam_seed, seed_exam_site
+from numerouno.numerouno.utils.query_profiler import profile_queries
+
+BUDGETS_PATH = os.path.join(os.path.dirname(__file__), "query_budgets.json")
+
+
+def load_budgets():
+	with open(BUDGETS_PATH) as f:
+		return {key: value for key, value in json.load(f).items() if not key.startswith("_")}
+
+
+def _time_factor():
+	"""Scale for wall-time budgets (`QUERY_BUDGET_TIME_FACTOR`). Off (0) unless set: shared CI runners are too noisy."""
+	return float(os.environ.get("QUERY_BUDGET_TIME_FACTOR") or frappe.conf.get("query_budget_time_factor") or 0)
+
+
+class TestQueryBudgets(FrappeTestCase):
+	"""Hot whitelisted methods must stay inside the budgets in `query_budgets.json`."""
+
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		cls.budgets = load_budgets()
+		cls.measurements = {}
+		cls.seed = seed_exam_site(candidates=10, questions=10)
+		cls.student_group = cls.seed["student_group"]
+		cls.quiz = cls.seed["quiz"]
+		cls.students = cls.seed["students"]
+
+	@classmethod
+	def tearDownClass(cls):
+		with open(frappe.get_site_path("query_budget_report.json"), "w") as f:
+			json.dump(cls.measurements, f, indent=1, sort_keys=True)
+		frappe.set_user("Administrator")
+		# The seed and the endpoints under test commit, so a rollback would not undo them.
+		delete_exam_seed(cls.seed)
+		super().tearDownClass()
+
+	def measure(self, key, method, warm_up=True, user="Guest", **kwargs):
+		frappe.set_user(user)
+		if warm_up:
+			method(**kwargs)
+		with profile_queries() as profile:
+			result = method(**kwargs)
+		frappe.set_user("Administrator")
+
+		self.measurements[key] = profile.as_dict()
+		self.assertWithinBudget(key, profile)
+		return result
+
+	def assertWithinBudget(self, key, profile):
+		self.assertIn(key, self.budgets, f"{key} has no entry in query_budgets.json")
+		budget = self.budgets[key]
+		self.assertLessEqual(
+			profile.queries, budget["queries"], f"{key} ran {profile.queries} queries (budget {budget['queries']})"
+		)
+		self.assertLessEqual(profile.rows, budget["rows"], f"{key} returned {profile.rows} rows (budget {budget['rows']})")
+		factor = _time_factor()
+		if factor:
+			elapsed_ms = profile.duration * 1000
+			self.assertLessEqual(
+				elapsed_ms, budget["ms"] * factor, f"{key} took {elapsed_ms:.0f} ms (budget {budget['ms']} ms)"
+			)
+
+	def new_attempt(self):
+		return f"budget-{uuid.uuid4().hex}"
+
+	def quiz_answers(self):
+		payload = quiz_api.get_quiz_questions_from_quiz(self.quiz)
+		return {question["name"]: question["options"][0]["id"] for question in payload["questions"]}
+
+	def test_quiz_catalog_and_payload(self):
+		self.measure(
+			"quiz_api.get_students_by_group", quiz_api.get_students_by_group, student_group=self.student_group
+		)
+		result = self.measure(
+			"quiz_api.get_available_quizzes_from_mcqs",
+			quiz_api.get_available_quizzes_from_mcqs,
+			student_group=self.student_group,
+			student=self.students[0],
+		)
+		self.assertEqual(result["status"], "success")
+		self.measure(
+			"quiz_api.get_quiz_questions_from_quiz", quiz_api.get_quiz_questions_from_quiz, quiz_name=self.quiz
+		)
+
+	def test_quiz_progress_and_submit(self):
+		student = self.students[1]
+		answers = self.quiz_answers()
+		first_question = next(iter(answers))
+		attempt_id = self.new_attempt()
+
+		# The first delta creates the attempt; measure a follow-up answer.
+		frappe.set_user("Guest")
+		quiz_api.upsert_public_quiz_progress(
+			self.quiz, student, self.student_group, attempt_id=attempt_id,
+			total_questions=len(answers), delta=json.dumps({first_question: answers[first_question]}), seq=1,
+		)
+		self.measure(
+			"quiz_api.upsert_public_quiz_progress",
+			quiz_api.upsert_public_quiz_progress,
+			warm_up=False,
+			quiz_name=self.quiz,
+			student=student,
+			student_group=self.student_group,
+			attempt_id=attempt_id,
+			total_questions=len(answers),
+			delta=json.dumps(answers),
+			seq=2,
+			base_seq=1,
+		)
+
+		submission = [{"question": name, "answers": [option], "marks": 1} for name, option in answers.items()]
+		result = self.measure(
+			"quiz_api.submit_quiz_from_mcqs",
+			quiz_api.submit_quiz_from_mcqs,
+			warm_up=False,
+			quiz_name=self.quiz,
+			student=student,
+			student_group=self.student_group,
+			answers=json.dumps(submission),
+			attempt_id=attempt_id,
+		)
+		self.assertEqual(result["status"], "success")
+
+		self.measure(
+			"quiz_api.get_quiz_submission_history",
+			quiz_api.get_quiz_submission_history,
+			student=student,
+			quiz_name=self.quiz,
+		)
+
+	def test_instructor_portal(self):
+		filters = {"student_group": self.student_group}
+		self.measure(
+			"instructor_portal.get_instructor_portal_data",
+			instructor_portal.get_instructor_portal_data,
+			user="Administrator",
+			**filters,
+		)
+		self.measure(
+			"instructor_portal.get_instructor_quiz_status",
+			instructor_portal.get_instructor_quiz_status,
+			user="Administrator",
+			**filters,
+		)
+		self.measure(
+			"instructor_portal.get_instructor_results",
+			instructor_portal.get_instructor_results,
+			user="Administrator",
+			**filters,
+		)
+		self.measure(
+			"instructor_portal.get_instructor_eligibility_matrix",
+			instructor_portal.get_instructor_eligibility_matrix,
+			user="Administrator",
+			**filters,
+		)
+
+	def test_instructor_quiz_status_keyset_pages(self):
+		filters = {"student_group": self.student_group, "limit": 4}
+		frappe.set_user("Administrator")
+		first = instructor_portal.get_instructor_quiz_status(**filters)
+		self.assertEqual(len(first["records"]), 4)
+		self.assertTrue(first["next_cursor"])
+
+		# A later page costs the same as the first one.
+		second = self.measure(
+			"instructor_portal.get_instructor_quiz_status",
+			instructor_portal.get_instructor_quiz_status,
+			user="Administrator",
+			cursor=first["next_cursor"],
+			**filters,
+		)
+		first_keys = {(row["student"], row["quiz"]) for row in first["records"]}
+		second_keys = {(row["student"], row["quiz"]) for row in second["records"]}
+		self.assertFalse(first_keys & second_keys)
+		self.assertEqual(first["total"], second["total"])
+		self.assertEqual(first["total"], first["passed"] + first["failed"] + first["pending"])
+
+	def test_customer_portal_dashboard(self):
+		customer = frappe.db.get_value("Customer", {}, "name")
+		if not customer:
+			self.skipTest("No Customer on this site")
+
+		token = uuid.uuid4().hex
+		frappe.cache().set_value(
+			customer_portal._cache_key_session(token),
+			{"token": token, "email": "budget@example.com", "customer": customer, "customer_name": customer},
+			expires_in_sec=300,
+		)
+		frappe.form_dict.portal_token = token
+		try:
+			self.measure("customer_portal.get_dashboard", customer_portal.get_dashboard)
+		finally:
+			frappe.form_dict.pop("portal_token", None)
+			frappe.cache().delete_value(customer_portal._cache_key_session(token))
+
+	def test_certificate_verification(self):
+		self.measure(
+			"certificate_verification.verify_certificate",
+			certificate_verification.verify_certificate,
+			certificate_number="BUDGET-DOES-NOT-EXIST",
+			student_name="Budget Student",
+		)
+
+	def test_management_dashboard(self):
+		self.measure(
+			"management_dashboard.get_management_dashboard_data",
+			management_dashboard.get_management_dashboard_data,
+			user="Administrator",
+		)
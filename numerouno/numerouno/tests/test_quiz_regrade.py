@@ -0,0 +1,71 @@
+# Copyright (c) 2026, mohtashim and Contributors
+# See license.txt
+
+import uuid
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from numerouno.numerouno.tests.exam_fixture import SeededExamMixin
+from numerouno.numerouno.utils.quiz_regrade import regrade_question_activities, regrade_selected_option
+
+
+class TestQuizRegrade(FrappeTestCase):
+	def test_single_correct_answer(self):
+		entry = {"type": "Single Correct Answer", "correct": [2], "options": ["Red", "Green", "Blue"]}
+		self.assertEqual(regrade_selected_option(entry, "Green"), "Correct")
+		self.assertEqual(regrade_selected_option(entry, "Red"), "Wrong")
+		self.assertEqual(regrade_selected_option(entry, ""), "Wrong")
+		# Text that is not one of the options cannot be regraded safely.
+		self.assertIsNone(regrade_selected_option(entry, "Purple"))
+
+	def test_multiple_correct_answer_in_any_order(self):
+		entry = {"type": "Multiple Correct Answer", "correct": [1, 3], "options": ["Red", "Green", "Blue"]}
+		self.assertEqual(regrade_selected_option(entry, "Red, Blue"), "Correct")
+		self.assertEqual(regrade_selected_option(entry, "Blue, Red"), "Correct")
+		self.assertEqual(regrade_selected_option(entry, "Red"), "Wrong")
+		self.assertEqual(regrade_selected_option(entry, "Red, Green"), "Wrong")
+
+	def test_other_question_types_are_left_alone(self):
+		entry = {"type": "Open Ended", "correct": [], "options": []}
+		self.assertIsNone(regrade_selected_option(entry, "anything"))
+
+
+class TestQuestionRegradeRun(SeededExamMixin, FrappeTestCase):
+	seed_candidates = 1
+
+	def flip_answer_key(self, question):
+		"""Make the first option the only correct one, or a wrong one if it already was."""
+		options = frappe.get_doc("Question", question).options
+		first_correct = not options[0].is_correct
+		for index, option in enumerate(options):
+			is_correct = int(index == 0) if first_correct else int(index == 1)
+			frappe.db.set_value("Options", option.name, "is_correct", is_correct)
+		return "Correct" if first_correct else "Wrong"
+
+	def test_dry_run_matches_written_regrade(self):
+		response = self.submit_first_options(f"regrade-{uuid.uuid4().hex}")
+		self.assertEqual(response["status"], "success")
+		activity = response["activity_id"]
+		question = self.seed["question_names"][0]
+		row_filters = {"parent": activity, "parenttype": "Quiz Activity", "question": question}
+		old_result = frappe.db.get_value("Quiz Result", row_filters, "quiz_result")
+		old = frappe.db.get_value("Quiz Activity", activity, ["score", "status"], as_dict=True)
+		expected = self.flip_answer_key(question)
+		self.assertNotEqual(old_result, expected)
+
+		dry = regrade_question_activities(question, dry_run=True)
+		preview = next(change for change in dry["changes"] if change["quiz_activity"] == activity)
+		self.assertEqual(preview["new_result"], expected)
+		self.assertNotEqual(preview["new_score"], old.score)
+		self.assertEqual(frappe.db.get_value("Quiz Result", row_filters, "quiz_result"), old_result)
+		self.assertEqual(frappe.db.get_value("Quiz Activity", activity, "score"), old.score)
+
+		written = regrade_question_activities(question)
+		change = next(change for change in written["changes"] if change["quiz_activity"] == activity)
+		self.assertEqual(
+			(change["new_score"], change["new_status"]), (preview["new_score"], preview["new_status"])
+		)
+		stored = frappe.db.get_value("Quiz Activity", activity, ["score", "status"], as_dict=True)
+		self.assertEqual((stored.score, stored.status), (change["new_score"], change["new_status"]))
+		self.assertEqual(frappe.db.get_value("Quiz Result", row_filters, "quiz_result"), expected)
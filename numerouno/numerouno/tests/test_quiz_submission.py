@@ -0,0 +1,46 @@
+# Copyright (c) 2026, mohtashim and Contributors
+# See license.txt
+
+import uuid
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from numerouno.numerouno.api import quiz_api
+from numerouno.numerouno.tests.exam_fixture import SeededExamMixin
+
+# The assessment job may link a result between the two calls.
+VOLATILE_KEYS = ("duplicate", "assessment_result_id", "assessment_status")
+
+
+class TestQuizSubmissionReplay(SeededExamMixin, FrappeTestCase):
+	def test_replay_returns_stored_outcome(self):
+		attempt_id = f"replay-{uuid.uuid4().hex}"
+		first = self.submit_first_options(attempt_id)
+		second = self.submit_first_options(attempt_id)
+
+		self.assertEqual(first["status"], "success")
+		self.assertFalse(first["duplicate"])
+		self.assertTrue(second["duplicate"])
+		self.assertEqual(frappe.db.count("Quiz Activity", {"custom_attempt_id": attempt_id}), 1)
+
+		for key in VOLATILE_KEYS:
+			first.pop(key)
+			second.pop(key)
+		self.assertEqual(first, second)
+
+		stored = frappe.db.get_value("Quiz Activity", first["activity_id"], ["score", "status"], as_dict=True)
+		self.assertEqual(f"{first['raw_score']}/{first['score_out_of']}", stored.score)
+		self.assertEqual(first["passed"], stored.status == "Pass")
+
+	def test_submit_while_locked_asks_for_retry(self):
+		attempt_id = f"locked-{uuid.uuid4().hex}"
+		token = quiz_api._acquire_quiz_submit_lock(attempt_id)
+		try:
+			busy = self.submit_first_options(attempt_id)
+		finally:
+			quiz_api._release_quiz_submit_lock(attempt_id, token)
+
+		self.assertTrue(busy["retry"])
+		self.assertEqual(frappe.db.count("Quiz Activity", {"custom_attempt_id": attempt_id}), 0)
+		self.assertEqual(self.submit_first_options(attempt_id)["status"], "success")
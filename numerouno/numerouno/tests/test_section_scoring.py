@@ -0,0 +1,68 @@
+# Copyright (c) 2026, mohtashim and Contributors
+# See license.txt
+
+from frappe.tests.utils import FrappeTestCase
+
+from numerouno.numerouno.utils.section_scoring import score_section_submission, score_sections
+
+
+def make_scheme(require_all=1, enforce_overall=1, weights=(60, 40)):
+	return {
+		"profile": "TEST-PROFILE",
+		"questions": ["Q1", "Q2", "Q3", "Q4"],
+		# Q4 is not mapped to any section.
+		"question_sections": [0, 0, 1, -1],
+		"sections": [
+			{"key": "A", "title": "Section A", "min_pass_percentage": 50, "weightage": weights[0]},
+			{"key": "B", "title": "Section B", "min_pass_percentage": 100, "weightage": weights[1]},
+		],
+		"require_all_sections_pass": require_all,
+		"enforce_overall_percentage": enforce_overall,
+		"passing_score": 70,
+	}
+
+
+class TestSectionScoring(FrappeTestCase):
+	def test_batch_scores_match_per_section_thresholds(self):
+		results = score_sections(make_scheme(), [[1, 1, 1, 0], [1, 0, 0, 1], [0, 0, 0, 0]])
+
+		first = results[0]
+		self.assertTrue(first["passed"])
+		self.assertEqual(first["percentage"], 75.0)
+		self.assertEqual(first["weighted_percentage"], 100.0)
+		self.assertEqual([s["raw"] for s in first["sections"]], [2, 1])
+		self.assertEqual([s["weighted"] for s in first["sections"]], [60.0, 40.0])
+
+		second = results[1]
+		self.assertFalse(second["passed"])
+		self.assertFalse(second["sections_passed"])
+		self.assertEqual([s["passed"] for s in second["sections"]], [True, False])
+
+		self.assertFalse(results[2]["passed"])
+
+	def test_flags_select_the_pass_rule(self):
+		correct = [[1, 0, 1, 0]]
+		# Sections pass (50% / 100%) but weighted overall is 70 -> meets 70 exactly.
+		self.assertTrue(score_sections(make_scheme(), correct)[0]["passed"])
+		self.assertTrue(score_sections(make_scheme(enforce_overall=0), correct)[0]["passed"])
+
+		correct = [[1, 1, 0, 1]]
+		self.assertFalse(score_sections(make_scheme(enforce_overall=0), correct)[0]["passed"])
+		# Weighted overall is 60 < 70.
+		self.assertFalse(score_sections(make_scheme(require_all=0), correct)[0]["passed"])
+
+	def test_zero_weights_fall_back_to_raw_percentage(self):
+		result = score_sections(make_scheme(require_all=0, weights=(0, 0)), [[1, 1, 1, 0]])[0]
+		self.assertEqual(result["weighted_percentage"], 75.0)
+		self.assertTrue(result["passed"])
+
+	def test_submission_uses_graded_answer_rows(self):
+		graded = [
+			{"question": "Q1", "quiz_result": "Correct"},
+			{"question": "Q2", "quiz_result": "Wrong"},
+			{"question": "Q3", "quiz_result": "Correct"},
+			{"question": "UNKNOWN", "quiz_result": "Correct"},
+		]
+		result = score_section_submission(make_scheme(), graded)
+		self.assertEqual([s["raw"] for s in result["sections"]], [1, 1])
+		self.assertEqual(result["percentage"], 50.0)
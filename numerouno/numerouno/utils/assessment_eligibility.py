@@ -20,35 +20,58 @@ def _attendance_is_valid_for_assessment(attendance):
 	return True, "ok"
 
 
-def get_assessment_eligibility(student, student_group):
-	"""Check whether student attended and signed all course schedule days."""
-	if not student or not student_group:
-		return {
-			"eligible": False,
-			"message": _("Student and student group are required for assessment eligibility."),
-			"total_days": 0,
-			"missing_days": 0,
-			"missing_dates": [],
-		}
+ELIGIBILITY_CACHE_TTL = 60 * 60 * 6
+
+
+def _eligibility_cache_key(student, student_group):
+	return f"assessment_eligibility:{student_group}:{student}"
 
-	if can_bypass_assessment_eligibility_check():
-		return {
-			"eligible": True,
-			"message": "",
-			"total_days": 0,
-			"missing_days": 0,
-			"missing_dates": [],
-			"bypassed": True,
-		}
 
-	schedules = frappe.get_all(
-		"Course Schedule",
-		filters={"student_group": student_group, "docstatus": ["<", 2]},
-		fields=["name", "schedule_date"],
-		order_by="schedule_date asc",
+def _get_schedule_attendance_rows(student, student_group):
+	"""Every Course Schedule of the group joined with the student's attendance for it, in one query."""
+	return frappe.db.sql(
+		"""
+		SELECT
+			cs.name AS schedule, cs.schedule_date,
+			sa.name AS attendance, sa.status, sa.custom_student_signature,
+			sa.docstatus, sa.date
+		FROM `tabCourse Schedule` cs
+		LEFT JOIN `tabStudent Attendance` sa
+			ON sa.course_schedule = cs.name
+			AND sa.student = %(student)s
+			AND sa.student_group = %(student_group)s
+			AND sa.docstatus < 2
+		WHERE cs.student_group = %(student_group)s AND cs.docstatus < 2
+		ORDER BY cs.schedule_date ASC, cs.name ASC, sa.modified DESC
+		""",
+		{"student": student, "student_group": student_group},
+		as_dict=True,
 	)
 
-	if not schedules:
+
+def _schedule_attendance_statuses(rows, today_date):
+	"""[(schedule row, reason)] per schedule; reason is "ok", "upcoming" or why attendance fails."""
+	# Keep the most recently modified attendance per schedule, as get_value did.
+	schedules = {}
+	for row in rows:
+		if row.schedule:
+			schedules.setdefault(row.schedule, row)
+
+	statuses = []
+	for row in schedules.values():
+		schedule_date = getdate(row.schedule_date) if row.schedule_date else None
+		# Attendance is only required for days that have already occurred (including today).
+		if schedule_date and schedule_date > today_date:
+			statuses.append((row, "upcoming"))
+			continue
+		statuses.append((row, _attendance_is_valid_for_assessment(row if row.attendance else None)[1]))
+	return statuses
+
+
+def _build_assessment_eligibility(rows, today_date=None):
+	"""Eligibility result from schedule x attendance rows (one student, one group)."""
+	statuses = _schedule_attendance_statuses(rows, today_date or getdate(today()))
+	if not statuses:
 		return {
 			"eligible": True,
 			"message": "",
@@ -60,32 +83,14 @@ def get_assessment_eligibility(student, student_group):
 
 	missing_dates = []
 	missing_reasons = []
-	today_date = getdate(today())
-
-	for schedule in schedules:
-		schedule_date = getdate(schedule.schedule_date) if schedule.schedule_date else None
-		# Attendance is only required for days that have already occurred (including today).
-		if schedule_date and schedule_date > today_date:
+	for row, reason in statuses:
+		if reason in ("ok", "upcoming"):
 			continue
+		schedule_date = row.schedule_date or (row.date if row.attendance else None)
+		missing_dates.append(formatdate(getdate(schedule_date)) if schedule_date else row.schedule)
+		missing_reasons.append(reason)
 
-		attendance = frappe.db.get_value(
-			"Student Attendance",
-			{
-				"student": student,
-				"student_group": student_group,
-				"course_schedule": schedule.name,
-				"docstatus": ["<", 2],
-			},
-			["name", "status", "custom_student_signature", "docstatus", "date"],
-			as_dict=True,
-		)
-		is_valid, reason = _attendance_is_valid_for_assessment(attendance)
-		if not is_valid:
-			schedule_date = schedule.schedule_date or (attendance.date if attendance else None)
-			missing_dates.append(formatdate(getdate(schedule_date)) if schedule_date else schedule.name)
-			missing_reasons.append(reason)
-
-	total_days = len(schedules)
+	total_days = len(statuses)
 	missing_days = len(missing_dates)
 	eligible = missing_days == 0
 
@@ -109,6 +114,172 @@ def get_assessment_eligibility(student, student_group):
 	}
 
 
+def get_assessment_eligibility(student, student_group):
+	"""Check whether student attended and signed all course schedule days.
+
+	Cached per (student, student_group) for the current day; Student Attendance
+	and Course Schedule doc events drop the cached result.
+	"""
+	if not student or not student_group:
+		return {
+			"eligible": False,
+			"message": _("Student and student group are required for assessment eligibility."),
+			"total_days": 0,
+			"missing_days": 0,
+			"missing_dates": [],
+		}
+
+	if can_bypass_assessment_eligibility_check():
+		return {
+			"eligible": True,
+			"message": "",
+			"total_days": 0,
+			"missing_days": 0,
+			"missing_dates": [],
+			"bypassed": True,
+		}
+
+	cache = frappe.cache()
+	key = _eligibility_cache_key(student, student_group)
+	today_str = today()
+	cached = cache.get_value(key)
+	# Future schedule days become required at midnight, so a result is only good for its day.
+	if cached and cached.get("date") == today_str:
+		return dict(cached["result"])
+
+	result = _build_assessment_eligibility(
+		_get_schedule_attendance_rows(student, student_group), getdate(today_str)
+	)
+	cache.set_value(key, {"date": today_str, "result": result}, expires_in_sec=ELIGIBILITY_CACHE_TTL)
+	return dict(result)
+
+
+def get_group_assessment_eligibility(student_groups):
+	"""Eligibility of every active student in the given groups, from one attendance x schedule query.
+
+	Returns one entry per group with its schedule columns and, per student, an
+	`attendance` list aligned with those columns ("ok", "upcoming", "missing",
+	"absent", "no_signature" or "not_submitted"). Results also warm the
+	per-student cache used by `get_assessment_eligibility`.
+	"""
+	student_groups = [group for group in dict.fromkeys(student_groups or []) if group]
+	if not student_groups:
+		return []
+
+	rows = frappe.db.sql(
+		"""
+		SELECT
+			sgs.parent AS student_group, sgs.student, sgs.student_name,
+			cs.name AS schedule, cs.schedule_date,
+			sa.name AS attendance, sa.status, sa.custom_student_signature,
+			sa.docstatus, sa.date
+		FROM `tabStudent Group Student` sgs
+		LEFT JOIN `tabCourse Schedule` cs
+			ON cs.student_group = sgs.parent AND cs.docstatus < 2
+		LEFT JOIN `tabStudent Attendance` sa
+			ON sa.course_schedule = cs.name
+			AND sa.student = sgs.student
+			AND sa.student_group = sgs.parent
+			AND sa.docstatus < 2
+		WHERE sgs.parent IN %(student_groups)s
+			AND sgs.parenttype = 'Student Group'
+			AND sgs.active = 1
+		ORDER BY sgs.parent ASC, sgs.group_roll_number ASC, sgs.student ASC,
+			cs.schedule_date ASC, cs.name ASC, sa.modified DESC
+		""",
+		{"student_groups": tuple(student_groups)},
+		as_dict=True,
+	)
+
+	today_str = today()
+	today_date = getdate(today_str)
+	cache = frappe.cache()
+
+	rows_by_student = {}
+	for row in rows:
+		rows_by_student.setdefault((row.student_group, row.student), []).append(row)
+
+	groups = {
+		group: {"student_group": group, "schedules": {}, "students": [], "eligible_count": 0}
+		for group in student_groups
+	}
+	for (student_group, student), student_rows in rows_by_student.items():
+		group = groups[student_group]
+		statuses = _schedule_attendance_statuses(student_rows, today_date)
+		for row, _reason in statuses:
+			group["schedules"].setdefault(row.schedule, row.schedule_date)
+
+		result = _build_assessment_eligibility(student_rows, today_date)
+		cache.set_value(
+			_eligibility_cache_key(student, student_group),
+			{"date": today_str, "result": result},
+			expires_in_sec=ELIGIBILITY_CACHE_TTL,
+		)
+
+		group["eligible_count"] += 1 if result["eligible"] else 0
+		group["students"].append({
+			"student": student,
+			"student_name": student_rows[0].student_name,
+			"eligible": result["eligible"],
+			"missing_days": result["missing_days"],
+			"missing_dates": result["missing_dates"],
+			"missing_reasons": result.get("missing_reasons", []),
+			"attendance": {row.schedule: reason for row, reason in statuses},
+		})
+
+	matrix = []
+	for group in groups.values():
+		schedule_names = list(group["schedules"])
+		for student in group["students"]:
+			attendance = student["attendance"]
+			student["attendance"] = [attendance.get(name, "missing") for name in schedule_names]
+		matrix.append({
+			"student_group": group["student_group"],
+			"schedules": [
+				{"name": name, "date": str(schedule_date) if schedule_date else None}
+				for name, schedule_date in group["schedules"].items()
+			],
+			"students": group["students"],
+			"total_students": len(group["students"]),
+			"eligible_count": group["eligible_count"],
+		})
+	return matrix
+
+
+def invalidate_assessment_eligibility(student_group, student=None):
+	"""Drop cached eligibility for one student, or every student of the group."""
+	if not student_group:
+		return
+
+	cache = frappe.cache()
+	if student:
+		key = _eligibility_cache_key(student, student_group)
+		drop = lambda: cache.delete_value(key)
+	else:
+		prefix = f"assessment_eligibility:{student_group}:"
+		drop = lambda: cache.delete_keys(prefix)
+	drop()
+
+	# Readers may have re-cached the old result before this transaction committed.
+	after_commit = getattr(frappe.db, "after_commit", None)
+	if after_commit is not None:
+		after_commit.add(drop)
+
+
+def on_student_attendance_change(doc, method=None):
+	invalidate_assessment_eligibility(doc.student_group, doc.student)
+	before = doc.get_doc_before_save() if hasattr(doc, "get_doc_before_save") else None
+	if before and (before.student, before.student_group) != (doc.student, doc.student_group):
+		invalidate_assessment_eligibility(before.student_group, before.student)
+
+
+def on_course_schedule_change(doc, method=None):
+	invalidate_assessment_eligibility(doc.student_group)
+	before = doc.get_doc_before_save() if hasattr(doc, "get_doc_before_save") else None
+	if before and before.student_group != doc.student_group:
+		invalidate_assessment_eligibility(before.student_group)
+
+
 def ensure_assessment_eligible(student, student_group, throw=True):
 	result = get_assessment_eligibility(student, student_group)
 	if result.get("eligible"):
@@ -0,0 +1,168 @@
+import frappe
+from frappe import _
+
+WRITTEN_ASSESSMENT_CRITERIA = "Written Assessment"
+
+
+def get_default_assessment_group():
+	assessment_group = frappe.db.get_value("Assessment Group", {}, "name")
+	if assessment_group:
+		return assessment_group
+
+	ag_doc = frappe.new_doc("Assessment Group")
+	ag_doc.assessment_group_name = "Default Assessment Group"
+	ag_doc.insert(ignore_permissions=True)
+	return ag_doc.name
+
+
+def get_written_assessment_criteria():
+	criteria = frappe.db.get_value(
+		"Assessment Criteria", {"assessment_criteria": WRITTEN_ASSESSMENT_CRITERIA}, "name"
+	)
+	if criteria:
+		return criteria
+
+	criteria_doc = frappe.new_doc("Assessment Criteria")
+	criteria_doc.assessment_criteria = WRITTEN_ASSESSMENT_CRITERIA
+	criteria_doc.insert(ignore_permissions=True)
+	return criteria_doc.name
+
+
+def get_default_grading_scale(course):
+	return (
+		frappe.db.get_value("Course", course, "default_grading_scale")
+		or frappe.db.get_value("Grading Scale", {}, "name")
+	)
+
+
+def get_default_company():
+	return (
+		frappe.defaults.get_user_default("Company")
+		or frappe.defaults.get_global_default("company")
+		or frappe.db.get_single_value("System Settings", "default_company")
+		or frappe.db.get_value("Company", {}, "name")
+	)
+
+
+def get_assignment_scaffolding(student_group, quiz_name):
+	"""Precomputed plan, criteria and company for a (student group, quiz) MCQS Assignment."""
+	if not student_group or not quiz_name:
+		return None
+	return frappe.db.get_value(
+		"MCQS Assignment",
+		{"student_group": student_group, "mcqs": quiz_name},
+		["name", "assessment_plan", "assessment_criteria", "company"],
+		as_dict=True,
+	)
+
+
+def resolve_assignment_scaffolding(assignment):
+	"""Find or create the Assessment Plan, criteria and company an assignment's submissions use."""
+	from numerouno.numerouno.api.quiz_api import (
+		_create_quiz_assessment_plan,
+		_find_reusable_assessment_plan,
+		get_quiz_expected_question_count,
+	)
+
+	if not assignment.student_group or not assignment.mcqs:
+		frappe.throw(_("Student Group and MCQS are required to set up the assessment."))
+
+	course = frappe.db.get_value("Student Group", assignment.student_group, "course")
+	if not course:
+		frappe.throw(_("Student Group {0} has no course.").format(frappe.bold(assignment.student_group)))
+
+	assessment_criteria = get_written_assessment_criteria()
+	assessment_plan = None
+	if assignment.get("assessment_plan") and frappe.db.exists(
+		"Assessment Plan", {"name": assignment.assessment_plan, "docstatus": ["<", 2]}
+	):
+		assessment_plan = assignment.assessment_plan
+	if not assessment_plan:
+		assessment_plan = _find_reusable_assessment_plan(assignment.student_group, course, assignment.mcqs)
+	if not assessment_plan:
+		assessment_plan = _create_quiz_assessment_plan(
+			assignment.student_group,
+			assignment.mcqs,
+			get_quiz_expected_question_count(assignment.mcqs),
+			assessment_criteria=assessment_criteria,
+		)
+
+	return {
+		"assessment_plan": assessment_plan,
+		"assessment_criteria": assessment_criteria,
+		"company": get_default_company(),
+	}
+
+
+def sync_assignment_scaffolding(assignment_name):
+	"""Resolve and store an assignment's assessment links; failures are kept on the assignment."""
+	assignment = frappe.get_doc("MCQS Assignment", assignment_name)
+	try:
+		values = resolve_assignment_scaffolding(assignment)
+		values["assessment_setup_error"] = None
+	except Exception as e:
+		frappe.db.rollback()
+		frappe.log_error(
+			f"Assessment setup failed for MCQS Assignment {assignment_name}: {str(e)}\n"
+			f"Traceback: {frappe.get_traceback()}",
+			"MCQS Assignment Assessment Setup",
+		)
+		values = {"assessment_setup_error": str(e)}
+
+	frappe.db.set_value("MCQS Assignment", assignment_name, values, update_modified=False)
+	frappe.db.commit()
+	return values
+
+
+def enqueue_assignment_scaffolding(assignment_name):
+	frappe.enqueue(
+		"numerouno.numerouno.utils.assessment_scaffolding.sync_assignment_scaffolding",
+		queue="short",
+		timeout=300,
+		job_id=f"mcqs_assignment_scaffolding::{assignment_name}",
+		deduplicate=True,
+		enqueue_after_commit=True,
+		assignment_name=assignment_name,
+	)
+
+
+def on_mcqs_assignment_update(doc, method=None):
+	before = doc.get_doc_before_save()
+	context_changed = not before or (before.student_group, before.mcqs) != (doc.student_group, doc.mcqs)
+	if context_changed or not doc.assessment_plan:
+		enqueue_assignment_scaffolding(doc.name)
+
+
+def on_course_schedule_insert(doc, method=None):
+	for assignment_name in frappe.get_all(
+		"MCQS Assignment",
+		filters={"student_group": doc.student_group, "assessment_plan": ["is", "not set"]},
+		pluck="name",
+	):
+		enqueue_assignment_scaffolding(assignment_name)
+
+
+@frappe.whitelist()
+def backfill_assessment_scaffolding(student_group=None, only_missing=1):
+	"""Repair command: resolve assessment links for existing MCQS Assignments.
+
+	bench --site <site> execute numerouno.numerouno.utils.assessment_scaffolding.backfill_assessment_scaffolding
+	"""
+	frappe.only_for("System Manager")
+
+	filters = {}
+	if student_group:
+		filters["student_group"] = student_group
+	if frappe.utils.cint(only_missing):
+		filters["assessment_plan"] = ["is", "not set"]
+
+	updated = []
+	failed = []
+	for assignment_name in frappe.get_all("MCQS Assignment", filters=filters, pluck="name"):
+		values = sync_assignment_scaffolding(assignment_name)
+		if values.get("assessment_setup_error"):
+			failed.append({"name": assignment_name, "error": values["assessment_setup_error"]})
+		else:
+			updated.append(assignment_name)
+
+	return {"status": "success", "updated": len(updated), "failed": failed}
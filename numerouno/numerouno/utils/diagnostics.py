@@ -0,0 +1,180 @@
+"""App-level diagnostics channel.
+
+Debug output goes to a capped Redis list (the ring buffer shown on the
+Diagnostics Console page) instead of Error Log rows and worker stdout.
+Configured from site config, e.g.:
+
+	"diagnostics": {
+		"level": "warning",
+		"sample_rate": 1,
+		"ring_size": 1000,
+		"endpoints": {"get_available_quizzes_from_mcqs": {"level": "debug", "sample_rate": 0.1}}
+	}
+
+Endpoint keys match the whitelisted method (last segment or full dotted
+path) or background job being served, or a channel name. Messages use
+`str.format` placeholders and are only formatted once a line is recorded,
+so a disabled level costs one cached comparison.
+"""
+
+import json
+import random
+import time
+
+import frappe
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+DISABLED = 100
+
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR, "off": DISABLED}
+LEVEL_NAMES = {value: key for key, value in LEVELS.items()}
+
+DEFAULT_LEVEL = "warning"
+DEFAULT_RING_SIZE = 1000
+RING_KEY = "diagnostics:ring"
+
+
+def _level_value(level):
+	if isinstance(level, int):
+		return level
+	return LEVELS.get(str(level or "").lower(), LEVELS[DEFAULT_LEVEL])
+
+
+def _get_config():
+	return frappe.conf.get("diagnostics") or {}
+
+
+def _current_endpoint():
+	form_dict = getattr(frappe.local, "form_dict", None) or {}
+	cmd = form_dict.get("cmd")
+	if cmd:
+		return cmd
+	job = getattr(frappe.local, "job", None)
+	return getattr(job, "method", None) or ""
+
+
+def _endpoint_settings(config, channel_name, endpoint):
+	endpoints = config.get("endpoints") or {}
+	for key in (endpoint, endpoint.rsplit(".", 1)[-1] if endpoint else None, channel_name):
+		if key and key in endpoints:
+			settings = endpoints[key]
+			return settings if isinstance(settings, dict) else {"level": settings}
+	return {}
+
+
+def _channel_state(channel_name):
+	"""(threshold, endpoint) for this channel, resolved once per request or job."""
+	states = getattr(frappe.local, "diagnostics_state", None)
+	if states is None:
+		states = frappe.local.diagnostics_state = {}
+
+	state = states.get(channel_name)
+	if state is None:
+		config = _get_config()
+		endpoint = _current_endpoint()
+		settings = _endpoint_settings(config, channel_name, endpoint)
+		threshold = _level_value(settings.get("level") or config.get("level") or DEFAULT_LEVEL)
+		sample_rate = settings.get("sample_rate", config.get("sample_rate", 1))
+		# Sampling drops below-error output for a whole request, never individual lines.
+		if threshold < ERROR and random.random() >= float(sample_rate if sample_rate is not None else 1):
+			threshold = ERROR
+		state = states[channel_name] = (threshold, endpoint)
+	return state
+
+
+class DiagnosticsChannel:
+	__slots__ = ("name",)
+
+	def __init__(self, name):
+		self.name = name
+
+	def is_enabled(self, level):
+		return _level_value(level) >= _channel_state(self.name)[0]
+
+	def debug(self, message, *args, **context):
+		if DEBUG >= _channel_state(self.name)[0]:
+			self._record(DEBUG, message, args, context)
+
+	def info(self, message, *args, **context):
+		if INFO >= _channel_state(self.name)[0]:
+			self._record(INFO, message, args, context)
+
+	def warning(self, message, *args, **context):
+		if WARNING >= _channel_state(self.name)[0]:
+			self._record(WARNING, message, args, context)
+
+	def error(self, message, *args, title=None, **context):
+		"""Record an error and keep it in Error Log, with the active traceback if any."""
+		text = self._record(ERROR, message, args, context) if ERROR >= _channel_state(self.name)[0] else None
+		traceback = frappe.get_traceback()
+		if traceback:
+			text = f"{text or _format(message, args)}\nTraceback: {traceback}"
+		frappe.log_error(title=title or self.name, message=text or _format(message, args))
+
+	def _record(self, level, message, args, context):
+		text = _format(message, args)
+		entry = {
+			"ts": time.time(),
+			"level": LEVEL_NAMES.get(level, level),
+			"channel": self.name,
+			"endpoint": _channel_state(self.name)[1],
+			"message": text,
+		}
+		if context:
+			entry["context"] = context
+		try:
+			ring_size = int(_get_config().get("ring_size") or DEFAULT_RING_SIZE)
+			cache = frappe.cache()
+			cache.lpush(RING_KEY, json.dumps(entry, default=str))
+			cache.ltrim(RING_KEY, 0, ring_size - 1)
+		except Exception:
+			pass
+		return text
+
+
+def _format(message, args):
+	if not args:
+		return str(message)
+	try:
+		return str(message).format(*args)
+	except Exception:
+		return " ".join([str(message), *(str(arg) for arg in args)])
+
+
+_channels = {}
+
+
+def get_diagnostics(name):
+	"""Shared channel for a module or endpoint family, e.g. `get_diagnostics("quiz")`."""
+	channel = _channels.get(name)
+	if channel is None:
+		channel = _channels[name] = DiagnosticsChannel(name)
+	return channel
+
+
+def get_entries(channel=None, level=None, endpoint=None, limit=200):
+	"""Newest-first ring buffer entries, optionally filtered."""
+	min_level = _level_value(level) if level else DEBUG
+	entries = []
+	for raw in frappe.cache().lrange(RING_KEY, 0, -1) or []:
+		try:
+			entry = json.loads(raw)
+		except Exception:
+			continue
+		if channel and entry.get("channel") != channel:
+			continue
+		if _level_value(entry.get("level")) < min_level:
+			continue
+		if endpoint and endpoint not in (entry.get("endpoint") or ""):
+			continue
+		entries.append(entry)
+		if len(entries) >= limit:
+			break
+	return entries
+
+
+def clear_entries():
+	frappe.cache().delete_value(RING_KEY)
@@ -0,0 +1,448 @@
+"""Exam-session load test for the public quiz flow.
+
+Seeds a throwaway student group (course, quiz, MCQS Assignment, signed
+attendance) and replays simulated candidates through the same calls the
+public quiz page makes:
+
+	get_students_by_group -> get_available_quizzes_from_mcqs
+	-> get_quiz_questions_from_quiz -> upsert_public_quiz_progress (per answer)
+	-> submit_quiz_from_mcqs
+
+Run on a local or staging site, never production:
+
+	bench --site <site> execute numerouno.numerouno.utils.exam_load_test.run_exam_load_test \
+		--kwargs "{'candidates': 100, 'concurrency': 20}"
+
+Each run is written to `<site>/load_tests/<timestamp>-<commit>.json`;
+`compare_exam_load_tests` diffs two stored runs.
+"""
+
+import json
+import os
+import random
+import subprocess
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import frappe
+from frappe.utils import add_days, cint, flt, now_datetime, today
+
+from numerouno.numerouno.utils.query_profiler import diff_row_lock_stats, get_row_lock_stats, profile_queries
+
+SEED_PREFIX = "LOADTEST"
+RESULTS_DIR = "load_tests"
+STEPS = (
+	"get_students_by_group",
+	"get_available_quizzes_from_mcqs",
+	"get_quiz_questions_from_quiz",
+	"upsert_public_quiz_progress",
+	"submit_quiz_from_mcqs",
+)
+LOCK_ERRORS = ("QueryDeadlockError", "QueryTimeoutError")
+
+
+def _seed_name(kind, suffix=""):
+	return f"{SEED_PREFIX} {kind}{suffix}"
+
+
+def _get_or_insert(doctype, name_filters, values):
+	existing = frappe.db.get_value(doctype, name_filters, "name")
+	if existing:
+		return existing
+	doc = frappe.get_doc(dict(doctype=doctype, **values))
+	doc.insert(ignore_permissions=True, ignore_mandatory=True)
+	return doc.name
+
+
+def seed_exam_site(candidates=50, questions=20, run_id=None):
+	"""Create a student group with `candidates` students who may sit one `questions`-long quiz."""
+	run_id = run_id or uuid.uuid4().hex[:8]
+	frappe.flags.mute_emails = True
+
+	course = _get_or_insert("Course", {"course_name": _seed_name("Course")}, {"course_name": _seed_name("Course")})
+	academic_year = frappe.db.get_value("Academic Year", {}, "name") or _get_or_insert(
+		"Academic Year",
+		{"academic_year_name": _seed_name("Year")},
+		{
+			"academic_year_name": _seed_name("Year"),
+			"year_start_date": add_days(today(), -180),
+			"year_end_date": add_days(today(), 180),
+		},
+	)
+
+	question_names = []
+	for index in range(cint(questions)):
+		correct = random.randrange(4)
+		question = frappe.get_doc(
+			{
+				"doctype": "Question",
+				"question": f"{_seed_name('Question')} {run_id} #{index + 1}",
+				"question_type": "Single Correct Answer",
+				"options": [
+					{"option": f"Option {option + 1}", "is_correct": int(option == correct)}
+					for option in range(4)
+				],
+			}
+		).insert(ignore_permissions=True)
+		question_names.append(question.name)
+
+	quiz = frappe.get_doc(
+		{
+			"doctype": "Quiz",
+			"title": _seed_name("Quiz", f" {run_id}"),
+			"passing_score": 75,
+			"max_attempts": 0,
+			"question": [{"question_link": name} for name in question_names],
+		}
+	).insert(ignore_permissions=True)
+
+	students = []
+	for index in range(cint(candidates)):
+		student = frappe.get_doc(
+			{
+				"doctype": "Student",
+				"first_name": SEED_PREFIX,
+				"last_name": f"{run_id} {index + 1}",
+				"enabled": 1,
+			}
+		).insert(ignore_permissions=True, ignore_mandatory=True)
+		students.append(student)
+
+	student_group = frappe.get_doc(
+		{
+			"doctype": "Student Group",
+			"student_group_name": _seed_name("Group", f" {run_id}"),
+			"group_based_on": "Activity",
+			"academic_year": academic_year,
+			"course": course,
+			"max_strength": 0,
+			"students": [
+				{"student": student.name, "student_name": student.student_name, "active": 1}
+				for student in students
+			],
+		}
+	).insert(ignore_permissions=True, ignore_mandatory=True)
+
+	frappe.get_doc(
+		{
+			"doctype": "MCQS Assignment",
+			"student_group": student_group.name,
+			"mcqs": quiz.name,
+			"assignment_flow": "Direct MCQs",
+		}
+	).insert(ignore_permissions=True)
+
+	# One past session with signed, submitted attendance keeps every candidate eligible.
+	schedule = frappe.get_doc(
+		{
+			"doctype": "Course Schedule",
+			"student_group": student_group.name,
+			"course": course,
+			"schedule_date": add_days(today(), -1),
+			"from_time": "09:00:00",
+			"to_time": "17:00:00",
+		}
+	)
+	schedule.flags.ignore_validate = True
+	schedule.insert(ignore_permissions=True, ignore_mandatory=True)
+
+	for student in students:
+		attendance = frappe.get_doc(
+			{
+				"doctype": "Student Attendance",
+				"student": student.name,
+				"student_name": student.student_name,
+				"student_group": student_group.name,
+				"course_schedule": schedule.name,
+				"date": schedule.schedule_date,
+				"status": "Present",
+				"custom_student_signature": "data:image/png;base64,iVBORw0KGgo=",
+			}
+		)
+		attendance.flags.ignore_validate = True
+		attendance.insert(ignore_permissions=True, ignore_mandatory=True)
+		attendance.submit()
+
+	frappe.db.commit()
+	return {
+		"run_id": run_id,
+		"student_group": student_group.name,
+		"quiz": quiz.name,
+		"students": [student.name for student in students],
+		"questions": len(question_names),
+		"question_names": question_names,
+	}
+
+
+def _delete_with_children(doctype, filters, child_doctypes=()):
+	names = frappe.get_all(doctype, filters=filters, pluck="name")
+	if names:
+		for child_doctype in child_doctypes:
+			frappe.db.delete(child_doctype, {"parent": ["in", names], "parenttype": doctype})
+		frappe.db.delete(doctype, {"name": ["in", names]})
+
+
+def delete_exam_seed(seed):
+	"""Remove everything `seed_exam_site` created for one run, plus the attempts made against it.
+
+	The shared LOADTEST course and academic year stay for later runs.
+	"""
+	seed = frappe.parse_json(seed)
+	group = seed["student_group"]
+	students = seed.get("students") or []
+
+	_delete_with_children("Quiz Activity", {"quiz": seed["quiz"]}, ("Quiz Result",))
+	_delete_with_children("Assessment Result", {"student_group": group}, ("Assessment Result Detail",))
+	_delete_with_children("Assessment Plan", {"student_group": group}, ("Assessment Plan Criteria",))
+	frappe.db.delete("Student Attendance", {"student_group": group})
+	frappe.db.delete("Course Schedule", {"student_group": group})
+	frappe.db.delete("MCQS Assignment", {"student_group": group})
+	_delete_with_children(
+		"Student Group", {"name": group}, ("Student Group Student", "Student Group Instructor")
+	)
+	if students:
+		frappe.db.delete("Course Enrollment", {"student": ["in", students]})
+		frappe.db.delete("Student", {"name": ["in", students]})
+	_delete_with_children("Quiz", {"name": seed["quiz"]}, ("Quiz Question",))
+	if seed.get("question_names"):
+		_delete_with_children("Question", {"name": ["in", seed["question_names"]]}, ("Options",))
+	frappe.db.commit()
+
+
+class _Recorder:
+	"""Per-step samples collected from every candidate thread."""
+
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.samples = {step: [] for step in STEPS}
+		self.errors = {step: 0 for step in STEPS}
+		self.lock_errors = 0
+		self.duplicates = 0
+
+	def add(self, step, profile, ok, lock_error=False):
+		with self.lock:
+			self.samples[step].append(profile.as_dict())
+			if not ok:
+				self.errors[step] += 1
+			if lock_error:
+				self.lock_errors += 1
+
+
+def _timed_call(recorder, step, method, **kwargs):
+	lock_error = False
+	with profile_queries() as profile:
+		try:
+			result = method(**kwargs)
+			frappe.db.commit()
+		except Exception as e:
+			frappe.db.rollback()
+			lock_error = type(e).__name__ in LOCK_ERRORS
+			result = {"status": "error", "message": str(e)}
+	ok = isinstance(result, dict) and result.get("status") == "success"
+	recorder.add(step, profile, ok, lock_error=lock_error)
+	return result if isinstance(result, dict) else {}
+
+
+def _replay_candidate(site, sites_path, seed, student, recorder):
+	from numerouno.numerouno.api import quiz_api
+
+	frappe.init(site=site, sites_path=sites_path)
+	frappe.connect()
+	try:
+		frappe.set_user("Guest")
+		group = seed["student_group"]
+
+		_timed_call(recorder, "get_students_by_group", quiz_api.get_students_by_group, student_group=group)
+		available = _timed_call(
+			recorder,
+			"get_available_quizzes_from_mcqs",
+			quiz_api.get_available_quizzes_from_mcqs,
+			student_group=group,
+			student=student,
+		)
+		quiz_name = ((available.get("quizzes") or [{}])[0]).get("name") or seed["quiz"]
+		payload = _timed_call(
+			recorder, "get_quiz_questions_from_quiz", quiz_api.get_quiz_questions_from_quiz, quiz_name=quiz_name
+		)
+		questions = payload.get("questions") or []
+
+		attempt_id = f"{SEED_PREFIX.lower()}-{uuid.uuid4().hex}"
+		answers = {}
+		acked_seq = 0
+		for seq, question in enumerate(questions, start=1):
+			option = random.choice(question.get("options") or [{"id": 1}])["id"]
+			answers[question["name"]] = option
+			result = _timed_call(
+				recorder,
+				"upsert_public_quiz_progress",
+				quiz_api.upsert_public_quiz_progress,
+				quiz_name=quiz_name,
+				student=student,
+				student_group=group,
+				attempt_id=attempt_id,
+				total_questions=len(questions),
+				delta=json.dumps({question["name"]: option}),
+				seq=seq,
+				base_seq=acked_seq,
+			)
+			acked_seq = cint(result.get("seq")) or acked_seq
+
+		submission = [
+			{"question": name, "answers": [option], "marks": 1} for name, option in answers.items()
+		]
+		result = _timed_call(
+			recorder,
+			"submit_quiz_from_mcqs",
+			quiz_api.submit_quiz_from_mcqs,
+			quiz_name=quiz_name,
+			student=student,
+			student_group=group,
+			answers=json.dumps(submission),
+			attempt_id=attempt_id,
+		)
+		if result.get("duplicate"):
+			with recorder.lock:
+				recorder.duplicates += 1
+	finally:
+		frappe.destroy()
+
+
+def _percentile(values, percent):
+	if not values:
+		return 0
+	values = sorted(values)
+	index = min(len(values) - 1, max(0, int(round(percent / 100 * len(values) + 0.5)) - 1))
+	return values[index]
+
+
+def _summarize(samples, errors, elapsed):
+	durations = [sample["duration_ms"] for sample in samples]
+	queries = [sample["queries"] for sample in samples]
+	return {
+		"calls": len(samples),
+		"errors": errors,
+		"throughput_per_sec": round(len(samples) / elapsed, 2) if elapsed else 0,
+		"p50_ms": round(_percentile(durations, 50), 2),
+		"p95_ms": round(_percentile(durations, 95), 2),
+		"p99_ms": round(_percentile(durations, 99), 2),
+		"max_ms": round(max(durations), 2) if durations else 0,
+		"queries_per_call": round(sum(queries) / len(queries), 2) if queries else 0,
+		"max_queries": max(queries) if queries else 0,
+		"rows_per_call": round(sum(sample["rows"] for sample in samples) / len(samples), 2) if samples else 0,
+	}
+
+
+def _git_revision():
+	try:
+		return (
+			subprocess.check_output(
+				["git", "rev-parse", "--short", "HEAD"],
+				cwd=frappe.get_app_path("numerouno"),
+				stderr=subprocess.DEVNULL,
+			)
+			.decode()
+			.strip()
+		)
+	except Exception:
+		return "unknown"
+
+
+def _results_path(filename=None):
+	directory = frappe.get_site_path(RESULTS_DIR)
+	os.makedirs(directory, exist_ok=True)
+	return os.path.join(directory, filename) if filename else directory
+
+
+def run_exam_load_test(candidates=50, concurrency=10, questions=20, seed=None, label=None):
+	"""Seed (unless `seed` from an earlier `seed_exam_site` is given), replay, report and store."""
+	if not (frappe.conf.get("developer_mode") or frappe.conf.get("allow_load_tests")):
+		frappe.throw("Load tests only run on sites with developer_mode or allow_load_tests set.")
+
+	seed = frappe.parse_json(seed) if seed else seed_exam_site(candidates, questions)
+	students = seed["students"][: cint(candidates)]
+	site = frappe.local.site
+	sites_path = frappe.local.sites_path
+
+	recorder = _Recorder()
+	locks_before = get_row_lock_stats()
+	started = time.perf_counter()
+	with ThreadPoolExecutor(max_workers=max(cint(concurrency), 1)) as executor:
+		futures = [
+			executor.submit(_replay_candidate, site, sites_path, seed, student, recorder) for student in students
+		]
+		failed_candidates = sum(1 for future in futures if future.exception())
+	elapsed = time.perf_counter() - started
+
+	lock_waits = diff_row_lock_stats(locks_before, get_row_lock_stats())
+
+	all_samples = [sample for step in STEPS for sample in recorder.samples[step]]
+	report = {
+		"label": label,
+		"revision": _git_revision(),
+		"started_at": str(now_datetime()),
+		"site": site,
+		"candidates": len(students),
+		"concurrency": cint(concurrency),
+		"questions": seed.get("questions"),
+		"student_group": seed["student_group"],
+		"elapsed_sec": round(elapsed, 3),
+		"candidates_per_sec": round((len(students) - failed_candidates) / elapsed, 2) if elapsed else 0,
+		"failed_candidates": failed_candidates,
+		"duplicate_submissions": recorder.duplicates,
+		"lock_waits": {
+			"row_lock_waits": cint(lock_waits.get("Innodb_row_lock_waits")),
+			"row_lock_time_ms": flt(lock_waits.get("Innodb_row_lock_time")),
+			"deadlocks_or_timeouts": recorder.lock_errors,
+		},
+		"overall": _summarize(all_samples, sum(recorder.errors.values()), elapsed),
+		"steps": {step: _summarize(recorder.samples[step], recorder.errors[step], elapsed) for step in STEPS},
+	}
+
+	filename = f"{now_datetime().strftime('%Y%m%d-%H%M%S')}-{report['revision']}.json"
+	with open(_results_path(filename), "w") as f:
+		json.dump(report, f, indent=1, default=str)
+	report["stored_as"] = filename
+	return report
+
+
+def list_exam_load_tests():
+	directory = _results_path()
+	return sorted(name for name in os.listdir(directory) if name.endswith(".json"))
+
+
+def _load_run(filename):
+	with open(_results_path(filename)) as f:
+		return json.load(f)
+
+
+def compare_exam_load_tests(base=None, head=None):
+	"""Per-step latency and query deltas between two stored runs (default: the last two)."""
+	runs = list_exam_load_tests()
+	if not base or not head:
+		if len(runs) < 2:
+			frappe.throw("Need at least two stored load test runs to compare.")
+		base, head = base or runs[-2], head or runs[-1]
+
+	base_run, head_run = _load_run(base), _load_run(head)
+	metrics = ("p50_ms", "p95_ms", "p99_ms", "queries_per_call", "throughput_per_sec")
+	steps = {}
+	for step in ("overall",) + STEPS:
+		before = base_run["overall"] if step == "overall" else base_run["steps"].get(step, {})
+		after = head_run["overall"] if step == "overall" else head_run["steps"].get(step, {})
+		steps[step] = {
+			metric: {
+				"base": before.get(metric, 0),
+				"head": after.get(metric, 0),
+				"delta": round(after.get(metric, 0) - before.get(metric, 0), 2),
+			}
+			for metric in metrics
+		}
+
+	return {
+		"base": {"file": base, "revision": base_run.get("revision"), "candidates": base_run.get("candidates")},
+		"head": {"file": head, "revision": head_run.get("revision"), "candidates": head_run.get("candidates")},
+		"lock_waits": {"base": base_run.get("lock_waits"), "head": head_run.get("lock_waits")},
+		"steps": steps,
+	}
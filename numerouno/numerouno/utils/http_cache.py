@@ -0,0 +1,109 @@
+"""Conditional GET (ETag / If-None-Match) for guest endpoints polled by exam rooms.
+
+An endpoint builds an ETag from content version stamps before doing any work:
+
+	etag = make_etag("quiz", get_quiz_version(quiz_name), lang_code)
+	if is_not_modified(etag):
+		return NOT_MODIFIED
+
+`set_etag_headers` (an `after_request` hook) adds the ETag to the response and
+turns a matched request into an empty 304. Error bodies (`status` other than
+"success") are sent without an ETag, so clients never cache them.
+"""
+
+import hashlib
+
+import frappe
+
+VERSION_STAMP_TTL = 60 * 60 * 6
+NOT_MODIFIED = {"status": "not_modified"}
+
+
+def _stamp_key(name):
+	return f"content_version:{name}"
+
+
+def get_version_stamp(name, compute):
+	"""Cached `compute()` result for a content version; `bump_version_stamp` drops it."""
+	cache = frappe.cache()
+	stamp = cache.get_value(_stamp_key(name))
+	if stamp is None:
+		stamp = str(compute() or "missing")
+		cache.set_value(_stamp_key(name), stamp, expires_in_sec=VERSION_STAMP_TTL)
+	return stamp
+
+
+def bump_version_stamp(name):
+	key = _stamp_key(name)
+	frappe.cache().delete_value(key)
+
+	# Readers may have re-cached the old stamp before this transaction committed.
+	after_commit = getattr(frappe.db, "after_commit", None)
+	if after_commit is not None:
+		after_commit.add(lambda: frappe.cache().delete_value(key))
+
+
+def make_etag(*parts):
+	digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()[:32]
+	return f'W/"{digest}"'
+
+
+def _request_etags():
+	request = getattr(frappe.local, "request", None)
+	if not request or request.method not in ("GET", "HEAD"):
+		return None
+	header = request.headers.get("If-None-Match") or ""
+	return {tag.strip() for tag in header.split(",") if tag.strip()}
+
+
+def is_not_modified(etag):
+	"""Attach `etag` to this GET response; True when the client already holds it."""
+	client_etags = _request_etags()
+	if client_etags is None:
+		return False
+
+	frappe.local.response_etag = etag
+	# Weak comparison: W/"x" and "x" name the same representation.
+	bare = etag[2:] if etag.startswith("W/") else etag
+	matched = bool(client_etags & {etag, bare, "*"})
+	frappe.local.response_not_modified = matched
+	return matched
+
+
+def _is_cacheable_message():
+	"""Only successful bodies get an ETag; error replies must never be replayed by a 304."""
+	message = (getattr(frappe.local, "response", None) or {}).get("message")
+	return not isinstance(message, dict) or message.get("status") in ("success", NOT_MODIFIED["status"])
+
+
+def set_etag_headers(response=None, request=None):
+	etag = getattr(frappe.local, "response_etag", None)
+	if not etag or response is None or response.status_code != 200 or not _is_cacheable_message():
+		frappe.local.response_etag = None
+		frappe.local.response_not_modified = False
+		return
+
+	response.headers["ETag"] = etag
+	# Cacheable, but always revalidated so a new version is picked up immediately.
+	response.headers["Cache-Control"] = "no-cache"
+	if getattr(frappe.local, "response_not_modified", False):
+		response.status_code = 304
+		response.set_data(b"")
+		response.headers.pop("Content-Length", None)
+
+	frappe.local.response_etag = None
+	frappe.local.response_not_modified = False
+
+
+def _student_group_list_stamp():
+	row = frappe.db.sql("SELECT MAX(modified), COUNT(*) FROM `tabStudent Group`")
+	return f"{row[0][0]}:{row[0][1]}" if row else None
+
+
+def get_student_group_list_version():
+	"""Version of everything the guest group/course/year pickers list."""
+	return get_version_stamp("student_group_list", _student_group_list_stamp)
+
+
+def on_student_group_change(doc, method=None):
+	bump_version_stamp("student_group_list")
@@ -0,0 +1,102 @@
+import frappe
+
+from numerouno.numerouno.utils.http_cache import bump_version_stamp, get_version_stamp
+
+INSTRUCTOR_SCOPE_TTL = 60 * 60 * 6
+ADNOC_SCOPE_USER = "__adnoc__"
+
+
+def _scope_generation():
+	# Any Instructor / Employee / group-instructor change starts a new generation.
+	return get_version_stamp("instructor_scope", lambda: frappe.generate_hash(length=10))
+
+
+def _scope_key(user):
+	return f"instructor_scope:{_scope_generation()}:{user}"
+
+
+def get_student_group_names_for_instructors(instructor_names):
+	if not instructor_names:
+		return []
+
+	rows = frappe.get_all(
+		"Student Group Instructor",
+		filters={"instructor": ["in", list(instructor_names)]},
+		fields=["parent"],
+		group_by="parent",
+	)
+	return [row.parent for row in rows]
+
+
+def _build_user_scope(user):
+	instructors = frappe.db.sql(
+		"""
+		SELECT i.name, i.custom_is_adnoc_instructor
+		FROM `tabInstructor` i
+		LEFT JOIN `tabEmployee` e ON e.name = i.employee
+		WHERE i.custom_email = %(user)s OR e.user_id = %(user)s
+		""",
+		{"user": user},
+		as_dict=True,
+	)
+	instructor_names = sorted({row.name for row in instructors})
+	return {
+		"instructor_names": instructor_names,
+		"adnoc_instructor_names": sorted({row.name for row in instructors if row.custom_is_adnoc_instructor}),
+		"student_group_names": get_student_group_names_for_instructors(instructor_names),
+	}
+
+
+def _build_adnoc_scope():
+	instructor_names = sorted(
+		frappe.get_all("Instructor", filters={"custom_is_adnoc_instructor": 1}, pluck="name")
+	)
+	return {
+		"instructor_names": instructor_names,
+		"adnoc_instructor_names": instructor_names,
+		"student_group_names": get_student_group_names_for_instructors(instructor_names),
+	}
+
+
+def _cached_scope(user, builder):
+	cache = frappe.cache()
+	key = _scope_key(user)
+	scope = cache.get_value(key)
+	if scope is None:
+		scope = builder()
+		cache.set_value(key, scope, expires_in_sec=INSTRUCTOR_SCOPE_TTL)
+	return scope
+
+
+def get_instructor_scope(user):
+	"""Cached `{"instructor_names", "adnoc_instructor_names", "student_group_names"}` for a user.
+
+	A user maps to Instructors by `custom_email` or through their Employee.
+	"""
+	return _cached_scope(user, lambda: _build_user_scope(user))
+
+
+def get_adnoc_scope():
+	"""Cached scope of every ADNOC instructor, seen by holders of the ADNOC certificate role."""
+	return _cached_scope(ADNOC_SCOPE_USER, _build_adnoc_scope)
+
+
+def invalidate_instructor_scope(doc=None, method=None):
+	bump_version_stamp("instructor_scope")
+
+
+def on_employee_change(doc, method=None):
+	before = doc.get_doc_before_save() if method != "on_trash" else None
+	if method in ("on_trash", "after_rename") or (before and before.user_id != doc.user_id):
+		invalidate_instructor_scope()
+
+
+def _group_instructors(doc):
+	return sorted(row.instructor for row in doc.get("instructors") or [] if row.instructor)
+
+
+def on_student_group_change(doc, method=None):
+	# Student Group Instructor rows are saved with their group; only a changed roster matters.
+	before = doc.get_doc_before_save() if method == "on_update" else None
+	if method != "on_update" or not before or _group_instructors(before) != _group_instructors(doc):
+		invalidate_instructor_scope()
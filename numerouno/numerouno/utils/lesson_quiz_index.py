@@ -0,0 +1,92 @@
+import json
+
+import frappe
+from frappe.utils import now
+
+INDEX_DOCTYPE = "Lesson Quiz Index"
+
+
+def extract_lesson_quizzes(content):
+	"""`[(quiz, block_type)]` for the quiz blocks and video-upload quizzes in lesson content JSON."""
+	if not content:
+		return []
+	if isinstance(content, str):
+		try:
+			content = json.loads(content)
+		except ValueError:
+			return []
+	if not isinstance(content, dict):
+		return []
+
+	found = {}
+	for block in content.get("blocks") or []:
+		if not isinstance(block, dict):
+			continue
+		data = block.get("data") or {}
+		if block.get("type") == "quiz" and data.get("quiz"):
+			found.setdefault(data["quiz"], "quiz")
+		elif block.get("type") == "upload":
+			for quiz_row in data.get("quizzes") or []:
+				if isinstance(quiz_row, dict) and quiz_row.get("quiz"):
+					found.setdefault(quiz_row["quiz"], "upload")
+	# One row per quiz per lesson; the first block that embeds it wins.
+	return list(found.items())
+
+
+def sync_lesson_quiz_index(lesson, course, content):
+	"""Replace a lesson's index rows with the quizzes its content embeds now."""
+	frappe.db.delete(INDEX_DOCTYPE, {"lesson": lesson})
+	quizzes = extract_lesson_quizzes(content)
+	if not quizzes:
+		return 0
+
+	timestamp = now()
+	user = frappe.session.user
+	frappe.db.bulk_insert(
+		INDEX_DOCTYPE,
+		["name", "course", "lesson", "quiz", "block_type", "creation", "modified", "owner", "modified_by"],
+		[
+			(frappe.generate_hash(length=10), course, lesson, quiz, block_type, timestamp, timestamp, user, user)
+			for quiz, block_type in quizzes
+		],
+	)
+	return len(quizzes)
+
+
+def get_course_quizzes(lms_course):
+	"""LMS Quiz rows embedded anywhere in a course's lessons, in one indexed query."""
+	if not lms_course:
+		return []
+	return frappe.db.sql(
+		"""
+		SELECT q.name, q.title, q.total_marks, q.passing_percentage, q.max_attempts
+		FROM `tabLesson Quiz Index` lqi
+		INNER JOIN `tabLMS Quiz` q ON q.name = lqi.quiz
+		WHERE lqi.course = %s
+		GROUP BY q.name, q.title, q.total_marks, q.passing_percentage, q.max_attempts
+		ORDER BY q.title
+		""",
+		(lms_course,),
+		as_dict=True,
+	)
+
+
+def rebuild_lesson_quiz_index():
+	"""Re-index every Course Lesson (backfill / repair); returns the number of rows written."""
+	if not frappe.db.table_exists("Course Lesson"):
+		return 0
+
+	frappe.db.delete(INDEX_DOCTYPE)
+	written = 0
+	for lesson in frappe.get_all("Course Lesson", fields=["name", "course", "content"], order_by="name"):
+		written += sync_lesson_quiz_index(lesson.name, lesson.course, lesson.content)
+	return written
+
+
+def on_course_lesson_update(doc, method=None):
+	sync_lesson_quiz_index(doc.name, doc.course, doc.content)
+
+
+def on_course_lesson_trash(doc, method=None):
+	frappe.db.delete(INDEX_DOCTYPE, {"lesson": doc.name})
+
@@ -8,13 +8,17 @@ from PIL import Image
 import numpy as np
 from frappe.utils import get_files_path
 
+from numerouno.numerouno.utils.diagnostics import get_diagnostics
+
+diag = get_diagnostics("ocr")
+
 # Try to import pytesseract with fallback handling
 try:
     import pytesseract
     TESSERACT_AVAILABLE = True
 except ImportError as e:
     TESSERACT_AVAILABLE = False
-    frappe.log_error(f"pytesseract not available: {e}", "OCR Utils")
+    diag.error("pytesseract not available: {}", e, title="OCR Utils")
 
 # Try to import OpenCV with fallback handling
 try:
@@ -22,7 +26,7 @@ try:
     OPENCV_AVAILABLE = True
 except ImportError as e:
     OPENCV_AVAILABLE = False
-    frappe.log_error(f"OpenCV not available: {e}", "OCR Utils")
+    diag.error("OpenCV not available: {}", e, title="OCR Utils")
 
 # Configure Tesseract path if needed
 def configure_tesseract():
@@ -181,13 +185,13 @@ def extract_text_from_image(file_path):
 	Returns:
 		dict: Dictionary containing extracted text and confidence scores
 	"""
-	print(f"DEBUG: extract_text_from_image called with file_path: {file_path}")
+	diag.debug("DEBUG: extract_text_from_image called with file_path: {}", file_path)
 	
 	# Check if Tesseract is available
 	if not TESSERACT_AVAILABLE:
 		error_msg = "pytesseract module is not available. Please install it using: pip install pytesseract"
-		print(f"DEBUG: {error_msg}")
-		frappe.log_error(error_msg, "OCR Utils")
+		diag.debug("DEBUG: {}", error_msg)
+		diag.warning(error_msg)
 		return {
 			'text': '',
 			'confidence': 0,
@@ -199,8 +203,8 @@ def extract_text_from_image(file_path):
 	
 	if not TESSERACT_CONFIGURED:
 		error_msg = "Tesseract OCR binary is not configured or not found. Please install Tesseract OCR on your system."
-		print(f"DEBUG: {error_msg}")
-		frappe.log_error(error_msg, "OCR Utils")
+		diag.debug("DEBUG: {}", error_msg)
+		diag.warning(error_msg)
 		return {
 			'text': '',
 			'confidence': 0,
@@ -213,36 +217,36 @@ def extract_text_from_image(file_path):
 	try:
 		# Check if file exists
 		if not os.path.exists(file_path):
-			print(f"DEBUG: File not found: {file_path}")
+			diag.debug("DEBUG: File not found: {}", file_path)
 			frappe.throw(f"Image file not found: {file_path}")
 		
-		print("DEBUG: File exists, reading image with PIL")
+		diag.debug("DEBUG: File exists, reading image with PIL")
 		# Read image using PIL
 		image = Image.open(file_path)
-		print(f"DEBUG: Image loaded, mode: {image.mode}, size: {image.size}")
+		diag.debug("DEBUG: Image loaded, mode: {}, size: {}", image.mode, image.size)
 		
 		# Convert to RGB if necessary
 		if image.mode != 'RGB':
-			print("DEBUG: Converting image to RGB")
+			diag.debug("DEBUG: Converting image to RGB")
 			image = image.convert('RGB')
 		
 		# Handle OpenCV availability
 		if OPENCV_AVAILABLE:
-			print("DEBUG: Converting PIL image to OpenCV format")
+			diag.debug("DEBUG: Converting PIL image to OpenCV format")
 			# Convert PIL image to OpenCV format
 			opencv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-			print(f"DEBUG: OpenCV image shape: {opencv_image.shape}")
+			diag.debug("DEBUG: OpenCV image shape: {}", opencv_image.shape)
 			
-			print("DEBUG: Preprocessing image for better OCR")
+			diag.debug("DEBUG: Preprocessing image for better OCR")
 			# Preprocess image for better OCR
 			processed_image = preprocess_image(opencv_image)
-			print("DEBUG: Image preprocessing completed")
+			diag.debug("DEBUG: Image preprocessing completed")
 		else:
-			print("DEBUG: OpenCV not available, using PIL image directly")
+			diag.debug("DEBUG: OpenCV not available, using PIL image directly")
 			# Use PIL image directly if OpenCV is not available
 			processed_image = image
 		
-		print("DEBUG: Running Tesseract OCR with multiple PSM modes")
+		diag.debug("DEBUG: Running Tesseract OCR with multiple PSM modes")
 		# Try multiple PSM modes to capture different text layouts
 		psm_modes = [3, 6, 8, 13, 1, 4, 7]  # Different page segmentation modes
 		best_text = ""
@@ -251,7 +255,7 @@ def extract_text_from_image(file_path):
 		
 		for psm in psm_modes:
 			try:
-				print(f"DEBUG: Trying PSM mode {psm}")
+				diag.debug("DEBUG: Trying PSM mode {}", psm)
 				# Get structured data
 				extracted_data = pytesseract.image_to_data(
 					processed_image, 
@@ -278,20 +282,25 @@ def extract_text_from_image(file_path):
 				combined_text = ' '.join(text_blocks)
 				avg_confidence = sum(confidences) / len(confidences) if confidences else 0
 				
-				print(f"DEBUG: PSM {psm} - Text length: {len(combined_text)}, Confidence: {avg_confidence:.2f}")
-				print(f"DEBUG: PSM {psm} - Sample: {combined_text[:100]}...")
+				diag.debug(
+					"DEBUG: PSM {} - Text length: {}, Confidence: {:.2f}",
+					psm,
+					len(combined_text),
+					avg_confidence,
+				)
+				diag.debug("DEBUG: PSM {} - Sample: {}...", psm, combined_text[:100])
 				
 				if len(combined_text) > len(best_text):
 					best_text = combined_text
 					best_confidence = avg_confidence
 					
 			except Exception as e:
-				print(f"DEBUG: PSM {psm} failed: {e}")
+				diag.debug("DEBUG: PSM {} failed: {}", psm, e)
 				continue
 		
 		# Also try with different image preprocessing (only if OpenCV is available)
 		if OPENCV_AVAILABLE:
-			print("DEBUG: Trying alternative image preprocessing")
+			diag.debug("DEBUG: Trying alternative image preprocessing")
 			try:
 				# Try with different preprocessing
 				alt_processed = cv2.cvtColor(opencv_image, cv2.COLOR_BGR2GRAY)
@@ -299,35 +308,35 @@ def extract_text_from_image(file_path):
 				
 				alt_text = pytesseract.image_to_string(alt_processed, config='--psm 3')
 				all_texts.append(alt_text)
-				print(f"DEBUG: Alternative preprocessing text: {alt_text[:200]}...")
+				diag.debug("DEBUG: Alternative preprocessing text: {}...", alt_text[:200])
 				
 			except Exception as e:
-				print(f"DEBUG: Alternative preprocessing failed: {e}")
+				diag.debug("DEBUG: Alternative preprocessing failed: {}", e)
 		else:
-			print("DEBUG: Skipping alternative preprocessing (OpenCV not available)")
+			diag.debug("DEBUG: Skipping alternative preprocessing (OpenCV not available)")
 		
 		# Combine all texts and find the most complete one
 		combined_all_text = '\n'.join(all_texts)
-		print(f"DEBUG: Combined all texts length: {len(combined_all_text)}")
+		diag.debug("DEBUG: Combined all texts length: {}", len(combined_all_text))
 		
 		# Use the best structured text or the most complete raw text
 		if len(combined_all_text) > len(best_text):
 			final_text = combined_all_text
-			print("DEBUG: Using combined all texts as it's more complete")
+			diag.debug("DEBUG: Using combined all texts as it's more complete")
 		else:
 			final_text = best_text
-			print("DEBUG: Using best structured text")
+			diag.debug("DEBUG: Using best structured text")
 		
-		print(f"DEBUG: Final OCR text: {final_text[:500]}...")
-		print(f"DEBUG: Tesseract completed with best confidence: {best_confidence:.2f}")
+		diag.debug("DEBUG: Final OCR text: {}...", final_text[:500])
+		diag.debug("DEBUG: Tesseract completed with best confidence: {:.2f}", best_confidence)
 		
 		# Use the final text as the result
 		full_text = final_text.strip()
 		
 		# Calculate average confidence from the best result
 		avg_confidence = best_confidence
-		print(f"DEBUG: Final text length: {len(full_text)}")
-		print(f"DEBUG: Final text preview: {full_text[:200]}...")
+		diag.debug("DEBUG: Final text length: {}", len(full_text))
+		diag.debug("DEBUG: Final text preview: {}...", full_text[:200])
 		
 		result = {
 			'text': full_text,
@@ -336,15 +345,15 @@ def extract_text_from_image(file_path):
 			'confidences': [avg_confidence] * len(full_text.split()),  # Use average confidence for all words
 			'success': True
 		}
-		print(f"DEBUG: Returning OCR result: {result}")
+		diag.debug("DEBUG: Returning OCR result: {}", result)
 		return result
 		
 	except Exception as e:
-		print(f"DEBUG: Exception in extract_text_from_image: {str(e)}")
-		print(f"DEBUG: Exception type: {type(e)}")
+		diag.debug("DEBUG: Exception in extract_text_from_image: {}", str(e))
+		diag.debug("DEBUG: Exception type: {}", type(e))
 		import traceback
-		print(f"DEBUG: Traceback: {traceback.format_exc()}")
-		frappe.log_error(f"OCR Error: {str(e)}", "OCR Utils")
+		diag.debug("DEBUG: Traceback: {}", traceback.format_exc())
+		diag.error("OCR Error: {}", str(e), title="OCR Utils")
 		return {
 			'text': '',
 			'confidence': 0,
@@ -388,7 +397,7 @@ def preprocess_image(image):
 		return processed
 		
 	except Exception as e:
-		frappe.log_error(f"Image preprocessing error: {str(e)}", "OCR Utils")
+		diag.error("Image preprocessing error: {}", str(e), title="OCR Utils")
 		return image
 
 def extract_text_from_attachment(attachment_name):
@@ -401,12 +410,12 @@ def extract_text_from_attachment(attachment_name):
 	Returns:
 		dict: OCR result
 	"""
-	print(f"DEBUG: extract_text_from_attachment called with attachment_name: {attachment_name}")
+	diag.debug("DEBUG: extract_text_from_attachment called with attachment_name: {}", attachment_name)
 	
 	try:
 		# Get file path from Frappe
-		print("DEBUG: Getting file document from Frappe")
-		print(f"DEBUG: Looking for file with name: {attachment_name}")
+		diag.debug("DEBUG: Getting file document from Frappe")
+		diag.debug("DEBUG: Looking for file with name: {}", attachment_name)
 		
 		# Try different ways to find the file
 		file_doc = None
@@ -414,7 +423,7 @@ def extract_text_from_attachment(attachment_name):
 		# Method 1: Direct lookup by name
 		try:
 			file_doc = frappe.get_doc("File", {"name": attachment_name})
-			print(f"DEBUG: File found by name: {file_doc.name}")
+			diag.debug("DEBUG: File found by name: {}", file_doc.name)
 		except:
 			pass
 		
@@ -422,7 +431,7 @@ def extract_text_from_attachment(attachment_name):
 		if not file_doc:
 			try:
 				file_doc = frappe.get_doc("File", {"file_url": attachment_name})
-				print(f"DEBUG: File found by file_url: {file_doc.name}")
+				diag.debug("DEBUG: File found by file_url: {}", file_doc.name)
 			except:
 				pass
 		
@@ -441,12 +450,12 @@ def extract_text_from_attachment(attachment_name):
 				for variant in path_variants:
 					try:
 						file_doc = frappe.get_doc("File", {"file_url": variant})
-						print(f"DEBUG: File found by file_url variant '{variant}': {file_doc.name}")
+						diag.debug("DEBUG: File found by file_url variant '{}': {}", variant, file_doc.name)
 						break
 					except:
 						continue
 			except Exception as e:
-				print(f"DEBUG: Path variant lookup failed: {e}")
+				diag.debug("DEBUG: Path variant lookup failed: {}", e)
 				pass
 		
 		# Method 3: Lookup by attachment name pattern
@@ -455,7 +464,7 @@ def extract_text_from_attachment(attachment_name):
 				# Extract filename from path
 				filename = attachment_name.split('/')[-1]
 				file_doc = frappe.get_doc("File", {"file_name": filename})
-				print(f"DEBUG: File found by filename: {file_doc.name}")
+				diag.debug("DEBUG: File found by filename: {}", file_doc.name)
 			except:
 				pass
 		
@@ -474,12 +483,12 @@ def extract_text_from_attachment(attachment_name):
 				""", (f"%{filename}%", f"%{filename}%"), as_dict=True)
 				
 				if files:
-					print(f"DEBUG: Found similar files: {files}")
+					diag.debug("DEBUG: Found similar files: {}", files)
 					# Use the first match
 					file_doc = frappe.get_doc("File", files[0]['name'])
-					print(f"DEBUG: Using similar file: {file_doc.name}")
+					diag.debug("DEBUG: Using similar file: {}", file_doc.name)
 			except Exception as e:
-				print(f"DEBUG: Similar file search failed: {e}")
+				diag.debug("DEBUG: Similar file search failed: {}", e)
 				pass
 		
 		# Method 5: Try to construct file path directly and check if it exists
@@ -502,7 +511,7 @@ def extract_text_from_attachment(attachment_name):
 				
 				for file_path in possible_paths:
 					if os.path.exists(file_path):
-						print(f"DEBUG: File found at path: {file_path}")
+						diag.debug("DEBUG: File found at path: {}", file_path)
 						# Create a mock file document for this path
 						file_doc = type('FileDoc', (), {
 							'name': filename,
@@ -510,20 +519,20 @@ def extract_text_from_attachment(attachment_name):
 							'file_url': attachment_name,
 							'get_full_path': lambda: file_path
 						})()
-						print(f"DEBUG: Created mock file document for: {file_path}")
+						diag.debug("DEBUG: Created mock file document for: {}", file_path)
 						break
 						
 			except Exception as e:
-				frappe.log_error(f"DEBUG: Direct file path search failed: {e}", "OCR Utils")
+				diag.debug("Direct file path search failed: {}", e)
 				pass		
 		
 		file_path = file_doc.get_full_path()
-		print(f"DEBUG: File path: {file_path}")
+		diag.debug("DEBUG: File path: {}", file_path)
 		
 		# Check if file exists
 		import os
 		if not os.path.exists(file_path):
-			print(f"DEBUG: File does not exist at path: {file_path}")
+			diag.debug("DEBUG: File does not exist at path: {}", file_path)
 			return {
 				'text': '',
 				'confidence': 0,
@@ -533,15 +542,15 @@ def extract_text_from_attachment(attachment_name):
 				'error': f'File not found: {file_path}'
 			}
 		
-		print("DEBUG: File exists, calling extract_text_from_image")
+		diag.debug("DEBUG: File exists, calling extract_text_from_image")
 		# Extract text
 		result = extract_text_from_image(file_path)
-		print(f"DEBUG: extract_text_from_image result: {result}")
+		diag.debug("DEBUG: extract_text_from_image result: {}", result)
 		return result
 		
 	except Exception as e:
-		print(f"DEBUG: Exception in extract_text_from_attachment: {str(e)}")
-		frappe.log_error(f"Attachment OCR Error: {str(e)}", "OCR Utils")
+		diag.debug("DEBUG: Exception in extract_text_from_attachment: {}", str(e))
+		diag.error("Attachment OCR Error: {}", str(e), title="OCR Utils")
 		return {
 			'text': '',
 			'confidence': 0,
@@ -598,23 +607,23 @@ def extract_specific_data_from_ocr(ocr_text):
 	extracted_data = {}
 	
 	try:
-		print(f"DEBUG: Extracting data from OCR text: {ocr_text[:500]}...")
-		print(f"DEBUG: Full OCR text for analysis:")
-		print(f"DEBUG: {ocr_text}")
-		print(f"DEBUG: " + "="*50)
+		diag.debug("DEBUG: Extracting data from OCR text: {}...", ocr_text[:500])
+		diag.debug("DEBUG: Full OCR text for analysis:")
+		diag.debug("DEBUG: {}", ocr_text)
+		diag.debug("DEBUG: {}", '=' * 50)
 		
 		# Debug: Search for any text containing L followed by numbers
 		import re
 		l_patterns = re.findall(r'L\d+', ocr_text, re.IGNORECASE)
-		print(f"DEBUG: Found L patterns: {l_patterns}")
+		diag.debug("DEBUG: Found L patterns: {}", l_patterns)
 		
 		# Debug: Search for any text containing OPITO
 		opito_patterns = re.findall(r'OPITO[A-Za-z0-9]*', ocr_text, re.IGNORECASE)
-		print(f"DEBUG: Found OPITO patterns: {opito_patterns}")
+		diag.debug("DEBUG: Found OPITO patterns: {}", opito_patterns)
 		
 		# Debug: Search for any long alphanumeric strings
 		long_patterns = re.findall(r'[A-Za-z0-9]{10,}', ocr_text)
-		print(f"DEBUG: Found long alphanumeric patterns: {long_patterns}")
+		diag.debug("DEBUG: Found long alphanumeric patterns: {}", long_patterns)
 		
 		# Extract OPITO Learner No (multiple patterns)
 		opito_patterns = [
@@ -642,7 +651,7 @@ def extract_specific_data_from_ocr(ocr_text):
 			opito_match = re.search(pattern, ocr_text, re.IGNORECASE)
 			if opito_match:
 				learner_no = opito_match.group(1)
-				print(f"DEBUG: Pattern matched: {pattern}, Group 1: {learner_no}")
+				diag.debug("DEBUG: Pattern matched: {}, Group 1: {}", pattern, learner_no)
 				
 				# Handle different patterns
 				if pattern.startswith(r'OPITO\s+Learner\s+No\s+(\d+)') or pattern.startswith(r'Learner\s+No\s+(\d+)'):
@@ -653,7 +662,7 @@ def extract_specific_data_from_ocr(ocr_text):
 					learner_no = 'L' + learner_no
 				
 				extracted_data['opito_learner_no'] = learner_no
-				print(f"DEBUG: Found OPITO Learner No: {learner_no}")
+				diag.debug("DEBUG: Found OPITO Learner No: {}", learner_no)
 				break
 		
 		# Extract Unique Certificate No (multiple patterns)
@@ -676,7 +685,7 @@ def extract_specific_data_from_ocr(ocr_text):
 			cert_match = re.search(pattern, ocr_text, re.IGNORECASE)
 			if cert_match:
 				cert_no = cert_match.group(1)
-				print(f"DEBUG: Certificate pattern matched: {pattern}, Group 1: {cert_no}")
+				diag.debug("DEBUG: Certificate pattern matched: {}, Group 1: {}", pattern, cert_no)
 				
 				# Clean the certificate number (remove spaces)
 				cert_no = cert_no.replace(' ', '')
@@ -692,7 +701,7 @@ def extract_specific_data_from_ocr(ocr_text):
 					cert_no = 'OPITO' + cert_no
 				
 				extracted_data['unique_certificate_no'] = cert_no
-				print(f"DEBUG: Found Unique Certificate No: {cert_no}")
+				diag.debug("DEBUG: Found Unique Certificate No: {}", cert_no)
 				break
 		
 		# Extract Expiry Date (multiple patterns)
@@ -722,16 +731,16 @@ def extract_specific_data_from_ocr(ocr_text):
 				# Format as yyyy-mm-dd for MySQL compatibility
 				formatted_date = f"{year}-{month_num}-{day.zfill(2)}"
 				extracted_data['expiry_date'] = formatted_date
-				print(f"DEBUG: Found Expiry Date: {formatted_date}")
+				diag.debug("DEBUG: Found Expiry Date: {}", formatted_date)
 				break
 		
-		print(f"DEBUG: Final extracted data: {extracted_data}")
+		diag.debug("DEBUG: Final extracted data: {}", extracted_data)
 		return extracted_data
 		
 	except Exception as e:
-		print(f"DEBUG: Error extracting specific data: {e}")
+		diag.debug("DEBUG: Error extracting specific data: {}", e)
 		import traceback
-		print(f"DEBUG: Traceback: {traceback.format_exc()}")
+		diag.debug("DEBUG: Traceback: {}", traceback.format_exc())
 		return {}
 
 @frappe.whitelist()
@@ -739,12 +748,12 @@ def debug_files():
 	"""Debug function to list all files in the database"""
 	try:
 		files = frappe.db.sql("SELECT name, file_name, file_url FROM `tabFile` ORDER BY creation DESC LIMIT 10", as_dict=True)
-		print("DEBUG: Recent files in database:")
+		diag.debug("DEBUG: Recent files in database:")
 		for file in files:
-			print(f"  - Name: {file.name}, File Name: {file.file_name}, URL: {file.file_url}")
+			diag.debug("  - Name: {}, File Name: {}, URL: {}", file.name, file.file_name, file.file_url)
 		return files
 	except Exception as e:
-		print(f"DEBUG: Error listing files: {e}")
+		diag.debug("DEBUG: Error listing files: {}", e)
 		return []
 
 @frappe.whitelist()
@@ -760,7 +769,12 @@ def process_certificate_ocr(doctype, docname, field_name):
 	Returns:
 		dict: Processing result
 	"""
-	print(f"DEBUG: process_certificate_ocr called with doctype={doctype}, docname={docname}, field_name={field_name}")
+	diag.debug(
+		"DEBUG: process_certificate_ocr called with doctype={}, docname={}, field_name={}",
+		doctype,
+		docname,
+		field_name,
+	)
 
 	# Customers / read-only users must not mutate Assessment Result via OCR
 	frappe.has_permission(doctype, "write", doc=docname, throw=True)
@@ -771,26 +785,26 @@ def process_certificate_ocr(doctype, docname, field_name):
 	try:
 		# Get the document
 		doc = frappe.get_doc(doctype, docname)
-		print(f"DEBUG: Document retrieved: {doc.name}")
+		diag.debug("DEBUG: Document retrieved: {}", doc.name)
 		
 		# Get the attachment name from the field
 		attachment_name = getattr(doc, field_name, None)
-		print(f"DEBUG: Attachment name from field '{field_name}': {attachment_name}")
+		diag.debug("DEBUG: Attachment name from field '{}': {}", field_name, attachment_name)
 		
 		if not attachment_name:
-			print("DEBUG: No attachment name found")
+			diag.debug("DEBUG: No attachment name found")
 			return {
 				'success': False,
 				'message': 'No certificate image found'
 			}
 		
 		# Extract text using OCR
-		print(f"DEBUG: Calling extract_text_from_attachment with attachment_name: {attachment_name}")
+		diag.debug("DEBUG: Calling extract_text_from_attachment with attachment_name: {}", attachment_name)
 		ocr_result = extract_text_from_attachment(attachment_name)
-		print(f"DEBUG: OCR result: {ocr_result}")
+		diag.debug("DEBUG: OCR result: {}", ocr_result)
 		
 		if not ocr_result.get('success', False):
-			print(f"DEBUG: OCR failed: {ocr_result.get('error', 'Unknown error')}")
+			diag.debug("DEBUG: OCR failed: {}", ocr_result.get('error', 'Unknown error'))
 			return {
 				'success': False,
 				'message': f"OCR failed: {ocr_result.get('error', 'Unknown error')}"
@@ -798,10 +812,10 @@ def process_certificate_ocr(doctype, docname, field_name):
 		
 		# Format the result
 		formatted_text = format_ocr_result_for_display(ocr_result)
-		print(f"DEBUG: Formatted text length: {len(formatted_text)}")
+		diag.debug("DEBUG: Formatted text length: {}", len(formatted_text))
 		
 		# Add comment to the document
-		print("DEBUG: Adding comment to document")
+		diag.debug("DEBUG: Adding comment to document")
 		comment = frappe.get_doc({
 			'doctype': 'Comment',
 			'reference_doctype': doctype,
@@ -811,36 +825,39 @@ def process_certificate_ocr(doctype, docname, field_name):
 			'comment_by': frappe.session.user
 		})
 		comment.insert(ignore_permissions=True)
-		print("DEBUG: Comment added successfully")
+		diag.debug("DEBUG: Comment added successfully")
 		
 		# Update document with OCR data (if needed)
 		# You can add custom fields to store OCR data
 		if hasattr(doc, 'ocr_extracted_text'):
-			print("DEBUG: Updating document with OCR data")
+			diag.debug("DEBUG: Updating document with OCR data")
 			doc.ocr_extracted_text = ocr_result.get('text', '')
 			doc.ocr_confidence = ocr_result.get('confidence', 0)
 			
 			# Extract specific information from OCR text
 			extracted_data = extract_specific_data_from_ocr(ocr_result.get('text', ''))
-			print(f"DEBUG: Extracted specific data: {extracted_data}")
+			diag.debug("DEBUG: Extracted specific data: {}", extracted_data)
 			
 			# Update custom fields with extracted data
 			if extracted_data.get('opito_learner_no'):
 				doc.custom_opito_learner_no = extracted_data['opito_learner_no']
-				print(f"DEBUG: Set custom_opito_learner_no: {extracted_data['opito_learner_no']}")
+				diag.debug("DEBUG: Set custom_opito_learner_no: {}", extracted_data['opito_learner_no'])
 			
 			if extracted_data.get('unique_certificate_no'):
 				doc.custom_unique_certificate_no = extracted_data['unique_certificate_no']
-				print(f"DEBUG: Set custom_unique_certificate_no: {extracted_data['unique_certificate_no']}")
+				diag.debug(
+					"DEBUG: Set custom_unique_certificate_no: {}",
+					extracted_data['unique_certificate_no'],
+				)
 			
 			if extracted_data.get('expiry_date'):
 				doc.certificate_validity_date = extracted_data['expiry_date']
-				print(f"DEBUG: Set certificate_validity_date: {extracted_data['expiry_date']}")
+				diag.debug("DEBUG: Set certificate_validity_date: {}", extracted_data['expiry_date'])
 			
 			doc.save()
-			print("DEBUG: Document updated with OCR data and extracted fields")
+			diag.debug("DEBUG: Document updated with OCR data and extracted fields")
 		else:
-			print("DEBUG: Document does not have ocr_extracted_text field")
+			diag.debug("DEBUG: Document does not have ocr_extracted_text field")
 		
 		result = {
 			'success': True,
@@ -850,11 +867,11 @@ def process_certificate_ocr(doctype, docname, field_name):
 			'comment_added': True,
 			'extracted_data': extracted_data
 		}
-		print(f"DEBUG: Returning result: {result}")
+		diag.debug("DEBUG: Returning result: {}", result)
 		return result
 		
 	except Exception as e:
-		frappe.log_error(f"Certificate OCR processing error: {str(e)}", "OCR Utils")
+		diag.error("Certificate OCR processing error: {}", str(e), title="OCR Utils")
 		return {
 			'success': False,
 			'message': f"Error processing OCR: {str(e)}"
@@ -0,0 +1,79 @@
+import time
+from contextlib import contextmanager
+
+import frappe
+
+
+class QueryProfile:
+	"""SQL statements, rows returned and time spent inside a `profile_queries` block."""
+
+	__slots__ = ("queries", "rows", "query_time", "duration", "statements")
+
+	def __init__(self):
+		self.queries = 0
+		self.rows = 0
+		self.query_time = 0.0
+		self.duration = 0.0
+		self.statements = []
+
+	def as_dict(self):
+		return {
+			"queries": self.queries,
+			"rows": self.rows,
+			"query_time_ms": round(self.query_time * 1000, 3),
+			"duration_ms": round(self.duration * 1000, 3),
+		}
+
+
+@contextmanager
+def profile_queries(capture_sql=False):
+	"""Count every `frappe.db.sql` call made by the current connection.
+
+	`get_value`, `get_all`, `get_doc` and friends all go through `db.sql`, so
+	wrapping it on the connection instance sees the whole request.
+	"""
+	db = frappe.db
+	had_override = "sql" in vars(db)
+	original = db.sql
+	profile = QueryProfile()
+
+	def sql(query, *args, **kwargs):
+		start = time.perf_counter()
+		try:
+			return_value = original(query, *args, **kwargs)
+		finally:
+			profile.queries += 1
+			profile.query_time += time.perf_counter() - start
+		if isinstance(return_value, (list, tuple)):
+			profile.rows += len(return_value)
+		if capture_sql:
+			profile.statements.append(str(query).strip())
+		return return_value
+
+	db.sql = sql
+	start = time.perf_counter()
+	try:
+		yield profile
+	finally:
+		profile.duration = time.perf_counter() - start
+		if had_override:
+			db.sql = original
+		else:
+			del db.sql
+
+
+def get_row_lock_stats():
+	"""InnoDB row lock counters (`Innodb_row_lock_waits`, `..._time` in ms, ...)."""
+	try:
+		rows = frappe.db.sql("SHOW GLOBAL STATUS LIKE 'Innodb_row_lock%%'")
+	except Exception:
+		return {}
+	return {name: frappe.utils.flt(value) for name, value in rows}
+
+
+def diff_row_lock_stats(before, after):
+	return {
+		name: after.get(name, 0) - before.get(name, 0)
+		for name in after
+		if name in ("Innodb_row_lock_waits", "Innodb_row_lock_time")
+	}
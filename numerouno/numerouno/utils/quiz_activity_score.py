@@ -0,0 +1,258 @@
+"""Materialized score fields on Quiz Activity.
+
+Correct count, expected total, percentage and completeness are computed from
+the activity's Quiz Result rows when those rows are written, and stored on
+the activity itself (`custom_correct_count`, `custom_expected_total`,
+`custom_score_percentage`, `custom_is_complete`, plus `score`/`status` for
+graded attempts). Draft autosaves store the counters they already know
+(`draft_score_fields`); grading materializes the full set. Readers such as
+the instructor portal use the stored values and never scan Quiz Result. Saving a Quiz with a new passing score or question
+set re-materializes that quiz's activities in the background.
+"""
+
+import frappe
+from frappe.utils import cint, flt, get_datetime
+
+from numerouno.numerouno.utils.quiz_cache import get_quiz_question_snapshot
+
+BACKFILL_CHUNK_SIZE = 500
+# Quiz edits made while a re-materialize runs are picked up by re-running, but
+# never more than this many times in one job.
+REMATERIALIZE_MAX_PASSES = 3
+SCORE_FIELDS = ("custom_correct_count", "custom_expected_total", "custom_score_percentage", "custom_is_complete")
+
+
+def get_quiz_question_link_map(quiz_names):
+	"""Map quiz -> {question_name: question_creation}, read from cached question-set snapshots."""
+	return {quiz: get_quiz_question_snapshot(quiz) for quiz in quiz_names or () if quiz}
+
+
+def _get_passing_scores(quiz_names):
+	if not quiz_names:
+		return {}
+	rows = frappe.get_all("Quiz", filters={"name": ["in", list(quiz_names)]}, fields=["name", "passing_score"])
+	return {row.name: flt(row.passing_score) or 75 for row in rows}
+
+
+def _expected_questions(question_map, taken_on):
+	# Ignore questions that were added to the bank after this attempt was taken.
+	if taken_on and question_map:
+		return {
+			question
+			for question, created_on in question_map.items()
+			if not created_on or created_on <= taken_on
+		}
+	return set(question_map)
+
+
+def compute_activity_scores(activities, result_rows=None):
+	"""Score summary per activity from its Quiz Result rows (one IN query for the batch).
+
+	`activities` need `name`, `quiz`, `status`, `creation`/`activity_date` and
+	`custom_section_results`. Pass `result_rows` (with `parent`, `question`
+	and `quiz_result`) to score rows that are not in the database. Returns
+	`{name: {"correct", "answered", "expected_total", "percentage",
+	"is_complete", "score", "status"}}`.
+	"""
+	activity_names = [row.name for row in activities if row.name]
+	if not activity_names:
+		return {}
+
+	if result_rows is None:
+		result_rows = frappe.get_all(
+			"Quiz Result",
+			filters={"parent": ["in", activity_names], "parenttype": "Quiz Activity"},
+			fields=["parent", "quiz_result", "question"],
+			ignore_permissions=True,
+		)
+	answered = {name: set() for name in activity_names}
+	correct = {name: set() for name in activity_names}
+	for row in result_rows:
+		if not row.question or row.parent not in answered:
+			continue
+		answered[row.parent].add(row.question)
+		if (row.quiz_result or "").strip().lower() == "correct":
+			correct[row.parent].add(row.question)
+
+	quiz_names = {row.quiz for row in activities if row.quiz}
+	question_maps = get_quiz_question_link_map(quiz_names)
+	passing_scores = _get_passing_scores(quiz_names)
+
+	summary = {}
+	for activity in activities:
+		if not activity.name:
+			continue
+		taken_on = activity.get("creation") or activity.get("activity_date")
+		try:
+			taken_on = get_datetime(taken_on) if taken_on else None
+		except Exception:
+			taken_on = None
+
+		# Always include answered questions so historical scores stay stable.
+		expected = _expected_questions(question_maps.get(activity.quiz) or {}, taken_on) | answered[activity.name]
+		answered_count = len(answered[activity.name])
+		expected_total = len(expected) or answered_count
+		correct_count = len(correct[activity.name])
+		percentage = (correct_count / expected_total * 100) if expected_total else 0
+
+		# Drafts keep their progress score and empty status until they are graded.
+		graded = activity.status in ("Pass", "Fail") and answered_count
+		score, status = activity.score, activity.status
+		if graded:
+			score = f"{correct_count}/{expected_total}"
+			if not activity.get("custom_section_results"):
+				# Unanswered questions already reduce percentage via expected_total.
+				# Do not force Fail just because newer questions were added later.
+				status = "Pass" if percentage >= passing_scores.get(activity.quiz, 75) else "Fail"
+
+		summary[activity.name] = {
+			"correct": correct_count,
+			"answered": answered_count,
+			"expected_total": expected_total,
+			"percentage": percentage,
+			"is_complete": answered_count >= expected_total if expected_total else False,
+			"score": score,
+			"status": status,
+		}
+	return summary
+
+
+def draft_score_fields(correct_count, answered_count, expected_total):
+	"""Score fields of an ungraded draft from counts its autosave already has, without re-reading rows."""
+	expected_total = expected_total or answered_count
+	return {
+		"custom_correct_count": correct_count,
+		"custom_expected_total": expected_total,
+		"custom_score_percentage": round(correct_count / expected_total * 100, 3) if expected_total else 0,
+		"custom_is_complete": cint(answered_count >= expected_total) if expected_total else 0,
+	}
+
+
+def materialize_activity_scores(activity_names):
+	"""Recompute and store the score fields of these activities; writes only what changed."""
+	activity_names = [name for name in dict.fromkeys(activity_names or []) if name]
+	if not activity_names:
+		return 0
+
+	activities = frappe.get_all(
+		"Quiz Activity",
+		filters={"name": ["in", activity_names]},
+		fields=[
+			"name",
+			"quiz",
+			"score",
+			"status",
+			"creation",
+			"activity_date",
+			"custom_section_results",
+			*SCORE_FIELDS,
+		],
+		ignore_permissions=True,
+	)
+	summary = compute_activity_scores(activities)
+
+	written = 0
+	for activity in activities:
+		data = summary.get(activity.name)
+		if not data:
+			continue
+		values = {
+			"custom_correct_count": data["correct"],
+			"custom_expected_total": data["expected_total"],
+			"custom_score_percentage": round(data["percentage"], 3),
+			"custom_is_complete": cint(data["is_complete"]),
+			"score": data["score"],
+			"status": data["status"],
+		}
+		changed = {}
+		for field, value in values.items():
+			current = activity.get(field)
+			if field == "custom_score_percentage":
+				current = round(flt(current), 3)
+			if current != value:
+				changed[field] = value
+		if changed:
+			frappe.db.set_value("Quiz Activity", activity.name, changed, update_modified=False)
+			written += 1
+	return written
+
+
+def on_quiz_activity_update(doc, method=None):
+	materialize_activity_scores([doc.name])
+
+
+def _materialize_in_chunks(filters, chunk_size):
+	after = ""
+	written = 0
+	while True:
+		names = frappe.get_all(
+			"Quiz Activity",
+			filters={**filters, "name": [">", after]},
+			pluck="name",
+			order_by="name asc",
+			limit_page_length=chunk_size,
+			ignore_permissions=True,
+		)
+		if not names:
+			break
+		written += materialize_activity_scores(names)
+		frappe.db.commit()
+		after = names[-1]
+	return written
+
+
+def backfill_activity_scores(chunk_size=BACKFILL_CHUNK_SIZE):
+	"""Materialize score fields for every Quiz Activity, committing per chunk."""
+	return _materialize_in_chunks({}, chunk_size)
+
+
+def _quiz_score_signature(doc):
+	return (
+		flt(doc.passing_score) or 75,
+		tuple(sorted({row.question_link for row in doc.question or [] if row.question_link})),
+	)
+
+
+def _current_quiz_score_signature(quiz_name):
+	if not frappe.db.exists("Quiz", quiz_name):
+		return None
+	return _quiz_score_signature(frappe.get_doc("Quiz", quiz_name))
+
+
+def rematerialize_quiz_activity_scores(quiz_name, chunk_size=BACKFILL_CHUNK_SIZE):
+	"""Recompute the stored scores of one quiz's activities, committing per chunk.
+
+	The job is deduplicated on the quiz, so a second edit saved while it runs is
+	picked up by re-reading the passing score and question set afterwards and
+	repeating the pass when they moved.
+	"""
+	signature = _current_quiz_score_signature(quiz_name)
+	written = 0
+	for _pass in range(REMATERIALIZE_MAX_PASSES):
+		written += _materialize_in_chunks({"quiz": quiz_name}, chunk_size)
+		# end the read snapshot so the latest saved quiz is visible
+		frappe.db.commit()
+		current = _current_quiz_score_signature(quiz_name)
+		if current is None or current == signature:
+			break
+		signature = current
+	return written
+
+
+def enqueue_quiz_rematerialize(quiz_name):
+	frappe.enqueue(
+		"numerouno.numerouno.utils.quiz_activity_score.rematerialize_quiz_activity_scores",
+		queue="long",
+		timeout=3600,
+		job_id=f"quiz_rematerialize::{quiz_name}",
+		deduplicate=True,
+		enqueue_after_commit=True,
+		quiz_name=quiz_name,
+	)
+
+
+def on_quiz_update(doc, method=None):
+	"""Stored expected totals and statuses depend on the passing score and question set."""
+	before = doc.get_doc_before_save()
+	if before and _quiz_score_signature(before) != _quiz_score_signature(doc):
+		enqueue_quiz_rematerialize(doc.name)
@@ -0,0 +1,270 @@
+"""Buffered, append-only store for public quiz audit events.
+
+`record_event` pushes an event onto a Redis list and returns; nothing touches
+disk on the request path. `flush_quiz_audit_buffer` (cron, or enqueued once
+the buffer fills) drains it in batches. Each batch becomes one gzip member
+appended to the current segment under `<site>/private/quiz_audit/`, and one
+Quiz Audit Index row per (attempt, student, quiz) points at that member.
+Segments rotate daily or at `quiz_audit_segment_mb`.
+
+Reading a timeline only opens the members its index rows name, so one
+attempt costs an indexed query plus a few small decompressions.
+"""
+
+import gzip
+import json
+import os
+
+import frappe
+from frappe.utils import cint, now, now_datetime
+
+from numerouno.numerouno.utils.diagnostics import get_diagnostics
+
+BUFFER_KEY = "quiz_audit:buffer"
+FLUSH_LOCK_KEY = "quiz_audit:flush_lock"
+FLUSH_LOCK_TTL = 120
+FLUSH_BATCH_SIZE = 1000
+DEFAULT_SEGMENT_MB = 64
+TIMELINE_LIMIT = 2000
+
+# The flush lock holds a per-run token; these only act while it still matches.
+_EXTEND_LOCK = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_TRIM_IF_LOCKED = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('LTRIM', KEYS[2], ARGV[2], -1)
+    return 1
+end
+return 0
+"""
+_RELEASE_LOCK = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+diag = get_diagnostics("quiz")
+
+
+def _audit_dir():
+	path = frappe.get_site_path("private", "quiz_audit")
+	os.makedirs(path, exist_ok=True)
+	return path
+
+
+def _segment_max_bytes():
+	return max(cint(frappe.conf.get("quiz_audit_segment_mb") or DEFAULT_SEGMENT_MB), 1) * 1024 * 1024
+
+
+def record_event(payload):
+	"""Buffer one audit event; falls back to the site log if Redis is unavailable."""
+	payload.setdefault("event_id", frappe.generate_hash(length=16))
+	line = json.dumps(payload, default=str, separators=(",", ":"))
+	try:
+		cache = frappe.cache()
+		cache.rpush(BUFFER_KEY, line)
+		if cache.llen(BUFFER_KEY) >= FLUSH_BATCH_SIZE:
+			frappe.enqueue(
+				"numerouno.numerouno.utils.quiz_audit.flush_quiz_audit_buffer",
+				queue="short",
+				job_id="quiz_audit_flush",
+				deduplicate=True,
+			)
+	except Exception:
+		frappe.logger("public_quiz_audit", allow_site=True).info(line)
+	return payload
+
+
+def _current_segment(incoming_bytes):
+	"""Today's newest segment, or a new one once it would pass the size limit."""
+	directory = _audit_dir()
+	day = now_datetime().strftime("%Y%m%d")
+	prefix = f"quiz_audit-{day}."
+	existing = sorted(name for name in os.listdir(directory) if name.startswith(prefix) and name.endswith(".jsonl.gz"))
+	if existing:
+		latest = existing[-1]
+		if os.path.getsize(os.path.join(directory, latest)) + incoming_bytes <= _segment_max_bytes():
+			return latest
+		sequence = int(latest[len(prefix) :].split(".")[0]) + 1
+	else:
+		sequence = 1
+	return f"{prefix}{sequence:03d}.jsonl.gz"
+
+
+def _append_member(lines):
+	"""Append one gzip member holding `lines`; returns `(segment, offset, length)`."""
+	member = gzip.compress(("\n".join(lines) + "\n").encode())
+	segment = _current_segment(len(member))
+	with open(os.path.join(_audit_dir(), segment), "ab") as f:
+		offset = f.tell()
+		f.write(member)
+		f.flush()
+		os.fsync(f.fileno())
+	return segment, offset, len(member)
+
+
+def _index_rows(events, segment, offset, length):
+	groups = {}
+	for event in events:
+		key = (event.get("attempt_id") or "", event.get("student") or "", event.get("quiz_name") or "")
+		groups.setdefault(key, []).append(event.get("timestamp") or "")
+
+	timestamp = now()
+	user = frappe.session.user
+	return [
+		(
+			frappe.generate_hash(length=12),
+			attempt_id or None,
+			student or None,
+			quiz_name or None,
+			segment,
+			offset,
+			length,
+			len(timestamps),
+			min(timestamps) or None,
+			max(timestamps) or None,
+			timestamp,
+			timestamp,
+			user,
+			user,
+		)
+		for (attempt_id, student, quiz_name), timestamps in groups.items()
+	]
+
+
+def flush_quiz_audit_buffer(max_batches=50):
+	"""Drain buffered events into the segment store and index. Runs as a single writer.
+
+	The lock's TTL is renewed before every batch, and a batch is trimmed from
+	the buffer only while this run still holds the lock. A run that lost it
+	stops, so a second flusher never trims events it did not write.
+	"""
+	cache = frappe.cache()
+	lock_key = cache.make_key(FLUSH_LOCK_KEY)
+	token = frappe.generate_hash(length=16)
+	if not cache.set(lock_key, token, nx=True, ex=FLUSH_LOCK_TTL):
+		return {"flushed": 0, "skipped": "locked"}
+
+	flushed = 0
+	try:
+		for _batch in range(max_batches):
+			if not cache.eval(_EXTEND_LOCK, 1, lock_key, token, FLUSH_LOCK_TTL):
+				diag.warning("Quiz audit flush lost its lock after {} events", flushed)
+				break
+			raw_lines = cache.lrange(BUFFER_KEY, 0, FLUSH_BATCH_SIZE - 1) or []
+			if not raw_lines:
+				break
+			lines = [raw.decode() if isinstance(raw, bytes) else raw for raw in raw_lines]
+			events = []
+			for line in lines:
+				try:
+					events.append(json.loads(line))
+				except ValueError:
+					events.append({})
+
+			segment, offset, length = _append_member(lines)
+			frappe.db.bulk_insert(
+				"Quiz Audit Index",
+				[
+					"name",
+					"attempt_id",
+					"student",
+					"quiz_name",
+					"segment",
+					"member_offset",
+					"member_length",
+					"event_count",
+					"first_event_at",
+					"last_event_at",
+					"creation",
+					"modified",
+					"owner",
+					"modified_by",
+				],
+				_index_rows(events, segment, offset, length),
+			)
+			frappe.db.commit()
+			# Only the lock holder removes from the head; producers append at the tail.
+			if not cache.eval(_TRIM_IF_LOCKED, 2, lock_key, cache.make_key(BUFFER_KEY), token, len(raw_lines)):
+				# Written but left in the buffer: the next flush repeats them rather than losing any.
+				diag.warning("Quiz audit flush lost its lock before trimming {} events", len(raw_lines))
+				break
+			flushed += len(raw_lines)
+	except Exception:
+		frappe.db.rollback()
+		diag.error("Quiz audit flush failed after {} events", flushed, title="Quiz Audit Flush")
+	finally:
+		cache.eval(_RELEASE_LOCK, 1, lock_key, token)
+	return {"flushed": flushed}
+
+
+def _read_member(segment, offset, length):
+	path = os.path.join(_audit_dir(), os.path.basename(segment))
+	with open(path, "rb") as f:
+		f.seek(offset)
+		data = f.read(length)
+	for line in gzip.decompress(data).decode().splitlines():
+		if line:
+			yield json.loads(line)
+
+
+def _matches(event, attempt_id, student, quiz_name):
+	return (
+		(not attempt_id or event.get("attempt_id") == attempt_id)
+		and (not student or event.get("student") == student)
+		and (not quiz_name or event.get("quiz_name") == quiz_name)
+	)
+
+
+def get_timeline(attempt_id=None, student=None, quiz_name=None, limit=TIMELINE_LIMIT):
+	"""Ordered audit events for an attempt (or a student / quiz), including unflushed ones."""
+	filters = {
+		key: value
+		for key, value in (("attempt_id", attempt_id), ("student", student), ("quiz_name", quiz_name))
+		if value
+	}
+	members = frappe.get_all(
+		"Quiz Audit Index",
+		filters=filters,
+		fields=["segment", "member_offset", "member_length"],
+		order_by="segment asc, member_offset asc",
+		limit_page_length=limit,
+	)
+
+	events = {}
+	for member in {(m.segment, m.member_offset): m for m in members}.values():
+		try:
+			for event in _read_member(member.segment, member.member_offset, member.member_length):
+				if _matches(event, attempt_id, student, quiz_name):
+					events[event.get("event_id") or len(events)] = event
+		except (OSError, ValueError, EOFError):
+			diag.warning("Unreadable quiz audit member {}@{}", member.segment, member.member_offset)
+
+	for raw in frappe.cache().lrange(BUFFER_KEY, 0, -1) or []:
+		try:
+			event = json.loads(raw)
+		except ValueError:
+			continue
+		if _matches(event, attempt_id, student, quiz_name):
+			# A crash between append and trim can leave an event in both places.
+			events.setdefault(event.get("event_id") or len(events), event)
+
+	timeline = sorted(events.values(), key=lambda event: event.get("timestamp") or "")
+	return timeline[: cint(limit) or TIMELINE_LIMIT]
+
+
+@frappe.whitelist()
+def get_quiz_audit_timeline(attempt_id=None, student=None, quiz_name=None, limit=TIMELINE_LIMIT):
+	"""Whitelisted timeline lookup; at least one of attempt_id / student / quiz_name is required."""
+	frappe.only_for("System Manager")
+	if not (attempt_id or student or quiz_name):
+		frappe.throw(frappe._("Pass an attempt ID, student or quiz"))
+
+	limit = min(max(cint(limit) or TIMELINE_LIMIT, 1), TIMELINE_LIMIT)
+	events = get_timeline(attempt_id, student, quiz_name, limit)
+	return {"status": "success", "count": len(events), "events": events}
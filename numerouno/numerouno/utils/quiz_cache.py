@@ -0,0 +1,152 @@
+import frappe
+
+QUIZ_VERSION_TTL = 60 * 60
+QUIZ_PAYLOAD_TTL = 60 * 60 * 6
+
+
+def _version_key(quiz_name):
+	return f"quiz_cache_version:{quiz_name}"
+
+
+def _payload_key(namespace, quiz_name, version, suffix=None):
+	key = f"quiz_cache:{namespace}:{quiz_name}:{version}"
+	if suffix:
+		key = f"{key}:{suffix}"
+	return key
+
+
+def _compute_quiz_version(quiz_name):
+	"""Version stamp = latest `modified` of the Quiz and every linked Question."""
+	row = frappe.db.sql(
+		"""
+		SELECT q.modified AS quiz_modified, MAX(qs.modified) AS question_modified
+		FROM `tabQuiz` q
+		LEFT JOIN `tabQuiz Question` qq
+			ON qq.parent = q.name AND qq.parenttype = 'Quiz'
+		LEFT JOIN `tabQuestion` qs ON qs.name = qq.question_link
+		WHERE q.name = %s
+		GROUP BY q.name, q.modified
+		""",
+		(quiz_name,),
+		as_dict=True,
+	)
+	if not row:
+		return None
+
+	stamps = [value for value in (row[0].quiz_modified, row[0].question_modified) if value]
+	return str(max(stamps)).replace(" ", "T") if stamps else None
+
+
+def get_quiz_version(quiz_name):
+	"""Return the cached version stamp for a quiz, computing it on first use."""
+	if not quiz_name:
+		return None
+
+	cache = frappe.cache()
+	version = cache.get_value(_version_key(quiz_name))
+	if version:
+		return version.decode() if isinstance(version, bytes) else version
+
+	version = _compute_quiz_version(quiz_name)
+	if version:
+		cache.set_value(_version_key(quiz_name), version, expires_in_sec=QUIZ_VERSION_TTL)
+	return version
+
+
+def get_versioned_quiz_value(namespace, quiz_name, builder, suffix=None, ttl=QUIZ_PAYLOAD_TTL):
+	"""Return `builder(quiz_name)` cached under the quiz's current version stamp.
+
+	A warm read is two Redis lookups (version pointer + payload) and no DB queries.
+	The builder may return a `(value, ttl)` tuple to shorten the cache lifetime.
+	"""
+	version = get_quiz_version(quiz_name)
+	if not version:
+		raise frappe.DoesNotExistError(f"Quiz {quiz_name} not found")
+
+	cache = frappe.cache()
+	key = _payload_key(namespace, quiz_name, version, suffix)
+	cached = cache.get_value(key)
+	if cached is not None:
+		return cached
+
+	value = builder(quiz_name)
+	if isinstance(value, tuple):
+		value, ttl = value
+	if ttl:
+		cache.set_value(key, value, expires_in_sec=ttl)
+	return value
+
+
+def _build_question_snapshot(quiz_name):
+	"""{question: creation} for every Question the quiz links, in one query.
+
+	Rows without `question_link` fall back to the legacy `question` value when
+	it names an existing Question.
+	"""
+	rows = frappe.db.sql(
+		"""
+		SELECT qq.question_link, linked.creation AS linked_creation,
+			legacy.name AS legacy_name, legacy.creation AS legacy_creation
+		FROM `tabQuiz Question` qq
+		LEFT JOIN `tabQuestion` linked ON linked.name = qq.question_link
+		LEFT JOIN `tabQuestion` legacy
+			ON IFNULL(qq.question_link, '') = '' AND legacy.name = TRIM(qq.question)
+		WHERE qq.parent = %s AND qq.parenttype = 'Quiz'
+		""",
+		(quiz_name,),
+		as_dict=True,
+	)
+	snapshot = {}
+	for row in rows:
+		question = (row.question_link or "").strip()
+		created = row.linked_creation
+		if not question:
+			question, created = row.legacy_name, row.legacy_creation
+		if question:
+			snapshot[question] = created
+	return snapshot
+
+
+def get_quiz_question_snapshot(quiz_name):
+	"""Cached question-set snapshot of a quiz; a new quiz/question version builds a new one.
+
+	Callers share the cached dict and must not modify it.
+	"""
+	try:
+		return get_versioned_quiz_value("question_set", quiz_name, _build_question_snapshot)
+	except frappe.DoesNotExistError:
+		return {}
+
+
+def invalidate_quiz_cache(quiz_name):
+	"""Drop the version pointer so the next read recomputes it from `modified`."""
+	if not quiz_name:
+		return
+
+	key = _version_key(quiz_name)
+	frappe.cache().delete_value(key)
+
+	# Readers may have re-cached the old stamp before this transaction committed.
+	after_commit = getattr(frappe.db, "after_commit", None)
+	if after_commit is not None:
+		after_commit.add(lambda: frappe.cache().delete_value(key))
+
+
+def get_quizzes_for_question(question_name):
+	if not question_name:
+		return []
+	return frappe.get_all(
+		"Quiz Question",
+		filters={"question_link": question_name, "parenttype": "Quiz"},
+		pluck="parent",
+		distinct=True,
+	)
+
+
+def on_quiz_update(doc, method=None):
+	invalidate_quiz_cache(doc.name)
+
+
+def on_question_update(doc, method=None):
+	for quiz_name in get_quizzes_for_question(doc.name):
+		invalidate_quiz_cache(quiz_name)
@@ -0,0 +1,153 @@
+import frappe
+
+from numerouno.numerouno.utils.http_cache import bump_version_stamp
+
+QUIZ_CATALOG_TTL = 60 * 60 * 6
+
+
+def _catalog_key(student_group):
+	return f"quiz_catalog:v2:{student_group}"
+
+
+def _build_group_quiz_catalog(student_group):
+	"""Every quiz assigned to a group, with its settings and counts, in one query.
+
+	Assignments are matched on `student_group` and on name (autoname is
+	`format:{student_group}`), newest first. Rows whose quiz is unset or
+	missing are kept so callers can tell "no assignment" from "no quiz".
+	"""
+	rows = frappe.db.sql(
+		"""
+		SELECT
+			ma.name AS assignment,
+			ma.mcqs AS quiz,
+			ma.assignment_flow,
+			q.name AS quiz_exists,
+			q.title,
+			q.passing_score,
+			q.max_attempts,
+			(
+				SELECT COUNT(*) FROM `tabQuiz Question` qq
+				WHERE qq.parent = q.name AND qq.parenttype = 'Quiz'
+			) AS question_count,
+			qsp.name AS quiz_section_profile,
+			(
+				SELECT COUNT(*) FROM `tabQuiz Section Item` qsi
+				WHERE qsi.parent = qsp.name AND qsi.parenttype = 'Quiz Section Profile'
+			) AS section_count
+		FROM `tabMCQS Assignment` ma
+		LEFT JOIN `tabQuiz` q ON q.name = ma.mcqs
+		LEFT JOIN `tabQuiz Section Profile` qsp
+			ON qsp.name = COALESCE(NULLIF(ma.quiz_section_profile, ''), ma.mcqs)
+		WHERE ma.student_group = %(student_group)s OR ma.name = %(student_group)s
+		ORDER BY ma.modified DESC
+		""",
+		{"student_group": student_group},
+		as_dict=True,
+	)
+
+	quizzes = []
+	seen = set()
+	for row in rows:
+		if not row.quiz_exists or row.quiz in seen:
+			continue
+		seen.add(row.quiz)
+		quizzes.append(_catalog_entry(row))
+
+	# Filter on the flow before deduplicating, so a newer Direct assignment of
+	# the same quiz does not hide its section-wise one.
+	section_quizzes = []
+	seen = set()
+	for row in rows:
+		if row.assignment_flow != "Section Wise MCQs" or not row.quiz_exists or not row.quiz_section_profile:
+			continue
+		if row.quiz in seen:
+			continue
+		seen.add(row.quiz)
+		section_quizzes.append(_catalog_entry(row))
+
+	return {
+		"student_group": student_group,
+		"assignments": len({row.assignment for row in rows}),
+		"quiz_names": list(dict.fromkeys(row.quiz for row in rows if row.quiz)),
+		"quizzes": quizzes,
+		"section_quizzes": section_quizzes,
+	}
+
+
+def _catalog_entry(row):
+	return {
+		"name": row.quiz,
+		"title": row.title or row.quiz,
+		"total_marks": row.question_count or 0,
+		"passing_percentage": row.passing_score or 75,
+		"max_attempts": row.max_attempts or 0,
+		"assignment": row.assignment,
+		"assignment_flow": row.assignment_flow or "Direct MCQs",
+		"quiz_section_profile": row.quiz_section_profile,
+		"section_count": row.section_count or 0,
+	}
+
+
+def get_group_quiz_catalog(student_group):
+	"""Cached catalog for a group: `{"assignments", "quiz_names", "quizzes", "section_quizzes"}`."""
+	if not student_group:
+		return {
+			"student_group": student_group,
+			"assignments": 0,
+			"quiz_names": [],
+			"quizzes": [],
+			"section_quizzes": [],
+		}
+
+	cache = frappe.cache()
+	key = _catalog_key(student_group)
+	catalog = cache.get_value(key)
+	if catalog is None:
+		catalog = _build_group_quiz_catalog(student_group)
+		cache.set_value(key, catalog, expires_in_sec=QUIZ_CATALOG_TTL)
+	return catalog
+
+
+def invalidate_group_quiz_catalog(student_groups):
+	if isinstance(student_groups, str):
+		student_groups = [student_groups]
+	keys = [_catalog_key(group) for group in dict.fromkeys(student_groups or []) if group]
+	if not keys:
+		return
+
+	frappe.cache().delete_value(keys)
+
+	# Readers may have re-cached the old catalog before this transaction committed.
+	after_commit = getattr(frappe.db, "after_commit", None)
+	if after_commit is not None:
+		after_commit.add(lambda: frappe.cache().delete_value(keys))
+
+
+def _groups_for_quizzes(quiz_names):
+	quiz_names = [name for name in quiz_names if name]
+	if not quiz_names:
+		return []
+	rows = frappe.get_all(
+		"MCQS Assignment",
+		or_filters={"mcqs": ["in", quiz_names], "quiz_section_profile": ["in", quiz_names]},
+		fields=["name", "student_group"],
+	)
+	return [value for row in rows for value in (row.student_group, row.name)]
+
+
+def on_mcqs_assignment_change(doc, method=None):
+	groups = [doc.student_group, doc.name]
+	before = doc.get_doc_before_save() if method != "on_trash" else None
+	if before:
+		groups.append(before.student_group)
+	invalidate_group_quiz_catalog(groups)
+
+
+def on_quiz_change(doc, method=None):
+	invalidate_group_quiz_catalog(_groups_for_quizzes([doc.name]))
+
+
+def on_quiz_section_profile_change(doc, method=None):
+	bump_version_stamp(f"quiz_section_profile:{doc.name}")
+	invalidate_group_quiz_catalog(_groups_for_quizzes([doc.name, doc.quiz]))
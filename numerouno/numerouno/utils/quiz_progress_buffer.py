@@ -0,0 +1,233 @@
+import time
+from contextlib import contextmanager
+
+import frappe
+
+BUFFER_TTL = 60 * 60 * 24
+DIRTY_SET_KEY = "quiz_progress_buffer:dirty"
+STATS_KEY = "quiz_progress_buffer:last_flush"
+DEFAULT_FLUSH_INTERVAL = 60
+LOCK_TTL = 60
+BUFFER_LOCK_TTL = 5
+BUFFER_LOCK_WAIT = 2
+# A submission waits this long for a running flush of its attempt to finish.
+FLUSH_LOCK_WAIT = 1
+
+# Delete a lock only while it still holds our token.
+_RELEASE_LOCK = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class BufferBusy(Exception):
+	"""The attempt's buffer stayed locked by another writer for longer than `BUFFER_LOCK_WAIT`."""
+
+
+def is_write_behind_enabled():
+	"""Opt-in (`quiz_progress_write_behind`): the cache Redis may evict a buffer before it is flushed."""
+	return bool(frappe.conf.get("quiz_progress_write_behind", 0))
+
+
+def get_flush_interval():
+	"""Seconds a buffered attempt may stay unflushed (`quiz_progress_flush_interval`)."""
+	try:
+		return max(int(frappe.conf.get("quiz_progress_flush_interval") or DEFAULT_FLUSH_INTERVAL), 1)
+	except (TypeError, ValueError):
+		return DEFAULT_FLUSH_INTERVAL
+
+
+def _buffer_key(progress_key):
+	return f"{progress_key}:buffer"
+
+
+def _flushed_key(progress_key):
+	return f"{progress_key}:flushed"
+
+
+def _submitted_key(progress_key):
+	return f"{progress_key}:submitted"
+
+
+def _acquire_lock(name, ttl):
+	"""Take a Redis lock; returns its token, or None when someone else holds it."""
+	cache = frappe.cache()
+	token = frappe.generate_hash(length=16)
+	if cache.set(cache.make_key(name), token, nx=True, ex=ttl):
+		return token
+	return None
+
+
+def _release_lock(name, token):
+	if token:
+		cache = frappe.cache()
+		cache.eval(_RELEASE_LOCK, 1, cache.make_key(name), token)
+
+
+@contextmanager
+def buffer_lock(attempt_id):
+	"""Serialize read-modify-write of one attempt's buffer across workers."""
+	name = f"quiz_progress_buffer:write_lock:{attempt_id}"
+	deadline = time.time() + BUFFER_LOCK_WAIT
+	token = _acquire_lock(name, BUFFER_LOCK_TTL)
+	while not token:
+		if time.time() >= deadline:
+			raise BufferBusy(attempt_id)
+		time.sleep(0.01)
+		token = _acquire_lock(name, BUFFER_LOCK_TTL)
+	try:
+		yield
+	finally:
+		_release_lock(name, token)
+
+
+def _read(key):
+	"""Read straight from Redis, skipping the per-request copy another writer may have outdated."""
+	cache = frappe.cache()
+	getattr(frappe.local, "cache", {}).pop(cache.make_key(key), None)
+	return cache.get_value(key)
+
+
+def get_buffer(progress_key):
+	"""Buffered attempt state: answers, seq, quiz context and timestamps."""
+	if not progress_key:
+		return None
+	return _read(_buffer_key(progress_key))
+
+
+def get_flush_state(progress_key):
+	"""Last flush of an attempt: flushed seq, Quiz Activity name and time."""
+	if not progress_key:
+		return {}
+	return _read(_flushed_key(progress_key)) or {}
+
+
+def save_buffer(progress_key, attempt_id, buffer):
+	"""Store attempt state, then mark the attempt dirty. Call under `buffer_lock`.
+
+	The flusher clears the dirty flag before re-reading the buffer, so writing
+	first never lets a newer answer slip past a concurrent flush.
+	"""
+	now = time.time()
+	if (buffer.get("seq") or 0) > (get_flush_state(progress_key).get("seq") or 0):
+		buffer["dirty_since"] = buffer.get("dirty_since") or now
+	buffer["updated_at"] = now
+	frappe.cache().set_value(_buffer_key(progress_key), buffer, expires_in_sec=BUFFER_TTL)
+	frappe.cache().sadd(DIRTY_SET_KEY, attempt_id)
+	return buffer
+
+
+def update_buffer(progress_key, attempt_id, apply):
+	"""Atomically read, change and store an attempt's buffer.
+
+	`apply(buffer)` gets the current buffer (or None) and returns
+	`(new_buffer, result)`; a None `new_buffer` leaves the stored one as is.
+	Returns `result`. Raises `BufferBusy` if the attempt stays locked.
+	"""
+	with buffer_lock(attempt_id):
+		new_buffer, result = apply(get_buffer(progress_key))
+		if new_buffer is not None:
+			save_buffer(progress_key, attempt_id, new_buffer)
+		return result
+
+
+def mark_flushed(progress_key, attempt_id, flushed_seq, quiz_activity_name):
+	"""Record a flush and keep the attempt dirty if newer answers arrived meanwhile."""
+	with buffer_lock(attempt_id):
+		frappe.cache().set_value(
+			_flushed_key(progress_key),
+			{"seq": flushed_seq, "activity_id": quiz_activity_name, "at": time.time()},
+			expires_in_sec=BUFFER_TTL,
+		)
+		frappe.cache().srem(DIRTY_SET_KEY, attempt_id)
+
+		buffer = get_buffer(progress_key) or {}
+		if (buffer.get("seq") or 0) > flushed_seq:
+			frappe.cache().sadd(DIRTY_SET_KEY, attempt_id)
+		elif buffer.get("dirty_since"):
+			buffer["dirty_since"] = None
+			frappe.cache().set_value(_buffer_key(progress_key), buffer, expires_in_sec=BUFFER_TTL)
+
+
+def discard_buffer(progress_key, attempt_id):
+	frappe.cache().delete_value([_buffer_key(progress_key), _flushed_key(progress_key)])
+	frappe.cache().srem(DIRTY_SET_KEY, attempt_id)
+
+
+def mark_submitted(progress_key, attempt_id):
+	"""Tombstone a graded attempt: drop its buffer and refuse any later progress for it."""
+	with buffer_lock(attempt_id):
+		frappe.cache().set_value(_submitted_key(progress_key), 1, expires_in_sec=BUFFER_TTL)
+		discard_buffer(progress_key, attempt_id)
+
+
+def is_submitted(progress_key):
+	return bool(progress_key and _read(_submitted_key(progress_key)))
+
+
+def get_dirty_attempts():
+	return [
+		value.decode() if isinstance(value, bytes) else value
+		for value in (frappe.cache().smembers(DIRTY_SET_KEY) or [])
+	]
+
+
+def find_unflushed_buffers(progress_key_prefix):
+	"""Scan every stored buffer and re-mark the ones newer than their last flush.
+
+	Covers workers that died between writing a buffer and marking it dirty.
+	"""
+	cache = frappe.cache()
+	recovered = []
+	for key in cache.get_keys(f"{progress_key_prefix}*:buffer") or []:
+		key = key.decode() if isinstance(key, bytes) else key
+		progress_key = key.split("|", 1)[-1].rsplit(":buffer", 1)[0]
+		buffer = get_buffer(progress_key) or {}
+		attempt_id = buffer.get("attempt_id")
+		if attempt_id and (buffer.get("seq") or 0) > (get_flush_state(progress_key).get("seq") or 0):
+			cache.sadd(DIRTY_SET_KEY, attempt_id)
+			recovered.append(attempt_id)
+	return recovered
+
+
+def acquire_flush_lock(attempt_id, wait=0):
+	"""Take the attempt's flush lock, waiting up to `wait` seconds; returns a token for `release_flush_lock`."""
+	name = f"quiz_progress_buffer:lock:{attempt_id}"
+	deadline = time.time() + wait
+	token = _acquire_lock(name, LOCK_TTL)
+	while not token and time.time() < deadline:
+		time.sleep(0.05)
+		token = _acquire_lock(name, LOCK_TTL)
+	return token
+
+
+def release_flush_lock(attempt_id, token):
+	_release_lock(f"quiz_progress_buffer:lock:{attempt_id}", token)
+
+
+def record_flush_run(flushed, failed, duration):
+	frappe.cache().set_value(
+		STATS_KEY,
+		{"at": time.time(), "flushed": flushed, "failed": failed, "duration": round(duration, 3)},
+	)
+
+
+def get_buffer_stats(progress_key_for):
+	"""Buffered attempt count and flush lag, for the write-behind metric."""
+	now = time.time()
+	dirty = get_dirty_attempts()
+	oldest_unflushed = None
+	for attempt_id in dirty:
+		pending_since = (get_buffer(progress_key_for(attempt_id)) or {}).get("dirty_since")
+		if pending_since and (oldest_unflushed is None or pending_since < oldest_unflushed):
+			oldest_unflushed = pending_since
+
+	return {
+		"buffered_attempts": len(dirty),
+		"flush_lag_seconds": round(now - oldest_unflushed, 1) if oldest_unflushed else 0,
+		"flush_interval_seconds": get_flush_interval(),
+		"last_flush_run": frappe.cache().get_value(STATS_KEY) or {},
+		"write_behind_enabled": is_write_behind_enabled(),
+	}
@@ -0,0 +1,436 @@
+"""Regrade past Quiz Activities after a Question's answer key (`is_correct`) changes.
+
+Quiz Result rows keep the selected option *text*, not its index, so a row is
+re-checked by comparing that text with the new correct options. Affected
+activities are found through `Quiz Result.question` and processed in chunks:
+one IN query for their rows, in-memory regrading, and writes only for rows
+that actually change. Score and status are then materialized the same way as
+at write time, and linked Assessment Results follow the stored values.
+
+Saving a new answer key queues a dry run whose diff is kept under
+`quiz_regrade:preview:<question>`; an admin applies it with `regrade_question`.
+Sites that set `quiz_auto_regrade` apply it straight away instead.
+"""
+
+import hashlib
+from itertools import permutations
+
+import frappe
+from frappe.utils import cint, now
+
+from numerouno.numerouno.utils.diagnostics import get_diagnostics
+from numerouno.numerouno.utils.quiz_activity_score import (
+	compute_activity_scores,
+	materialize_activity_scores,
+)
+from numerouno.numerouno.utils.section_scoring import (
+	_section_results_json,
+	get_section_scheme,
+	score_section_submission,
+)
+
+REGRADE_CHUNK_SIZE = 200
+REGRADE_DIFF_LIMIT = 200
+REGRADE_STATUS_TTL = 60 * 60 * 24
+# Answer-key edits made while a regrade runs are picked up by re-running, but
+# never more than this many times in one job.
+REGRADE_MAX_PASSES = 3
+# Beyond this many correct options, fall back to splitting the stored text.
+MAX_PERMUTED_OPTIONS = 5
+
+diag = get_diagnostics("quiz")
+
+
+def _status_key(question, dry_run=False):
+	return f"quiz_regrade:preview:{question}" if dry_run else f"quiz_regrade:{question}"
+
+
+def is_auto_regrade_enabled():
+	"""Apply answer-key changes without an admin confirming the dry run (`quiz_auto_regrade`)."""
+	return bool(frappe.conf.get("quiz_auto_regrade", 0))
+
+
+def _answer_key_signature(question_doc):
+	return tuple((opt.option or "", cint(opt.is_correct)) for opt in question_doc.options or [])
+
+
+def _correct_texts(entry):
+	return [entry["options"][idx - 1] for idx in entry["correct"] if 0 < idx <= len(entry["options"])]
+
+
+def regrade_selected_option(entry, selected_option):
+	"""New `quiz_result` for a stored selection, or None when it cannot be resolved.
+
+	The stored text is the selected option texts joined by ", " in selection
+	order (then truncated), so a selection is correct exactly when it matches
+	some ordering of the correct options.
+	"""
+	from numerouno.numerouno.api.quiz_api import _safe_selected_option_text
+
+	if entry["type"] not in ("Single Correct Answer", "Multiple Correct Answer"):
+		return None
+	selected = (selected_option or "").strip()
+	if not selected:
+		return "Wrong"
+
+	correct = _correct_texts(entry)
+	if correct and len(correct) <= MAX_PERMUTED_OPTIONS:
+		for ordering in permutations(correct):
+			if _safe_selected_option_text(", ".join(ordering)) == selected:
+				return "Correct"
+	elif correct and sorted(part.strip() for part in selected.split(", ")) == sorted(correct):
+		return "Correct"
+
+	# Only call it wrong when the text is recognisably made of this question's options.
+	options = {text.strip() for text in entry["options"] if text}
+	if selected in options or all(part.strip() in options for part in selected.split(", ")):
+		return "Wrong"
+	return None
+
+
+def _affected_activity_chunks(question, chunk_size):
+	after = ""
+	while True:
+		names = frappe.db.sql_list(
+			"""
+			SELECT DISTINCT parent
+			FROM `tabQuiz Result`
+			WHERE question = %(question)s AND parenttype = 'Quiz Activity' AND parent > %(after)s
+			ORDER BY parent
+			LIMIT %(limit)s
+			""",
+			{"question": question, "after": after, "limit": chunk_size},
+		)
+		if not names:
+			return
+		yield names
+		after = names[-1]
+
+
+def _count_affected_activities(question):
+	return frappe.db.sql(
+		"""
+		SELECT COUNT(DISTINCT parent) FROM `tabQuiz Result`
+		WHERE question = %s AND parenttype = 'Quiz Activity'
+		""",
+		(question,),
+	)[0][0]
+
+
+def _load_chunk(names):
+	activities = {
+		row.name: row
+		for row in frappe.get_all(
+			"Quiz Activity",
+			filters={"name": ["in", names]},
+			fields=[
+				"name",
+				"quiz",
+				"student",
+				"status",
+				"score",
+				"creation",
+				"activity_date",
+				"custom_student_group",
+				"custom_assesment_plan",
+				"custom_assesment_result",
+				"custom_section_results",
+			],
+		)
+	}
+	rows = {name: [] for name in activities}
+	for row in frappe.get_all(
+		"Quiz Result",
+		filters={"parent": ["in", names], "parenttype": "Quiz Activity"},
+		fields=["name", "parent", "question", "selected_option", "quiz_result"],
+		order_by="parent, idx",
+	):
+		if row.parent in rows:
+			rows[row.parent].append(row)
+	return activities, rows
+
+
+class _QuizScoring:
+	"""Per-quiz section schemes, loaded once per job."""
+
+	def __init__(self):
+		self.schemes = {}
+
+	def scheme(self, quiz, profile):
+		if (quiz, profile) not in self.schemes:
+			try:
+				self.schemes[(quiz, profile)] = get_section_scheme(quiz, profile)
+			except frappe.DoesNotExistError:
+				self.schemes[(quiz, profile)] = None
+		return self.schemes[(quiz, profile)]
+
+
+def _section_profile_of(activity):
+	if not activity.custom_section_results:
+		return None
+	try:
+		return frappe.parse_json(activity.custom_section_results).get("profile")
+	except Exception:
+		return None
+
+
+def _regrade_activity(activity, rows, question, entry, scoring):
+	"""Return `(row_updates, section_updates, unresolved)` for one activity.
+
+	Score and plain pass/fail status are left to `materialize_activity_scores`;
+	only section-scored attempts get their status and breakdown here.
+	"""
+	row_updates = []
+	unresolved = 0
+	for row in rows:
+		if row.question != question:
+			continue
+		new_result = regrade_selected_option(entry, row.selected_option)
+		if new_result is None:
+			unresolved += 1
+		elif new_result != row.quiz_result:
+			row_updates.append((row.name, row.quiz_result, new_result))
+			row.quiz_result = new_result
+
+	if not row_updates or activity.status not in ("Pass", "Fail"):
+		return row_updates, {}, unresolved
+
+	profile = _section_profile_of(activity)
+	scheme = scoring.scheme(activity.quiz, profile) if profile else None
+	if not scheme:
+		return row_updates, {}, unresolved
+
+	section_result = score_section_submission(
+		scheme, [{"question": row.question, "quiz_result": row.quiz_result} for row in rows]
+	)
+	updates = {
+		"status": "Pass" if section_result["passed"] else "Fail",
+		"custom_section_results": _section_results_json(section_result),
+	}
+	return row_updates, {key: value for key, value in updates.items() if activity.get(key) != value}, unresolved
+
+
+def _score_regraded(activities, rows, regraded, dry_run):
+	"""`{name: (score, status)}` after regrading, as `materialize_activity_scores` stores them.
+
+	A dry run scores the in-memory rows with the same `compute_activity_scores`
+	the write path materializes through.
+	"""
+	if dry_run:
+		scored = [frappe._dict(activities[name], **section_updates) for name, (_rows, section_updates) in regraded.items()]
+		summary = compute_activity_scores(scored, result_rows=[row for name in regraded for row in rows[name]])
+		return {name: (data["score"], data["status"]) for name, data in summary.items()}
+
+	for name, (row_updates, section_updates) in regraded.items():
+		for row_name, _old, new_result in row_updates:
+			frappe.db.set_value("Quiz Result", row_name, "quiz_result", new_result, update_modified=False)
+		if section_updates:
+			frappe.db.set_value("Quiz Activity", name, section_updates, update_modified=False)
+	materialize_activity_scores(list(regraded))
+	return {
+		row.name: (row.score, row.status)
+		for row in frappe.get_all(
+			"Quiz Activity", filters={"name": ["in", list(regraded)]}, fields=["name", "score", "status"]
+		)
+	}
+
+
+def _sync_assessment_result(activity, score, status):
+	from numerouno.numerouno.api.quiz_api import (
+		_get_linked_assessment_result_name,
+		_update_assessment_result_from_quiz_activity,
+	)
+
+	assessment_result = _get_linked_assessment_result_name(activity)
+	if not assessment_result:
+		return None
+	try:
+		correct_count, out_of = (int(part) for part in str(score).split("/"))
+	except ValueError:
+		diag.warning("Quiz Activity {} has no correct/total score to sync", activity.name)
+		return None
+	_update_assessment_result_from_quiz_activity(
+		assessment_result,
+		frappe._dict(name=activity.name, status=status),
+		correct_count,
+		out_of,
+	)
+	return assessment_result
+
+
+def _publish_progress(question, progress, user=None):
+	frappe.cache().set_value(
+		_status_key(question, progress["dry_run"]), progress, expires_in_sec=REGRADE_STATUS_TTL
+	)
+	if user:
+		frappe.publish_realtime("quiz_regrade_progress", progress, user=user)
+
+
+def regrade_question_activities(question, dry_run=False, chunk_size=REGRADE_CHUNK_SIZE, user=None):
+	"""Regrade every Quiz Activity that answered `question` against its current answer key.
+
+	Commits after each chunk and records progress under `quiz_regrade:<question>`
+	(see `get_question_regrade_status`). `dry_run` computes the same diff
+	without writing anything and records it under `quiz_regrade:preview:<question>`.
+
+	The job is deduplicated on the question, so an answer-key edit saved while
+	it runs does not queue a second one. Instead the key is re-read after each
+	pass and the pass is repeated when it moved.
+	"""
+	question_doc = frappe.get_doc("Question", question)
+	signature = _answer_key_signature(question_doc)
+	passes = 1
+	while True:
+		progress = _regrade_pass(question_doc, dry_run, chunk_size, user, passes)
+		if dry_run or passes >= REGRADE_MAX_PASSES:
+			return progress
+		# end the read snapshot so the latest saved answer key is visible
+		frappe.db.commit()
+		if not frappe.db.exists("Question", question):
+			return progress
+		question_doc = frappe.get_doc("Question", question)
+		if _answer_key_signature(question_doc) == signature:
+			return progress
+		signature = _answer_key_signature(question_doc)
+		passes += 1
+
+
+def _regrade_pass(question_doc, dry_run, chunk_size, user, passes):
+	from numerouno.numerouno.api.quiz_api import _answer_key_entry_from_doc
+
+	question = question_doc.name
+	entry = _answer_key_entry_from_doc(question_doc)
+	scoring = _QuizScoring()
+	progress = {
+		"question": question,
+		"dry_run": bool(dry_run),
+		"state": "running",
+		"started_at": now(),
+		"passes": passes,
+		"total": _count_affected_activities(question),
+		"processed": 0,
+		"rows_changed": 0,
+		"activities_changed": 0,
+		"status_changed": 0,
+		"assessment_results_synced": 0,
+		"unresolved_rows": 0,
+		"changes": [],
+	}
+	_publish_progress(question, progress, user)
+
+	try:
+		for names in _affected_activity_chunks(question, chunk_size):
+			activities, rows = _load_chunk(names)
+			regraded = {}
+			for name, activity in activities.items():
+				row_updates, section_updates, unresolved = _regrade_activity(
+					activity, rows[name], question, entry, scoring
+				)
+				progress["unresolved_rows"] += unresolved
+				if row_updates:
+					regraded[name] = (row_updates, section_updates)
+
+			scores = _score_regraded(activities, rows, regraded, dry_run) if regraded else {}
+			for name, (row_updates, section_updates) in regraded.items():
+				activity = activities[name]
+				new_score, new_status = scores.get(name, (activity.score, activity.status))
+				rescored = new_score != activity.score or new_status != activity.status
+				progress["rows_changed"] += len(row_updates)
+				if rescored or section_updates:
+					progress["activities_changed"] += 1
+				if new_status != activity.status:
+					progress["status_changed"] += 1
+				if len(progress["changes"]) < REGRADE_DIFF_LIMIT:
+					progress["changes"].append(
+						{
+							"quiz_activity": name,
+							"quiz": activity.quiz,
+							"student": activity.student,
+							"old_result": row_updates[0][1],
+							"new_result": row_updates[0][2],
+							"old_score": activity.score,
+							"new_score": new_score,
+							"old_status": activity.status,
+							"new_status": new_status,
+						}
+					)
+				if not dry_run and rescored and new_status in ("Pass", "Fail"):
+					if _sync_assessment_result(activity, new_score, new_status):
+						progress["assessment_results_synced"] += 1
+
+			progress["processed"] += len(names)
+			if not dry_run:
+				frappe.db.commit()
+			_publish_progress(question, progress, user)
+	except Exception:
+		frappe.db.rollback()
+		progress["state"] = "failed"
+		_publish_progress(question, progress, user)
+		diag.error("Regrade for Question {} failed", question, title="Quiz Regrade")
+		raise
+
+	progress["state"] = "dry_run" if dry_run else "completed"
+	progress["finished_at"] = now()
+	_publish_progress(question, progress, user)
+	diag.info(
+		"Regrade for Question {}: {} activities scanned, {} changed, {} status changes{}",
+		question,
+		progress["processed"],
+		progress["activities_changed"],
+		progress["status_changed"],
+		" (dry run)" if dry_run else "",
+	)
+	return progress
+
+
+def enqueue_question_regrade(question, user=None, dry_run=False):
+	if dry_run:
+		# A preview reflects one answer key, so a newer key gets its own job.
+		signature = _answer_key_signature(frappe.get_doc("Question", question))
+		job_id = f"quiz_regrade_preview::{question}::{hashlib.sha1(repr(signature).encode()).hexdigest()[:12]}"
+	else:
+		job_id = f"quiz_regrade::{question}"
+	frappe.enqueue(
+		"numerouno.numerouno.utils.quiz_regrade.regrade_question_activities",
+		queue="long",
+		timeout=3600,
+		job_id=job_id,
+		deduplicate=True,
+		enqueue_after_commit=True,
+		question=question,
+		dry_run=bool(dry_run),
+		user=user,
+	)
+
+
+def on_question_update(doc, method=None):
+	before = doc.get_doc_before_save()
+	if before and _answer_key_signature(before) != _answer_key_signature(doc):
+		enqueue_question_regrade(doc.name, user=frappe.session.user, dry_run=not is_auto_regrade_enabled())
+
+
+@frappe.whitelist()
+def regrade_question(question, dry_run=1):
+	"""Queue a preview (`dry_run=1`) or a regrade of every activity that answered `question`.
+
+	Both run in the background; read their progress and diff with
+	`get_question_regrade_status`.
+	"""
+	frappe.only_for("System Manager")
+	if not frappe.db.exists("Question", question):
+		frappe.throw(frappe._("Question {0} not found").format(question))
+
+	dry_run = bool(cint(dry_run))
+	enqueue_question_regrade(question, user=frappe.session.user, dry_run=dry_run)
+	return {"status": "queued", "question": question, "dry_run": dry_run}
+
+
+@frappe.whitelist()
+def get_question_regrade_status(question, dry_run=0):
+	frappe.only_for("System Manager")
+	dry_run = bool(cint(dry_run))
+	return frappe.cache().get_value(_status_key(question, dry_run)) or {
+		"question": question,
+		"dry_run": dry_run,
+		"state": "idle",
+	}
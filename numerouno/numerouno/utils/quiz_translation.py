@@ -0,0 +1,351 @@
+import json
+import urllib.parse
+import urllib.request
+
+import frappe
+from frappe import _
+
+from numerouno.numerouno.utils.http_cache import bump_version_stamp, get_version_stamp
+
+# Languages quiz content can be localized into (English is the source language).
+QUIZ_LANGUAGES = ("hi", "ur", "ar", "zh")
+
+ENQUEUE_THROTTLE_SEC = 600
+DEFAULT_TRANSLATION_BACKEND = "numerouno.numerouno.utils.quiz_translation.google_translate_text"
+
+
+def normalize_quiz_language(lang):
+	"""Normalize incoming language code for quiz content localization."""
+	if not lang:
+		return "en"
+	code = str(lang).strip().lower()
+	for lang_code in QUIZ_LANGUAGES:
+		if code.startswith(lang_code):
+			return lang_code
+	return "en"
+
+
+def _google_target_lang(lang_code):
+	if lang_code == "zh":
+		return "zh-CN"
+	return lang_code
+
+
+def google_translate_text(text, lang_code, timeout_sec=4):
+	"""Translate text with Google public translate endpoint."""
+	if not text or lang_code == "en":
+		return ""
+
+	try:
+		q = urllib.parse.quote(text)
+		target = urllib.parse.quote(_google_target_lang(lang_code))
+		url = (
+			"https://translate.googleapis.com/translate_a/single"
+			f"?client=gtx&sl=auto&tl={target}&dt=t&q={q}"
+		)
+		req = urllib.request.Request(
+			url,
+			headers={"User-Agent": "Mozilla/5.0"},
+		)
+		with urllib.request.urlopen(req, timeout=timeout_sec) as resp:
+			payload = resp.read().decode("utf-8", errors="ignore")
+		data = json.loads(payload)
+		if not isinstance(data, list) or not data or not isinstance(data[0], list):
+			return ""
+		parts = []
+		for chunk in data[0]:
+			if isinstance(chunk, list) and chunk and chunk[0]:
+				parts.append(str(chunk[0]))
+		return "".join(parts).strip()
+	except Exception:
+		return ""
+
+
+def stub_translate_text(text, lang_code, timeout_sec=None):
+	"""Offline backend for tests and local sites: tags the source text with the language."""
+	if not text or lang_code == "en":
+		return ""
+	return f"[{lang_code}] {text}"
+
+
+def get_translation_backend():
+	"""Resolve the translate callable from `quiz_translation_backend` in site config."""
+	return frappe.get_attr(frappe.conf.get("quiz_translation_backend") or DEFAULT_TRANSLATION_BACKEND)
+
+
+def save_translation(source_text, translated_text, lang_code):
+	if not source_text or not translated_text or lang_code == "en":
+		return
+
+	try:
+		existing_name = frappe.db.exists(
+			"Translation",
+			{"language": lang_code, "source_text": source_text},
+		)
+		if existing_name:
+			if frappe.db.get_value("Translation", existing_name, "translated_text") != translated_text:
+				frappe.db.set_value("Translation", existing_name, "translated_text", translated_text, update_modified=False)
+			return
+
+		doc = frappe.get_doc(
+			{
+				"doctype": "Translation",
+				"language": lang_code,
+				"source_text": source_text,
+				"translated_text": translated_text,
+			}
+		)
+		# Callers bump the quizzes they translate for; skip the per-row lookup.
+		doc.flags.from_quiz_translation = True
+		doc.insert(ignore_permissions=True)
+	except Exception:
+		pass
+
+
+def load_translations(texts, lang_code):
+	"""Return {source_text: translated_text} for existing rows, in one `IN` query."""
+	texts = [text for text in dict.fromkeys(texts or []) if text]
+	if lang_code == "en" or not texts:
+		return {}
+
+	# Match the stripped variant too, like the old per-string lookup did.
+	source_texts = set(texts) | {text.strip() for text in texts if text.strip()}
+	found = {
+		row.source_text: row.translated_text
+		for row in frappe.get_all(
+			"Translation",
+			filters={"language": lang_code, "source_text": ["in", list(source_texts)]},
+			fields=["source_text", "translated_text"],
+		)
+		if row.translated_text
+	}
+
+	translations = {}
+	for text in texts:
+		translated = found.get(text) or found.get(text.strip())
+		if translated:
+			translations[text] = translated
+	return translations
+
+
+def enqueue_missing_translations(texts, lang_code):
+	"""Queue one background job for every untranslated string not already in flight."""
+	if lang_code == "en":
+		return []
+
+	cache = frappe.cache()
+	pending = []
+	for text in dict.fromkeys(texts or []):
+		if not text:
+			continue
+		throttle_key = f"quiz_translate_enqueue::{lang_code}::{text}"
+		try:
+			if cache.get_value(throttle_key):
+				continue
+			cache.set_value(throttle_key, 1, expires_in_sec=ENQUEUE_THROTTLE_SEC)
+		except Exception:
+			pass
+		pending.append(text)
+
+	if not pending:
+		return []
+
+	try:
+		frappe.enqueue(
+			"numerouno.numerouno.utils.quiz_translation.translate_missing_texts",
+			queue="short",
+			timeout=600,
+			source_texts=pending,
+			lang_code=lang_code,
+			enqueue_after_commit=True,
+		)
+	except Exception:
+		return []
+	return pending
+
+
+def resolve_translations(texts, lang_code, enqueue_missing=True):
+	"""Translate many strings at once without blocking on the translation backend.
+
+	Returns `(translations, missing)`. Misses fall back to the source text and,
+	unless `enqueue_missing` is off, are queued as a single batched job.
+	"""
+	texts = [text for text in dict.fromkeys(texts or []) if text]
+	if lang_code == "en" or not texts:
+		return {text: text for text in texts}, []
+
+	found = load_translations(texts, lang_code)
+	missing = [text for text in texts if text not in found]
+	if missing and enqueue_missing:
+		enqueue_missing_translations(missing, lang_code)
+
+	translations = {text: found.get(text) or _(text) for text in texts}
+	return translations, missing
+
+
+def translate_missing_texts(source_texts, lang_code):
+	"""Background job: translate a batch of strings and persist them as Translation rows."""
+	if not source_texts or not lang_code or lang_code == "en":
+		return 0
+
+	existing = load_translations(source_texts, lang_code)
+	backend = get_translation_backend()
+	saved = 0
+	for source_text in dict.fromkeys(source_texts):
+		if not source_text or source_text in existing:
+			continue
+		translated = backend(source_text, lang_code)
+		if translated:
+			save_translation(source_text, translated, lang_code)
+			saved += 1
+	frappe.db.commit()
+	return saved
+
+
+def get_quiz_translatable_texts(quiz_name):
+	"""Every distinct string a quiz payload shows: title, question texts and option texts."""
+	title = frappe.db.get_value("Quiz", quiz_name, "title")
+	rows = frappe.db.sql(
+		"""
+		SELECT qs.question AS text
+		FROM `tabQuiz Question` qq
+		INNER JOIN `tabQuestion` qs ON qs.name = qq.question_link
+		WHERE qq.parent = %(quiz)s AND qq.parenttype = 'Quiz'
+		UNION
+		SELECT o.`option` AS text
+		FROM `tabQuiz Question` qq
+		INNER JOIN `tabOptions` o ON o.parent = qq.question_link AND o.parenttype = 'Question'
+		WHERE qq.parent = %(quiz)s AND qq.parenttype = 'Quiz'
+		""",
+		{"quiz": quiz_name},
+		as_dict=True,
+	)
+	texts = [title] + [row.text for row in rows]
+	return [text for text in dict.fromkeys(texts) if text]
+
+
+def get_quiz_translation_coverage(quiz_name, languages=None):
+	"""Return per-language translation coverage for a quiz."""
+	texts = get_quiz_translatable_texts(quiz_name)
+	coverage = {}
+	for lang_code in languages or QUIZ_LANGUAGES:
+		translated = load_translations(texts, lang_code)
+		missing = [text for text in texts if text not in translated]
+		coverage[lang_code] = {
+			"total": len(texts),
+			"translated": len(texts) - len(missing),
+			"missing": len(missing),
+			"percentage": round((len(texts) - len(missing)) / len(texts) * 100, 2) if texts else 100,
+			"complete": not missing,
+		}
+	return coverage
+
+
+def _translation_stamp_name(quiz_name):
+	return f"quiz_translation:{quiz_name}"
+
+
+def get_quiz_translation_generation(quiz_name):
+	"""Stamp that changes whenever Translation rows a quiz shows are saved.
+
+	Saving a Translation does not touch Quiz/Question `modified`, so compiled
+	payloads and ETags carry this next to the quiz version.
+	"""
+	return get_version_stamp(_translation_stamp_name(quiz_name), lambda: frappe.generate_hash(length=10))
+
+
+def bump_quiz_translation_generation(quiz_names):
+	if isinstance(quiz_names, str):
+		quiz_names = [quiz_names]
+	for quiz_name in dict.fromkeys(quiz_names or []):
+		if quiz_name:
+			bump_version_stamp(_translation_stamp_name(quiz_name))
+
+
+def get_quizzes_for_text(source_text):
+	"""Quizzes whose title, question or option text is `source_text`."""
+	if not source_text:
+		return []
+	return frappe.db.sql_list(
+		"""
+		SELECT qq.parent
+		FROM `tabQuiz Question` qq
+		INNER JOIN `tabQuestion` qs ON qs.name = qq.question_link
+		WHERE qq.parenttype = 'Quiz' AND (qs.question = %(text)s OR TRIM(qs.question) = %(text)s)
+		UNION
+		SELECT qq.parent
+		FROM `tabQuiz Question` qq
+		INNER JOIN `tabOptions` o ON o.parent = qq.question_link AND o.parenttype = 'Question'
+		WHERE qq.parenttype = 'Quiz' AND (o.`option` = %(text)s OR TRIM(o.`option`) = %(text)s)
+		UNION
+		SELECT name FROM `tabQuiz` WHERE title = %(text)s OR TRIM(title) = %(text)s
+		""",
+		{"text": source_text},
+	)
+
+
+def on_translation_change(doc, method=None):
+	"""A saved or deleted Translation row changes the compiled payload of every quiz that shows it."""
+	if doc.flags.from_quiz_translation or doc.language not in QUIZ_LANGUAGES:
+		return
+	bump_quiz_translation_generation(get_quizzes_for_text(doc.source_text))
+
+
+def prewarm_quiz_translations(quiz_name):
+	"""Background job: fill missing Translation rows for a quiz in every quiz language."""
+	if not quiz_name or not frappe.db.exists("Quiz", quiz_name):
+		return {}
+
+	texts = get_quiz_translatable_texts(quiz_name)
+	saved = 0
+	for lang_code in QUIZ_LANGUAGES:
+		saved += translate_missing_texts(texts, lang_code)
+
+	if saved:
+		bump_quiz_translation_generation(quiz_name)
+	return get_quiz_translation_coverage(quiz_name)
+
+
+def enqueue_quiz_translation_prewarm(quiz_name):
+	if not quiz_name:
+		return
+	frappe.enqueue(
+		"numerouno.numerouno.utils.quiz_translation.prewarm_quiz_translations",
+		queue="long",
+		timeout=1800,
+		job_id=f"quiz_translation_prewarm::{quiz_name}",
+		deduplicate=True,
+		enqueue_after_commit=True,
+		quiz_name=quiz_name,
+	)
+
+
+def on_quiz_update(doc, method=None):
+	enqueue_quiz_translation_prewarm(doc.name)
+
+
+def on_question_update(doc, method=None):
+	from numerouno.numerouno.utils.quiz_cache import get_quizzes_for_question
+
+	for quiz_name in get_quizzes_for_question(doc.name):
+		enqueue_quiz_translation_prewarm(quiz_name)
+
+
+@frappe.whitelist()
+def get_quiz_localization_status(quiz_name):
+	"""Coverage per language; `fully_localized` is set once every language is complete."""
+	frappe.has_permission("Quiz", "read", quiz_name, throw=True)
+	coverage = get_quiz_translation_coverage(quiz_name)
+	return {
+		"status": "success",
+		"quiz": quiz_name,
+		"fully_localized": all(row["complete"] for row in coverage.values()),
+		"coverage": coverage,
+	}
+
+
+@frappe.whitelist(methods=["POST"])
+def prewarm_quiz_localization(quiz_name):
+	frappe.has_permission("Quiz", "write", quiz_name, throw=True)
+	enqueue_quiz_translation_prewarm(quiz_name)
+	return {"status": "success", "queued": True, "quiz": quiz_name}
@@ -0,0 +1,411 @@
+"""Section-wise scoring for quizzes attempted through a Quiz Section Profile.
+
+A quiz's questions and the profile's sections form a question x section
+incidence array `I` (1 where the question belongs to the section). For a
+batch of attempts with correctness matrix `C` (attempts x questions) every
+section figure comes out of one pass:
+
+	raw = C @ I                 marks per attempt and section
+	percentage = raw / possible
+	weighted = percentage * weightage / sum(weightage)
+
+so scoring one submission and re-scoring thousands of historical Quiz
+Activity rows are the same code path.
+"""
+
+import json
+
+import frappe
+import numpy as np
+from frappe.utils import cint, flt
+
+from numerouno.numerouno.utils.diagnostics import get_diagnostics
+from numerouno.numerouno.utils.http_cache import get_version_stamp
+from numerouno.numerouno.utils.quiz_cache import get_versioned_quiz_value
+from numerouno.numerouno.utils.quiz_catalog import get_group_quiz_catalog
+
+RESCORE_CHUNK_SIZE = 500
+RESCORE_DIFF_LIMIT = 200
+# Threshold edits made while a re-score runs are picked up by re-running, but
+# never more than this many times in one job.
+RESCORE_MAX_PASSES = 3
+
+diag = get_diagnostics("quiz")
+
+
+def _build_section_scheme(quiz_name, profile_name):
+	profile = frappe.get_doc("Quiz Section Profile", profile_name)
+	section_rows = sorted(
+		profile.section_items or [],
+		key=lambda row: (row.sort_order or row.idx or 0, row.idx or 0),
+	)
+	sections = []
+	section_index = {}
+	for row in section_rows:
+		section_key = (row.section_key or "").strip()
+		if not section_key or section_key.lower() in section_index:
+			continue
+		section_index[section_key.lower()] = len(sections)
+		sections.append(
+			{
+				"key": section_key,
+				"title": row.section_title or section_key,
+				"min_pass_percentage": flt(row.min_pass_percentage),
+				"weightage": flt(row.weightage),
+			}
+		)
+
+	question_rows = frappe.get_all(
+		"Quiz Question",
+		filters={"parent": quiz_name, "parenttype": "Quiz"},
+		fields=["question_link", "custom_section_key"],
+		order_by="idx asc",
+	)
+	questions = []
+	question_sections = []
+	for row in question_rows:
+		if not row.question_link or row.question_link in questions:
+			continue
+		questions.append(row.question_link)
+		# -1 keeps an unmapped question in the overall total but out of every section.
+		question_sections.append(section_index.get((row.custom_section_key or "").strip().lower(), -1))
+
+	return {
+		"quiz": quiz_name,
+		"profile": profile.name,
+		"questions": questions,
+		"question_sections": question_sections,
+		"sections": sections,
+		"require_all_sections_pass": cint(profile.require_all_sections_pass),
+		"enforce_overall_percentage": cint(profile.enforce_overall_percentage),
+		"passing_score": flt(frappe.db.get_value("Quiz", quiz_name, "passing_score")) or 75,
+	}
+
+
+def get_section_scheme(quiz_name, profile_name):
+	"""Cached scoring scheme for a quiz under a profile, or None if the profile is gone.
+
+	Keyed on the quiz version and the profile's version stamp, so editing either
+	(questions, section keys, thresholds) yields a fresh scheme.
+	"""
+	if not quiz_name or not profile_name:
+		return None
+	profile_version = get_version_stamp(
+		f"quiz_section_profile:{profile_name}",
+		lambda: frappe.db.get_value("Quiz Section Profile", profile_name, "modified"),
+	)
+	if profile_version == "missing":
+		return None
+	return get_versioned_quiz_value(
+		"section_scheme",
+		quiz_name,
+		lambda quiz: _build_section_scheme(quiz, profile_name),
+		suffix=f"{profile_name}:{profile_version}",
+	)
+
+
+def _incidence(scheme):
+	question_sections = np.asarray(scheme["question_sections"], dtype=np.int64)
+	incidence = np.zeros((len(question_sections), len(scheme["sections"])), dtype=np.float64)
+	mapped = np.flatnonzero(question_sections >= 0)
+	incidence[mapped, question_sections[mapped]] = 1.0
+	return incidence
+
+
+def score_sections(scheme, correct):
+	"""Score a batch of attempts in one vectorized pass.
+
+	`correct` is an attempts x questions array of earned marks (0/1 per
+	question), columns in `scheme["questions"]` order. Returns one result dict
+	per attempt: `{"percentage", "weighted_percentage", "passed",
+	"sections_passed", "sections": [...]}`.
+	"""
+	correct = np.atleast_2d(np.asarray(correct, dtype=np.float64))
+	attempts, question_count = correct.shape
+	sections = scheme["sections"]
+	incidence = _incidence(scheme)
+
+	raw = correct @ incidence
+	possible = incidence.sum(axis=0)
+	percentage = np.divide(raw * 100, possible, out=np.zeros_like(raw), where=possible > 0)
+
+	min_pass = np.array([section["min_pass_percentage"] for section in sections], dtype=np.float64)
+	section_passed = percentage >= min_pass
+
+	weights = np.array([section["weightage"] for section in sections], dtype=np.float64)
+	overall = correct.sum(axis=1) * 100 / question_count if question_count else np.zeros(attempts)
+	if weights.sum() > 0:
+		weighted = percentage * weights / weights.sum()
+		weighted_overall = weighted.sum(axis=1)
+	else:
+		weighted = np.zeros_like(percentage)
+		weighted_overall = overall
+
+	all_sections_passed = section_passed.all(axis=1)
+	meets_overall = weighted_overall >= scheme["passing_score"]
+	require_all = scheme["require_all_sections_pass"]
+	enforce_overall = scheme["enforce_overall_percentage"]
+	if require_all or enforce_overall:
+		passed = np.ones(attempts, dtype=bool)
+		if require_all:
+			passed &= all_sections_passed
+		if enforce_overall:
+			passed &= meets_overall
+	else:
+		# A profile with both checks off still needs some bar: the quiz passing score.
+		passed = meets_overall
+
+	results = []
+	for a in range(attempts):
+		results.append(
+			{
+				"profile": scheme["profile"],
+				"percentage": round(float(overall[a]), 2),
+				"weighted_percentage": round(float(weighted_overall[a]), 2),
+				"passed": bool(passed[a]),
+				"sections_passed": bool(all_sections_passed[a]),
+				"sections": [
+					{
+						"key": section["key"],
+						"title": section["title"],
+						"raw": int(raw[a, s]),
+						"possible": int(possible[s]),
+						"percentage": round(float(percentage[a, s]), 2),
+						"weighted": round(float(weighted[a, s]), 2),
+						"min_pass_percentage": section["min_pass_percentage"],
+						"weightage": section["weightage"],
+						"passed": bool(section_passed[a, s]),
+					}
+					for s, section in enumerate(sections)
+				],
+			}
+		)
+	return results
+
+
+def _correctness_matrix(scheme, attempts):
+	"""attempts: list of `{question: "Correct" | "Wrong"}` maps -> attempts x questions array."""
+	question_index = {name: i for i, name in enumerate(scheme["questions"])}
+	correct = np.zeros((len(attempts), len(question_index)), dtype=np.float64)
+	for a, results in enumerate(attempts):
+		for question, quiz_result in results.items():
+			q = question_index.get(question)
+			if q is not None and quiz_result == "Correct":
+				correct[a, q] = 1.0
+	return correct
+
+
+def score_section_submission(scheme, graded_answers):
+	"""Section result for one graded submission (`_grade_quiz_submission` rows)."""
+	results = {row["question"]: row["quiz_result"] for row in graded_answers if row.get("question")}
+	return score_sections(scheme, _correctness_matrix(scheme, [results]))[0]
+
+
+def get_section_profile_name(quiz_name, student_group):
+	"""Profile a group's Section Wise MCQs assignment scores this quiz under, if any."""
+	for quiz in get_group_quiz_catalog(student_group)["section_quizzes"]:
+		if quiz["name"] == quiz_name:
+			return quiz["quiz_section_profile"]
+	return None
+
+
+def _profile_scope(profile_name):
+	"""Quizzes and student groups whose section-wise assignments score under this profile."""
+	rows = frappe.db.sql(
+		"""
+		SELECT mcqs AS quiz, student_group, name
+		FROM `tabMCQS Assignment`
+		WHERE assignment_flow = 'Section Wise MCQs'
+			AND COALESCE(NULLIF(quiz_section_profile, ''), mcqs) = %s
+		""",
+		(profile_name,),
+		as_dict=True,
+	)
+	quizzes = sorted({row.quiz for row in rows if row.quiz})
+	groups = sorted({value for row in rows for value in (row.student_group, row.name) if value})
+	return quizzes, groups
+
+
+def _iter_activity_chunks(quiz_name, groups, chunk_size):
+	after = ""
+	while True:
+		rows = frappe.db.sql(
+			"""
+			SELECT name, student, score, status, custom_section_results,
+				custom_assesment_plan, custom_assesment_result
+			FROM `tabQuiz Activity`
+			WHERE quiz = %(quiz)s
+				AND custom_student_group IN %(groups)s
+				AND status IN ('Pass', 'Fail')
+				AND name > %(after)s
+			ORDER BY name
+			LIMIT %(limit)s
+			""",
+			{"quiz": quiz_name, "groups": tuple(groups), "after": after, "limit": chunk_size},
+			as_dict=True,
+		)
+		if not rows:
+			return
+		yield rows
+		after = rows[-1].name
+
+
+def _load_attempt_results(activity_names):
+	attempts = {name: {} for name in activity_names}
+	for row in frappe.get_all(
+		"Quiz Result",
+		filters={"parent": ["in", activity_names], "parenttype": "Quiz Activity"},
+		fields=["parent", "question", "quiz_result"],
+	):
+		attempts[row.parent][row.question] = row.quiz_result
+	return [attempts[name] for name in activity_names]
+
+
+def _section_results_json(result):
+	return json.dumps(result, sort_keys=True, separators=(",", ":"))
+
+
+def rescore_section_quiz_activities(profile_name, dry_run=False, chunk_size=RESCORE_CHUNK_SIZE):
+	"""Re-score every graded Quiz Activity taken under a section profile.
+
+	Works chunk by chunk: one query for the activities, one IN query for their
+	Quiz Result rows, one `score_sections` call. Only rows whose status or
+	section breakdown changed are written, and a linked Assessment Result is
+	re-synced when the status flips. `dry_run` returns the diff without
+	writing.
+
+	The job is deduplicated on the profile, so an edit saved while it runs does
+	not queue a second one. Instead the thresholds are re-read after each pass
+	and the pass is repeated when they moved.
+	"""
+	signature = _profile_signature(profile_name)
+	summary = _rescore_pass(profile_name, dry_run, chunk_size)
+	summary["passes"] = 1
+	while not dry_run and summary["passes"] < RESCORE_MAX_PASSES:
+		# end the read snapshot so the latest saved thresholds are visible
+		frappe.db.commit()
+		current = _profile_signature(profile_name)
+		if current is None or current == signature:
+			break
+		signature = current
+		passes = summary["passes"] + 1
+		summary = _rescore_pass(profile_name, dry_run, chunk_size)
+		summary["passes"] = passes
+	return summary
+
+
+def _profile_signature(profile_name):
+	if not frappe.db.exists("Quiz Section Profile", profile_name):
+		return None
+	return _threshold_signature(frappe.get_doc("Quiz Section Profile", profile_name))
+
+
+def _rescore_pass(profile_name, dry_run, chunk_size):
+	# Shared with regrades; imported here because quiz_regrade imports this module.
+	from numerouno.numerouno.utils.quiz_regrade import _sync_assessment_result
+
+	quizzes, groups = _profile_scope(profile_name)
+	summary = {
+		"profile": profile_name,
+		"dry_run": bool(dry_run),
+		"scanned": 0,
+		"changed": 0,
+		"status_changed": 0,
+		"assessment_results_synced": 0,
+		"changes": [],
+	}
+	if not groups:
+		return summary
+
+	for quiz_name in quizzes:
+		scheme = _build_section_scheme(quiz_name, profile_name)
+		if not scheme["questions"]:
+			continue
+		for rows in _iter_activity_chunks(quiz_name, groups, chunk_size):
+			names = [row.name for row in rows]
+			results = score_sections(scheme, _correctness_matrix(scheme, _load_attempt_results(names)))
+			for row, result in zip(rows, results):
+				summary["scanned"] += 1
+				status = "Pass" if result["passed"] else "Fail"
+				section_results = _section_results_json(result)
+				if status == row.status and section_results == (row.custom_section_results or ""):
+					continue
+				summary["changed"] += 1
+				if status != row.status:
+					summary["status_changed"] += 1
+					if len(summary["changes"]) < RESCORE_DIFF_LIMIT:
+						summary["changes"].append(
+							{
+								"quiz_activity": row.name,
+								"quiz": quiz_name,
+								"old_status": row.status,
+								"new_status": status,
+								"weighted_percentage": result["weighted_percentage"],
+							}
+						)
+				if not dry_run:
+					frappe.db.set_value(
+						"Quiz Activity",
+						row.name,
+						{"status": status, "custom_section_results": section_results},
+						update_modified=False,
+					)
+					if status != row.status and _sync_assessment_result(row, row.score, status):
+						summary["assessment_results_synced"] += 1
+			if not dry_run:
+				frappe.db.commit()
+
+	diag.info(
+		"Section re-score for {}: {} scanned, {} changed, {} status changes{}",
+		profile_name,
+		summary["scanned"],
+		summary["changed"],
+		summary["status_changed"],
+		" (dry run)" if dry_run else "",
+	)
+	return summary
+
+
+def enqueue_section_rescore(profile_name):
+	frappe.enqueue(
+		"numerouno.numerouno.utils.section_scoring.rescore_section_quiz_activities",
+		queue="long",
+		timeout=3600,
+		job_id=f"section_rescore::{profile_name}",
+		deduplicate=True,
+		enqueue_after_commit=True,
+		profile_name=profile_name,
+	)
+
+
+def _threshold_signature(doc):
+	return (
+		cint(doc.require_all_sections_pass),
+		cint(doc.enforce_overall_percentage),
+		tuple(
+			sorted(
+				((row.section_key or "").strip().lower(), flt(row.min_pass_percentage), flt(row.weightage))
+				for row in doc.section_items or []
+			)
+		),
+	)
+
+
+def on_quiz_section_profile_update(doc, method=None):
+	before = doc.get_doc_before_save()
+	if before and _threshold_signature(before) != _threshold_signature(doc):
+		enqueue_section_rescore(doc.name)
+
+
+@frappe.whitelist()
+def rescore_section_profile(profile_name, dry_run=1):
+	"""Preview (`dry_run=1`, inline) or queue a re-score of a profile's Quiz Activities."""
+	frappe.only_for("System Manager")
+	if not frappe.db.exists("Quiz Section Profile", profile_name):
+		frappe.throw(frappe._("Quiz Section Profile {0} not found").format(profile_name))
+
+	if cint(dry_run):
+		return rescore_section_quiz_activities(profile_name, dry_run=True)
+
+	enqueue_section_rescore(profile_name)
+	return {"status": "queued", "profile": profile_name}
@@ -0,0 +1,7 @@
+import frappe
+
+
+def execute():
+	# get_quiz_submission_history sorts and ranges on (activity_date, creation) for one
+	# student; backfill_quiz_activity_date keeps activity_date non-null so this index serves both.
+	frappe.db.add_index("Quiz Activity", ["student", "activity_date", "creation"], "student_history_index")
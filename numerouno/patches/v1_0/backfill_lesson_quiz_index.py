@@ -0,0 +1,5 @@
+from numerouno.numerouno.utils.lesson_quiz_index import rebuild_lesson_quiz_index
+
+
+def execute():
+	rebuild_lesson_quiz_index()
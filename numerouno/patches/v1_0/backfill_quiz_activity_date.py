@@ -0,0 +1,12 @@
+import frappe
+
+
+def execute():
+	# get_quiz_submission_history orders and pages on the raw activity_date column.
+	frappe.db.sql(
+		"""
+		UPDATE `tabQuiz Activity`
+		SET activity_date = DATE(creation)
+		WHERE activity_date IS NULL
+		"""
+	)
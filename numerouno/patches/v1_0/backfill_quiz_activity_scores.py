@@ -0,0 +1,13 @@
+import frappe
+
+
+def execute():
+	# Runs in the background so migrate is not held up by large sites.
+	frappe.enqueue(
+		"numerouno.numerouno.utils.quiz_activity_score.backfill_activity_scores",
+		queue="long",
+		timeout=3600 * 4,
+		job_id="backfill_quiz_activity_scores",
+		deduplicate=True,
+		enqueue_after_commit=True,
+	)